@@ -1,5 +1,5 @@
 @echo off
-REM -- Create Python virtual environment if it does not exist
+REM -- Create Python virtual environment if it does not exist (requires Python 3.10 or newer)
 IF NOT EXIST venv\ (
     python -m venv venv
 )
@@ -10,7 +10,9 @@ call venv\Scripts\activate.bat
 pip install -r requirements.txt
 
 REM -- Build self-contained exe file using PyInstaller
-python -OO -m PyInstaller --clean --noupx --exclude-module FixTk --exclude-module tcl --exclude-module tk --exclude-module _tkinter --exclude-module tkinter --exclude-module Tkinter --onefile main.py
+REM -- Task types, input backends, log sinks, tracing and the tools (main.py subcommands, they need numpy) are imported
+REM -- lazily, so they have to be collected explicitly
+python -OO -m PyInstaller --clean --noupx --exclude-module FixTk --exclude-module tcl --exclude-module tk --exclude-module _tkinter --exclude-module tkinter --exclude-module Tkinter --collect-submodules mike_simulator.task.types --collect-submodules mike_simulator.input.backends --collect-submodules mike_simulator.log_sinks.sinks --collect-submodules mike_simulator.tools --collect-submodules mike_simulator.tracing --onefile main.py
 
 REM -- Rename the created exe and move it to root directory
 copy dist\main.exe Simulator.exe
@@ -1,66 +1,128 @@
-import os
+from mike_simulator.util.startup_profile import StartupProfile
+
+import argparse
+import importlib
 import random
 import sys
-from multiprocessing import Process, freeze_support
+from multiprocessing import Process, Queue, freeze_support
 from time import sleep
-
-
-from keyboard import is_pressed
-from pyftpdlib.authorizers import DummyAuthorizer
-from pyftpdlib.handlers import FTPHandler
-from pyftpdlib.servers import FTPServer
-
-from mike_simulator.config import load_configuration, cfg
-from mike_simulator.server import MikeServer
-
-
-def start_ftp(log_dir):
-    load_configuration()
-    authorizer = DummyAuthorizer()
-    authorizer.add_anonymous(os.path.realpath(log_dir))
-    handler = FTPHandler
-    handler.authorizer = authorizer
-    server = FTPServer((cfg.Network.server_bind_ip, 21), handler)
-    server.serve_forever()
-
-
-def main():
+from typing import Dict, List, Optional
+
+from mike_simulator.config import load_configuration, cfg, config_service, parse_override
+from mike_simulator.profiles import PerformanceProfile, PROFILES
+
+
+def start_ftp(log_dir, closed_files, config_overrides):
+    # pyftpdlib is only needed (and imported) if the simulated ftp server is enabled
+    from mike_simulator.ftp.server import run_ftp_server
+    run_ftp_server(log_dir, closed_files, config_overrides)
+
+
+# Subcommands implemented by a tool module in mike_simulator.tools (command: help)
+TOOL_COMMANDS = {
+    'replay': 'replay session logs as motor data stream',
+    'bench': 'measure the throughput of headless sessions',
+    'simulate': 'run a scripted headless session of a task',
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in TOOL_COMMANDS:
+        # Tools parse their own arguments
+        return importlib.import_module(f'mike_simulator.tools.{argv[0]}').main(argv[1:])
+    if not argv or argv[0] not in ('serve', '-h', '--help'):
+        # Running without command (e.g. the exe started by the frontend) serves the frontend
+        argv = ['serve'] + argv
+
+    parser = argparse.ArgumentParser(description='MIKE robot simulator')
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+    serve_parser = commands.add_parser('serve', help='serve the frontend (default)')
+    serve_parser.add_argument('--headless', action='store_true',
+                              help='no privilege elevation, keyboard hooks or status lines '
+                                   '(keyboard input is replaced by a user who never presses a key)')
+    serve_parser.add_argument('--set', action='append', default=[], metavar='SECTION.NAME=VALUE',
+                              help='override a configuration entry (repeatable)')
+    for command, command_help in TOOL_COMMANDS.items():
+        commands.add_parser(command, help=command_help, add_help=False)
+    args = parser.parse_args(argv)
+    try:
+        overrides = dict(parse_override(spec) for spec in args.set)
+    except ValueError as e:
+        parser.error(str(e))
+    return serve(PROFILES['headless' if args.headless else 'serve'], overrides)
+
+
+def serve(profile: PerformanceProfile, overrides: Dict[str, str]) -> int:
+    from mike_simulator.server import MikeServer
+    StartupProfile.mark('imports done')
+
+    profile.apply()
     from sys import platform
-    if platform == "linux" or platform == "linux2":
+    if profile.keyboard and (platform == "linux" or platform == "linux2"):
         from elevate import elevate
         elevate(graphical=False)
 
-    freeze_support()
-
-    seed = random.randrange(sys.maxsize)
-    #seed = value
-    motor_data_loss_rng = random.Random(seed+2)
-    print('Packet loss rng seed: {seed}')
+    # Load configuration file (with overrides from the environment and command line) and watch it for changes
+    try:
+        load_configuration(overrides=overrides)
+    except ValueError as e:
+        print(f'Invalid configuration: {e}')
+        return -1
+    config_service.start_watching()
+    StartupProfile.mark('configuration loaded')
 
-    # Load configuration file
-    load_configuration()
+    seed = cfg.Network.impairment_seed if cfg.Network.impairment_seed >= 0 else random.randrange(sys.maxsize)
+    print(f'Network impairment rng seed: {seed}')
 
+    ftp_service = ftp_process = None
     if cfg.Network.simulate_ftp_server:
-        ftp_server = Process(target=start_ftp, args=(cfg.Logging.log_dir, ))
-        ftp_server.start()
-
-    server = MikeServer(motor_data_loss_rng)
+        if cfg.Network.ftp_in_process:
+            from mike_simulator.ftp import FtpService
+            ftp_service = FtpService(cfg.Logging.log_dir)
+            ftp_service.start()
+        else:
+            # Closed log files are passed to the ftp server process to update its session index
+            from mike_simulator.logger import Logger
+            closed_files = Queue()
+            Logger.file_closed_listeners.append(closed_files.put)
+            ftp_process = Process(target=start_ftp, args=(cfg.Logging.log_dir, closed_files, config_service.overrides),
+                                  daemon=True)
+            ftp_process.start()
+        StartupProfile.mark('ftp server started')
+
+    server = MikeServer(seed, profile)
     server.start()
-
-    while True:
-        if is_pressed('f10'):
-            sleep(1.0)
-            continue
-
-        server.wait_for_connection()
-        try:
-            server.main_loop()
-        finally:
-            print('Connection terminated')
-            server.close_connection()
-
-    ftp_server.join()
+    StartupProfile.mark('server listening')
+
+    if profile.keyboard:
+        from keyboard import is_pressed
+        StartupProfile.mark('keyboard hooks ready')
+    else:
+        is_pressed = None
+
+    try:
+        while True:
+            if is_pressed is not None and is_pressed('f10'):
+                sleep(1.0)
+                continue
+
+            server.wait_for_connection()
+            try:
+                server.main_loop()
+            finally:
+                print('Connection terminated')
+                server.close_connection()
+    finally:
+        server.stop()
+        if ftp_service is not None:
+            ftp_service.stop()
+        if ftp_process is not None:
+            ftp_process.terminate()
+            ftp_process.join()
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    freeze_support()
+    sys.exit(main())
@@ -1,9 +1,14 @@
-from . import auto_movement
-from . import input
-from . import task
-from . import util
-from . import config
-from . import datamodels
-from . import logger
-from . import server
-from . import simulator
+import importlib
+
+# Submodules are imported on first access only, so that e.g. importing the configuration does not pull in
+# the server, all tasks and all input backends (keeps startup of the simulator executable fast)
+_submodules = (
+    'auto_movement', 'input', 'task', 'util', 'config', 'datamodels', 'logger', 'server', 'simulator',
+    'shared_motor_state',
+)
+
+
+def __getattr__(name):
+    if name in _submodules:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,3 @@
+from .session_log import COLUMNS, SessionInfo, parse_session_path, load_session_log, save_compact_session_log
+from .metrics import TRIAL_METRICS, compute_trial_metrics
+from .summary import SUMMARY_COLUMNS, find_session_logs, analyze_session, write_summary
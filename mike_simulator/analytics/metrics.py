@@ -0,0 +1,112 @@
+"""
+Per-trial outcome metrics of a session log, computed with vectorized NumPy reductions over the trial segments.
+
+All metrics are computed over the complete trial (all log rows with the same ROM state and trial number), metrics
+which are not defined for the session's task are NaN.
+"""
+from typing import Sequence
+
+import numpy as np
+
+from mike_simulator.analytics.session_log import SessionInfo, TIME, POSITION, TARGET_POSITION, TRIAL, VELOCITY, \
+    FORCE, ROM_STATE, STARTING_POSITION
+from mike_simulator.datamodels import TaskType
+
+TRIAL_METRICS = (
+    'rom_state', 'trial', 'start_time', 'duration', 'samples',
+    'position_min', 'position_max', 'range_of_motion', 'peak_velocity', 'peak_force', 'mean_force',
+    'matching_error', 'tracking_rmse',
+)
+
+# Tasks in which the user reproduces the target position with the robot (error = final position - target)
+MATCHING_TASKS = (TaskType.ActiveMatching, TaskType.TeachAndReproduce)
+
+# Sine mixture followed in the sensorimotor task (see SensoriMotorAssessment._start_sine_movement)
+SENSORIMOTOR_AMPLITUDE = 15.0
+SENSORIMOTOR_FREQUENCIES = (1.0, 2.0, 4.0)
+SENSORIMOTOR_FAST_FACTOR = 3.0
+
+
+def trial_starts(rows: np.ndarray) -> np.ndarray:
+    """Return the index of the first row of every trial (trials are runs of equal ROM state and trial number)."""
+    if len(rows) == 0:
+        return np.empty(0, dtype=np.intp)
+    key = rows[:, ROM_STATE] * 256.0 + rows[:, TRIAL]
+    return np.concatenate(([0], np.flatnonzero(np.diff(key)) + 1))
+
+
+def compute_trial_metrics(rows: np.ndarray, session: SessionInfo, movement_duration: float = 30.0) -> np.ndarray:
+    """
+    Compute the outcome metrics of every trial of a session.
+
+    :param rows: session log as returned by load_session_log
+    :param session: session description (determines which task specific metrics are computed)
+    :param movement_duration: duration of the sensorimotor sine movement [s] (Tasks.sensorimotor_movement_duration)
+    :return: array with one row per trial and one column per entry of TRIAL_METRICS
+    """
+    # Rows with trial number 0 (after the session finished) are not part of any trial
+    rows = rows[rows[:, TRIAL] != 0]
+    starts = trial_starts(rows)
+    metrics = np.full((len(starts), len(TRIAL_METRICS)), np.nan)
+    if len(starts) == 0:
+        return metrics
+    lasts = np.concatenate((starts[1:], [len(rows)])) - 1
+    samples = lasts - starts + 1
+    position, force = rows[:, POSITION], rows[:, FORCE]
+
+    metrics[:, 0] = rows[starts, ROM_STATE]
+    metrics[:, 1] = rows[starts, TRIAL]
+    metrics[:, 2] = rows[starts, TIME]
+    metrics[:, 3] = rows[lasts, TIME] - rows[starts, TIME]
+    metrics[:, 4] = samples
+    metrics[:, 5] = np.minimum.reduceat(position, starts)
+    metrics[:, 6] = np.maximum.reduceat(position, starts)
+    metrics[:, 7] = metrics[:, 6] - metrics[:, 5]
+    metrics[:, 8] = np.maximum.reduceat(np.abs(rows[:, VELOCITY]), starts)
+    metrics[:, 9] = np.maximum.reduceat(np.abs(force), starts)
+    metrics[:, 10] = np.add.reduceat(force, starts) / samples
+
+    if session.task in MATCHING_TASKS:
+        metrics[:, 11] = position[lasts] - rows[lasts, TARGET_POSITION]
+    if session.task == TaskType.SensoriMotor:
+        direction = 1.0 if session.left_hand else -1.0
+        for i, (first, last) in enumerate(zip(starts, lasts)):
+            metrics[i, 12] = _tracking_rmse(rows[first:last + 1], direction, movement_duration)
+    return metrics
+
+
+def sine_target(t: np.ndarray, start_position: float, amplitude: float, frequencies: Sequence[float],
+                duration: float) -> np.ndarray:
+    """Regenerate the target of a sine mover (see AutomaticSineMover) at the times t [s] since its start."""
+    normalized_t = np.clip(t / duration, 0.0, 1.0)
+    target = np.full_like(normalized_t, start_position)
+    for freq in frequencies:
+        target += np.sin(2.0 * np.pi * freq * normalized_t) * amplitude
+    return target
+
+
+def _tracking_rmse(trial: np.ndarray, direction: float, duration: float) -> float:
+    """RMS deviation of the position from the regenerated sine target during the sine movement of a trial."""
+    start_position = trial[0, STARTING_POSITION]
+    # The sine movement starts at the first row at which the target changes within the trial
+    moving = np.flatnonzero(np.abs(trial[:, TARGET_POSITION] - trial[0, TARGET_POSITION]) > 1e-6)
+    if len(moving) == 0:
+        return np.nan
+    first = moving[0]
+    amplitude = SENSORIMOTOR_AMPLITUDE * direction
+
+    best_rmse, best_misfit = np.nan, np.inf
+    # The phase (slow or fast sine) is not logged, use the one whose regenerated target matches the logged one
+    for factor in (1.0, SENSORIMOTOR_FAST_FACTOR):
+        frequencies = [freq * factor for freq in SENSORIMOTOR_FREQUENCIES]
+        # Start time interpolated from the slope of the sine mixture at t = 0
+        slope = 2.0 * np.pi * amplitude * sum(frequencies) / duration
+        start_time = trial[first, TIME] - (trial[first, TARGET_POSITION] - start_position) / slope
+        t = trial[first:, TIME] - start_time
+        segment = trial[first:][t <= duration]
+        target = sine_target(t[t <= duration], start_position, amplitude, frequencies, duration)
+        misfit = np.max(np.abs(target - segment[:, TARGET_POSITION]))
+        if misfit < best_misfit:
+            best_misfit = misfit
+            best_rmse = float(np.sqrt(np.mean((segment[:, POSITION] - target) ** 2)))
+    return best_rmse
@@ -0,0 +1,69 @@
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from mike_simulator.datamodels import TaskType
+from mike_simulator.logger import Logger
+
+# Columns of a session log (order of the values in Logger.log)
+COLUMNS = (
+    'time', 'position', 'target_position', 'frontend_started', 'trial', 'velocity', 'current', 'starting_position',
+    'voltage_force', 'force', 'force_filtered', 'velocity_unfiltered', 'rom_state',
+)
+TIME, POSITION, TARGET_POSITION, FRONTEND_STARTED, TRIAL, VELOCITY, CURRENT, STARTING_POSITION, VOLTAGE_FORCE, \
+    FORCE, FORCE_FILTERED, VELOCITY_UNFILTERED, ROM_STATE = range(len(COLUMNS))
+
+# Extension of compact session logs (the rows as float64 array in NumPy's .npy format)
+COMPACT_EXTENSION = '.npy'
+
+_TASK_TYPES_BY_NAME = {name: task_type for task_type, name in Logger.TASK_NAMES.items()}
+
+
+@dataclass
+class SessionInfo:
+    """Session description encoded in the path of a log file (see Logger.session_path)"""
+    study: str
+    subject: str
+    task: TaskType
+    left_hand: bool
+    date_time: str
+
+
+def parse_session_path(filename: str) -> Optional[SessionInfo]:
+    """
+    Extract the session description from the path of a log file.
+
+    :param filename: path of a log file ending in <study>/<subject>/<task>/<hand>/<date_time>.<ext>
+    :return: session description, None if the path does not have the layout of a session log
+    """
+    parts = os.path.normpath(filename).split(os.sep)
+    if len(parts) < 5:
+        return None
+    study, subject, task_name, hand, basename = parts[-5:]
+    task = _TASK_TYPES_BY_NAME.get(task_name)
+    if task is None or hand not in ('Left Hand', 'Right Hand'):
+        return None
+    return SessionInfo(study, subject, task, hand == 'Left Hand', os.path.splitext(basename)[0])
+
+
+def load_session_log(filename: str) -> np.ndarray:
+    """
+    Load the rows of a session log (csv file written by the simulator or compact .npy file).
+
+    :return: float64 array with one row per log entry and one column per entry of COLUMNS
+    :raise ValueError: if the file is not a valid session log
+    """
+    if filename.endswith(COMPACT_EXTENSION):
+        rows = np.load(filename)
+    else:
+        rows = np.loadtxt(filename, delimiter=',', skiprows=1, usecols=range(len(COLUMNS)), ndmin=2)
+    if rows.ndim != 2 or rows.shape[1] != len(COLUMNS):
+        raise ValueError(f'{filename} is not a session log')
+    return rows.astype(np.float64, copy=False)
+
+
+def save_compact_session_log(rows: np.ndarray, filename: str):
+    """Store rows loaded by load_session_log in the compact format (loads without parsing)."""
+    np.save(filename, np.ascontiguousarray(rows, dtype=np.float64))
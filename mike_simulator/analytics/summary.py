@@ -0,0 +1,84 @@
+"""
+Bulk analysis of session logs: computes the per-trial metrics of all sessions below a log directory in parallel
+(one session per task of a process pool) and writes them into a single summary table.
+"""
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from mike_simulator.analytics.metrics import TRIAL_METRICS, compute_trial_metrics
+from mike_simulator.analytics.session_log import COMPACT_EXTENSION, parse_session_path, load_session_log, \
+    save_compact_session_log
+
+SESSION_COLUMNS = ('study', 'subject', 'task', 'hand', 'session')
+SUMMARY_COLUMNS = SESSION_COLUMNS + TRIAL_METRICS
+
+
+def find_session_logs(log_dir: str) -> List[str]:
+    """
+    Return the paths of all session logs below log_dir, in sorted order.
+    Sessions stored both as csv and compact file are only returned once (as compact file).
+    """
+    filenames = {}
+    for dir_path, _, file_names in os.walk(log_dir):
+        for name in file_names:
+            filename = os.path.join(dir_path, name)
+            stem, ext = os.path.splitext(filename)
+            if ext in ('.csv', COMPACT_EXTENSION) and parse_session_path(filename) is not None:
+                if ext == COMPACT_EXTENSION or stem not in filenames:
+                    filenames[stem] = filename
+    return sorted(filenames.values())
+
+
+def analyze_session(filename: str, movement_duration: float = 30.0,
+                    compact: bool = False) -> Tuple[str, Optional[List[tuple]]]:
+    """
+    Compute the summary rows (one per trial) of a single session log.
+
+    :param compact: store a compact copy of a csv session log next to it (faster to load in later runs)
+    :return: filename and summary rows, None if the file could not be read
+    """
+    session = parse_session_path(filename)
+    try:
+        rows = load_session_log(filename)
+        if compact and not filename.endswith(COMPACT_EXTENSION):
+            save_compact_session_log(rows, os.path.splitext(filename)[0] + COMPACT_EXTENSION)
+    except (OSError, ValueError) as e:
+        print(f'Skipping {filename}: {e}')
+        return filename, None
+    session_values = (session.study, session.subject, session.task.name,
+                      'Left' if session.left_hand else 'Right', session.date_time)
+    metrics = compute_trial_metrics(rows, session, movement_duration)
+    return filename, [session_values + tuple(trial.tolist()) for trial in metrics]
+
+
+def write_summary(log_dir: str, out_filename: str, workers: Optional[int] = None, movement_duration: float = 30.0,
+                  compact: bool = False, chunksize: int = 16) -> int:
+    """
+    Analyze all session logs below log_dir and write the summary table as csv file.
+
+    :param workers: number of worker processes (None = number of CPUs, 0 = analyze in this process)
+    :param movement_duration: duration of the sensorimotor sine movement [s]
+    :param compact: store compact copies of the csv session logs (see analyze_session)
+    :param chunksize: number of sessions sent to a worker at once
+    :return: number of analyzed sessions
+    """
+    filenames = find_session_logs(log_dir)
+    args = (filenames, [movement_duration] * len(filenames), [compact] * len(filenames))
+    with open(out_filename, 'w', newline='') as out:
+        writer = csv.writer(out)
+        writer.writerow(SUMMARY_COLUMNS)
+        if workers == 0:
+            return _write_results(writer, map(analyze_session, *args))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return _write_results(writer, executor.map(analyze_session, *args, chunksize=chunksize))
+
+
+def _write_results(writer, results) -> int:
+    analyzed = 0
+    for _, summary_rows in results:
+        if summary_rows is not None:
+            writer.writerows(summary_rows)
+            analyzed += 1
+    return analyzed
@@ -2,21 +2,25 @@ from abc import ABCMeta, abstractmethod
 from typing import Tuple
 
 from mike_simulator.auto_movement import AutoMover
-from mike_simulator.util import get_current_time
+from mike_simulator.util import get_tick_time
+
+# Movement states are immutable, movers return these instead of allocating a new one every cycle
+_FINISHED = AutoMover.MovementState(True)
+_IN_PROGRESS = AutoMover.MovementState(False)
 
 
 class AutoMoverBase(AutoMover, metaclass=ABCMeta):
     def __init__(self, start_position: float, duration: float):
         self.start_pos = start_position
-        self.start_time: float = get_current_time()
+        self.start_time: float = get_tick_time()
         self.duration = duration
 
     def get_current_position_and_state(self) -> Tuple[float, AutoMover.MovementState]:
         if self.duration == 0:
-            return self.start_pos, AutoMover.MovementState(True)
-        normalized_t = self.get_normalized_t(get_current_time() - self.start_time)
+            return self.start_pos, _FINISHED
+        normalized_t = self.get_normalized_t(get_tick_time() - self.start_time)
         pos = self.get_current_position(normalized_t)
-        return pos, AutoMoverBase.MovementState(normalized_t == 1.0)
+        return pos, _FINISHED if normalized_t == 1.0 else _IN_PROGRESS
 
     def get_normalized_t(self, elapsed_time: float) -> float:
         """Convert elapsed time to a normalized time in range [0,1] based on the mover's duration."""
@@ -0,0 +1,2 @@
+from .interface import BatchTask
+from .engine import BatchSimulator
@@ -0,0 +1,169 @@
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from mike_simulator.batch import BatchTask
+from mike_simulator.batch.factory import BatchTaskFactory
+from mike_simulator.datamodels import Constants, TaskType
+from mike_simulator.input import UserMovement
+
+
+class BatchSimulator:
+    """
+    Simulates many virtual patients performing the same task at once.
+
+    The motor state, input state and task state of all patients are stored in NumPy arrays (one entry per patient)
+    and every step() applies the update of BackendSimulator._update_motor_state to all of them with a few dozen
+    array operations. Patients are driven by prerecorded directional input (like PrerecordedInputHandler)
+    and run in lockstep on a simulated clock, so a single patient produces the same motor states
+    as a HeadlessSimulator.
+    """
+
+    def __init__(self, task: TaskType, patient_count: int, recordings: Union[Sequence[float], np.ndarray] = (),
+                 left_hand: Union[bool, Sequence[bool]] = True, trial_count: int = 2, seed: Optional[int] = None,
+                 cycle_time: float = Constants.ROBOT_CYCLE_TIME):
+        """
+        :param task: task performed by all patients
+        :param patient_count: number of simulated patients
+        :param recordings: directional input in [-1, 1] per cycle, either shared by all patients (1D)
+                           or one row per patient (2D), replayed from the beginning once exhausted
+        :param left_hand: whether the patients use their left hand (single value or one per patient)
+        :param trial_count: number of trials per phase
+        :param seed: seed for the randomized parts of the task (e.g. phase order)
+        :param cycle_time: simulated time per step [s]
+        """
+        n = patient_count
+        self.patient_count = n
+        self.rng = np.random.default_rng(seed)
+        self.left_hand = np.broadcast_to(np.asarray(left_hand, dtype=bool), (n,)).copy()
+
+        recordings = np.asarray(recordings, dtype=np.float64)
+        if recordings.size == 0:
+            recordings = np.zeros(1)
+        self.recordings = recordings if recordings.ndim == 2 else recordings[np.newaxis, :]
+        if self.recordings.shape[0] not in (1, n):
+            raise ValueError(f'Expected 1 or {n} input recordings, got {self.recordings.shape[0]}')
+
+        # Simulated clock (same integer nanosecond steps as SimulatedClock)
+        self.cycle_time_ns = round(cycle_time * 1_000_000_000)
+        self.delta_time = self.cycle_time_ns / 1_000_000_000
+        self.step_count = 0
+        self.time_ns = 0
+        self.time = 0.0
+
+        # Motor state
+        self.position = np.zeros(n)
+        self.starting_position = np.zeros(n)
+        self.target_position = np.zeros(n)
+        self.motor_force = np.zeros(n)
+        self.trial = np.zeros(n, dtype=np.int64)
+        self.target_state = np.zeros(n, dtype=bool)
+        self.finished = np.zeros(n, dtype=bool)
+        self.flexion = np.ones(n, dtype=bool)
+
+        # Input state
+        self.force = np.zeros(n)
+        self.velocity = np.zeros(n)
+        self.movement_locked = np.ones(n, dtype=bool)
+
+        # Patients which received a start command (SimulatorState.RUNNING)
+        self.running = np.zeros(n, dtype=bool)
+
+        self.task: BatchTask = BatchTaskFactory.create(task, self, trial_count)
+
+    def start(self, mask: Optional[np.ndarray] = None):
+        """Equivalent to the frontend sending a Start control message to the patients in mask (default: all)."""
+        mask = ~self.finished if mask is None else mask & ~self.finished
+        self.task.on_start(self, mask)
+        self.running |= mask
+
+    def step(self):
+        """Advance the simulation of all patients by one cycle."""
+        raw_input = self.recordings[:, self.step_count % self.recordings.shape[1]]
+        self.step_count += 1
+        self.time_ns = self.step_count * self.cycle_time_ns
+        self.time = self.time_ns / 1_000_000_000
+
+        self._update_input_state(raw_input)
+
+        # Update motor state based on user input
+        self.motor_force[:] = self.force
+        np.clip(self.position + self.velocity * self.delta_time, Constants.MIN_POSITION, Constants.MAX_POSITION,
+                out=self.position)
+
+        # Update task state (finished patients stay finished)
+        expired = self.task.expired_timeouts(self)
+        if expired.any():
+            self.task.on_timeout(self, expired)
+        self.task.on_update(self)
+
+        newly_finished = self.running & self.task.is_finished() & ~self.finished
+        if newly_finished.any():
+            self._finish(newly_finished)
+
+    def run(self, steps: int, start_interval: Optional[int] = None) -> int:
+        """
+        Run up to steps cycles (stops early once all patients finished).
+
+        :param start_interval: send a start command to all patients every start_interval cycles (None = never)
+        :return: number of cycles run
+        """
+        for cycle in range(steps):
+            if start_interval is not None and cycle % start_interval == 0:
+                self.start()
+            self.step()
+            if self.finished.all():
+                return cycle + 1
+        return steps
+
+    # Input handler functionality (see InputHandlerBase)
+
+    def reset_input(self, mask: np.ndarray):
+        self.force[mask] = 0.0
+        self.velocity[mask] = 0.0
+
+    def lock_movement(self, mask: np.ndarray):
+        self.movement_locked[mask] = True
+        self.reset_input(mask)
+
+    def unlock_movement(self, mask: np.ndarray):
+        self.movement_locked[mask] = False
+        self.reset_input(mask)
+
+    def _update_input_state(self, raw_input: np.ndarray):
+        dt = self.delta_time
+        locked = self.movement_locked
+        prev_velocity = self.velocity
+
+        # Locked patients push against the robot, unlocked ones move it
+        locked_force = self.force + raw_input * Constants.USER_FORCE_ACCEL_RATE * dt
+        movement = self.task.USER_MOVEMENT
+        if movement == UserMovement.Burst:
+            accel = Constants.USER_BURST_ACCEL_RATE
+            decel = 6.0 * accel
+            velocity = np.where(np.abs(raw_input) > 0.3, prev_velocity + raw_input * accel * dt,
+                                np.where(prev_velocity < 0, np.minimum(0.0, prev_velocity + 1.0 * decel * dt),
+                                         np.maximum(0.0, prev_velocity + -1.0 * decel * dt)))
+        elif movement == UserMovement.Normal:
+            velocity = np.broadcast_to(raw_input * Constants.USER_NORMAL_MAX_SPEED, prev_velocity.shape)
+        else:
+            velocity = np.zeros_like(prev_velocity)
+        unlocked_force = (velocity - prev_velocity) * (Constants.MASS_CONSTANT / dt)
+
+        # Cap values to reasonable range and make sure that velocity drops to 0 when boundary is reached
+        self.force = np.clip(np.where(locked, locked_force, unlocked_force), -Constants.MAX_FORCE, Constants.MAX_FORCE)
+        cannot_move = locked | ((self.position >= Constants.MAX_POSITION) & (velocity > 0.0)) \
+            | ((self.position <= Constants.MIN_POSITION) & (velocity < 0.0))
+        self.velocity = np.where(cannot_move, 0.0, np.clip(velocity, -Constants.MAX_SPEED, Constants.MAX_SPEED))
+
+    def _finish(self, mask: np.ndarray):
+        """Reset the motor state of the patients in mask to MotorState(Finished=True) and end their task."""
+        self.position[mask] = 0.0
+        self.starting_position[mask] = 0.0
+        self.target_position[mask] = 0.0
+        self.motor_force[mask] = 0.0
+        self.trial[mask] = 0
+        self.target_state[mask] = False
+        self.flexion[mask] = True
+        self.finished[mask] = True
+        self.lock_movement(mask)
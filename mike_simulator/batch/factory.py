@@ -0,0 +1,24 @@
+from mike_simulator.batch import BatchTask
+from mike_simulator.datamodels import TaskType
+from mike_simulator.util.helpers import import_attribute
+
+# Vectorized implementations of the tasks (module in batch/tasks, class name), imported on first use
+_batch_tasks_class_by_type = {
+    TaskType.Force: ('force', 'BatchForceTask'),
+    TaskType.Motor: ('motor', 'BatchMotorTask'),
+}
+
+
+class BatchTaskFactory:
+    @staticmethod
+    def create(task: TaskType, sim, trial_count: int) -> BatchTask:
+        """
+        Create the vectorized task of the given type for all patients of sim.
+
+        :raise ValueError: if there is no vectorized implementation of the task
+        """
+        if task not in _batch_tasks_class_by_type:
+            raise ValueError(f'No batch implementation of task {task.name} '
+                             f'(supported: {[t.name for t in _batch_tasks_class_by_type]})')
+        module_name, class_name = _batch_tasks_class_by_type[task]
+        return import_attribute(f'mike_simulator.batch.tasks.{module_name}', class_name)(sim, trial_count)
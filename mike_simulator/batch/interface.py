@@ -0,0 +1,86 @@
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+
+from mike_simulator.input import UserMovement
+
+
+class BatchTask(metaclass=ABCMeta):
+    """
+    Abstract interface for a task performed by all patients of a BatchSimulator.
+
+    Counterpart of Task with the task state of every patient stored in arrays (one entry per patient). Events are
+    delivered for a boolean mask of patients, updates always cover all patients.
+    """
+
+    # Type of user movement simulated while a patient's movement is unlocked
+    USER_MOVEMENT = UserMovement.Disabled
+
+    def __init__(self, sim, trial_count: int):
+        """
+        :param sim: BatchSimulator whose patients perform this task
+        :param trial_count: number of trials per phase (PhaseTrialCount)
+        """
+        n = sim.patient_count
+        self.trial_count = trial_count
+        self.direction = np.where(sim.left_hand, 1.0, -1.0)
+        self.state = np.zeros(n, dtype=np.int8)
+
+        # Due time [ns] of the pending timeout of every patient (-1 = none)
+        self.timeout_ns = np.full(n, -1, dtype=np.int64)
+
+        # Linear movement of every patient (see start_linear_move)
+        self.move_start_position = np.zeros(n)
+        self.move_target_position = np.zeros(n)
+        self.move_start_time = np.zeros(n)
+        self.move_duration = np.ones(n)
+
+    @abstractmethod
+    def on_start(self, sim, mask: np.ndarray):
+        """Called when the frontend issued a start command for the patients in mask."""
+        pass
+
+    @abstractmethod
+    def on_timeout(self, sim, mask: np.ndarray):
+        """Called (before on_update) for the patients in mask whose timeout expired."""
+        pass
+
+    @abstractmethod
+    def on_update(self, sim):
+        """Called once per step to update the motor states of all patients."""
+        pass
+
+    # Helper Functionality
+
+    def is_finished(self) -> np.ndarray:
+        return self.state == -1
+
+    def start_timeout(self, sim, mask: np.ndarray, duration: float):
+        """Let the timeout of the patients in mask expire duration seconds after the current tick time."""
+        self.timeout_ns[mask] = sim.time_ns + round(duration * 1_000_000_000)
+
+    def expired_timeouts(self, sim) -> np.ndarray:
+        """Return the mask of the patients whose timeout expired (the timeouts are cleared)."""
+        expired = (self.timeout_ns >= 0) & (self.timeout_ns <= sim.time_ns)
+        self.timeout_ns[expired] = -1
+        return expired
+
+    def start_linear_move(self, sim, mask: np.ndarray, target: np.ndarray, duration: float):
+        """Move the robot of the patients in mask linearly from their current position to target (see LinearMove)."""
+        self.move_start_position[mask] = sim.position[mask]
+        self.move_target_position[mask] = target[mask]
+        self.move_start_time[mask] = sim.time
+        self.move_duration[mask] = duration
+
+    def linear_move(self, sim, mask: np.ndarray) -> np.ndarray:
+        """
+        Move the robot of the patients in mask along their linear movement (movement_finished guard).
+
+        :return: mask of the patients whose movement finished
+        """
+        t = np.clip((sim.time - self.move_start_time[mask]) / self.move_duration[mask], 0.0, 1.0)
+        start = self.move_start_position[mask]
+        sim.position[mask] = start + (self.move_target_position[mask] - start) * t
+        finished = np.zeros_like(mask)
+        finished[mask] = t == 1.0
+        return finished
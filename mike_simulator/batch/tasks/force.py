@@ -0,0 +1,63 @@
+from enum import IntEnum
+
+import numpy as np
+
+from mike_simulator.batch import BatchTask
+
+
+class S(IntEnum):
+    STANDBY = 0
+    COUNTDOWN = 1
+    USER_INPUT = 2
+
+    FINISHED = -1
+
+
+class BatchForceTask(BatchTask):
+    """Vectorized ForceAssessment"""
+
+    def __init__(self, sim, trial_count: int):
+        super().__init__(sim, trial_count)
+
+        # Maximum absolute force applied within the current trial and within every finished trial
+        self.user_force = np.zeros(sim.patient_count)
+        self.trial_user_force = np.full((sim.patient_count, 2 * trial_count), np.nan)
+
+        # Set starting position and initialize trial
+        sim.starting_position[:] = 0.0
+        self._prepare_next_trial_or_finish(sim, np.ones(sim.patient_count, dtype=bool))
+
+    def on_start(self, sim, mask: np.ndarray):
+        # Start a trial
+        mask = mask & (self.state == S.STANDBY)
+        self.start_timeout(sim, mask, 3.0)
+        self.state[mask] = S.COUNTDOWN
+
+    def on_timeout(self, sim, mask: np.ndarray):
+        # After 3 seconds, the trial ends
+        ending = mask & (self.state == S.USER_INPUT)
+        self.trial_user_force[ending, sim.trial[ending] - 1] = self.user_force[ending]
+        sim.target_state[ending] = False
+        sim.reset_input(ending)
+        self._prepare_next_trial_or_finish(sim, ending)
+
+        # We are waiting for 3 sec until the user is asked to apply force
+        countdown = mask & (self.state == S.COUNTDOWN)
+        sim.target_state[countdown] = True
+        sim.reset_input(countdown)
+        self.user_force[countdown] = 0.0
+        self.start_timeout(sim, countdown, 3.0)
+        self.state[countdown] = S.USER_INPUT
+
+    def on_update(self, sim):
+        pressing = self.state == S.USER_INPUT
+        np.maximum(self.user_force, np.where(pressing, np.abs(sim.force), 0.0), out=self.user_force)
+
+    def _prepare_next_trial_or_finish(self, sim, mask: np.ndarray):
+        finished = mask & (sim.trial == 2 * self.trial_count)
+        self.state[finished] = S.FINISHED
+
+        mask = mask & ~finished
+        sim.flexion[mask & (sim.trial == self.trial_count)] = False
+        sim.trial[mask] += 1
+        self.state[mask] = S.STANDBY
@@ -0,0 +1,73 @@
+from enum import IntEnum
+
+import numpy as np
+
+from mike_simulator.batch import BatchTask
+from mike_simulator.input import UserMovement
+
+
+class S(IntEnum):
+    STANDBY = 0
+    MOVING_TO_START = 1
+    USER_INPUT = 2
+
+    FINISHED = -1
+
+
+class BatchMotorTask(BatchTask):
+    """Vectorized MotorAssessment"""
+    USER_MOVEMENT = UserMovement.Burst
+
+    def __init__(self, sim, trial_count: int):
+        super().__init__(sim, trial_count)
+
+        # Randomized order of flexion/extension phases of every patient (trial_count each)
+        self.phases = np.zeros((sim.patient_count, 2 * trial_count), dtype=bool)
+        self.phases[:, :trial_count] = True
+        self.phases = sim.rng.permuted(self.phases, axis=1)
+
+        # Maximum absolute velocity reached within the current trial and within every finished trial
+        self.user_velocity = np.zeros(sim.patient_count)
+        self.trial_user_velocity = np.full((sim.patient_count, 2 * trial_count), np.nan)
+
+        self._prepare_next_trial_or_finish(sim, np.ones(sim.patient_count, dtype=bool))
+
+    def on_start(self, sim, mask: np.ndarray):
+        # Direct robot to move to starting position within 3 seconds
+        mask = mask & (self.state == S.STANDBY)
+        self.start_linear_move(sim, mask, sim.starting_position, 3.0)
+        self.state[mask] = S.MOVING_TO_START
+
+    def on_timeout(self, sim, mask: np.ndarray):
+        # Time is up, lock movement and wait for next trial to start (if any)
+        mask = mask & (self.state == S.USER_INPUT)
+        self.trial_user_velocity[mask, sim.trial[mask] - 1] = self.user_velocity[mask]
+        sim.target_state[mask] = False
+        sim.lock_movement(mask)
+        self._prepare_next_trial_or_finish(sim, mask)
+
+    def on_update(self, sim):
+        # Track maximum velocity of the patients which are already moving
+        moving = self.state == S.USER_INPUT
+        np.maximum(self.user_velocity, np.where(moving, np.abs(sim.velocity), 0.0), out=self.user_velocity)
+
+        # Allow user movement for 4 seconds
+        arrived = self.linear_move(sim, self.state == S.MOVING_TO_START)
+        sim.target_state[arrived] = True
+        sim.unlock_movement(arrived)
+        self.user_velocity[arrived] = 0.0
+        self.start_timeout(sim, arrived, 4.0)
+        self.state[arrived] = S.USER_INPUT
+
+    def _prepare_next_trial_or_finish(self, sim, mask: np.ndarray):
+        finished = mask & (sim.trial == self.phases.shape[1])
+        self.state[finished] = S.FINISHED
+
+        mask = mask & ~finished
+        rows = np.flatnonzero(mask)
+        # Set start and end position according to random phase
+        flexion = self.phases[rows, sim.trial[rows]]
+        sim.starting_position[rows] = np.where(flexion, 30.0, 70.0) * self.direction[rows]
+        sim.target_position[rows] = np.where(flexion, 70.0, 30.0) * self.direction[rows]
+        sim.trial[rows] += 1
+        self.state[rows] = S.STANDBY
@@ -1,19 +1,29 @@
 import ast
 import os
 import socket
+import threading
+import time
 from configparser import ConfigParser
-from dataclasses import dataclass, asdict, fields
+from dataclasses import dataclass, asdict, fields, field, replace
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
+from mike_simulator.ftp import FtpMode
 from mike_simulator.input import InputMethod
+from mike_simulator.log_sinks import LogSinkType
+from mike_simulator.tracing import ProfileFormat, ProfilerClock
+from mike_simulator.util.gc_control import GcMode
+from mike_simulator.transport.fanout import parse_endpoints
 
 
-@dataclass
+@dataclass(frozen=True)
 class IniSection:
     """
     Base class for ini section data classes.
 
     Ensures that all attributes which are passed to the constructor are converted to the declared types.
-    Also calls the validation function which can be used to implement sanity checks for the configuration values.
+    Also calls the validation function which can be used to implement sanity checks for the configuration values,
+    and derive() which precomputes values derived from the configuration entries.
+    Sections are immutable, a changed configuration always results in new section objects.
     """
     def __post_init__(self):
         # Automatic type conversion
@@ -21,10 +31,11 @@ class IniSection:
             val = getattr(self, field.name)
             if field.type != str and isinstance(val, str):
                 try:
-                    setattr(self, field.name, field.type(ast.literal_eval(val)))
+                    object.__setattr__(self, field.name, field.type(ast.literal_eval(val)))
                 except Exception:
                     raise ValueError(f'{val} could not be parsed or converted to correct type for field {field.name}')
         self.validate()
+        self.derive()
 
     def validate(self):
         """
@@ -34,11 +45,18 @@ class IniSection:
         """
         raise NotImplementedError()
 
+    def derive(self):
+        """Precompute values derived from the fields (stored as additional attributes using _set_derived)."""
+        pass
 
-@dataclass
+    def _set_derived(self, name: str, value: Any):
+        object.__setattr__(self, name, value)
+
+
+@dataclass(frozen=True)
 class Config:
     """
-    Data class corresponding to the ini file structure
+    Data class corresponding to the ini file structure (immutable snapshot of the configuration)
 
     Contains one IniSection subclass and a corresponding instance variable for every ini section.
     The name of each of those instance variable defines the ini section name.
@@ -48,7 +66,10 @@ class Config:
     classes (or to create a new section class and add it in there).
     """
 
-    @dataclass
+    # Incremented by ConfigService for every configuration it applies (0 = not applied yet)
+    version = 0
+
+    @dataclass(frozen=True)
     class InputSection(IniSection):
         method: str = 'Keyboard'
 
@@ -56,32 +77,103 @@ class Config:
             supported_input_methods = [v.name for v in InputMethod]
             if self.method not in supported_input_methods:
                 raise ValueError(f'Input method must be one of {supported_input_methods}')
-    Input: InputSection = InputSection()
 
-    @dataclass
+        def derive(self):
+            self._set_derived('input_method', InputMethod[self.method])
+    Input: InputSection = field(default_factory=InputSection)
+
+    @dataclass(frozen=True)
     class LoggingSection(IniSection):
         enabled: bool = True
         log_dir: str = './logs'
         data_root_dir: str = os.path.join('media', 'sda1')
 
+        # Where log rows go: Csv (files below log_dir) or Stream (binary records sent to a telemetry collector)
+        sink: str = 'Csv'
+
+        # Collector address ('host:port' or 'unix:path'), send buffer size [bytes] (rows are dropped while it is
+        # full) and interval between connection attempts [s]
+        stream_address: str = '127.0.0.1:6670'
+        stream_buffer_size: int = 4 * 1024 * 1024
+        stream_reconnect_interval: float = 1.0
+
         def validate(self):
-            pass
-    Logging: LoggingSection = LoggingSection()
+            supported_sinks = [v.name for v in LogSinkType]
+            if self.sink not in supported_sinks:
+                raise ValueError(f'Logging sink must be one of {supported_sinks}')
+            if not self.stream_address.startswith('unix:'):
+                host, _, port = self.stream_address.rpartition(':')
+                if not host or not port.isdigit():
+                    raise ValueError('Logging.stream_address must be of the form host:port or unix:path')
+            if self.stream_buffer_size <= 0 or self.stream_reconnect_interval <= 0.0:
+                raise ValueError('Logging.stream_buffer_size and stream_reconnect_interval must be positive')
 
-    @dataclass
+        def derive(self):
+            self._set_derived('sink_type', LogSinkType[self.sink])
+    Logging: LoggingSection = field(default_factory=LoggingSection)
+
+    @dataclass(frozen=True)
     class NetworkSection(IniSection):
         server_bind_ip: str = '127.0.0.1'
 
         # Address at which the frontend is listening for the updated motor state
         motor_data_port: int = 6661
 
+        # Additional receivers of the motor data stream: comma separated host:port list and multicast group
+        # (which receives the stream at motor_data_port, empty to disable) with the TTL of its packets
+        motor_data_subscribers: str = ''
+        motor_data_multicast_group: str = ''
+        motor_data_multicast_ttl: int = 1
+
+        # Number of consecutive motor states sent in one datagram (1 = one motor state per datagram as expected by
+        # the frontend, >1 = batched packets with header and sequence number, see transport/batching.py)
+        motor_data_samples_per_packet: int = 1
+
         # Addresses at which the simulator should listen for commands and patient data
         control_port: int = 6664
         patient_port: int = 6662
 
+        # Probability that a motor data packet is dropped (in the good state if burst loss is enabled)
         motor_data_packet_loss_rate: float = 0.0
 
+        # Burst loss (Gilbert-Elliott model), enabled if the enter rate is > 0
+        # Per packet probabilities of entering / leaving the bad state and loss probability in the bad state
+        motor_data_burst_enter_rate: float = 0.0
+        motor_data_burst_exit_rate: float = 0.5
+        motor_data_burst_loss_rate: float = 1.0
+
+        # Fixed latency and standard deviation of the latency jitter [s]
+        motor_data_latency: float = 0.0
+        motor_data_latency_jitter: float = 0.0
+
+        # Probability that a packet is held back by motor_data_reorder_delay [s] (overtaken by later packets)
+        motor_data_reorder_rate: float = 0.0
+        motor_data_reorder_delay: float = 0.005
+
+        # Probability that a packet is sent twice
+        motor_data_duplication_rate: float = 0.0
+
+        # Link bandwidth [bytes/s] (0 = unlimited) and maximum queueing delay [s] before packets are dropped
+        motor_data_bandwidth_limit: float = 0.0
+        motor_data_max_queue_delay: float = 0.1
+
+        # Seed for the network impairment random number generators (-1 = random seed)
+        impairment_seed: int = -1
+
         simulate_ftp_server: bool = False
+        ftp_port: int = 21
+
+        # Run the ftp server on a worker thread of the simulator process instead of a separate process
+        ftp_in_process: bool = True
+
+        # Indexed: directory listings from an in-memory index of the session files, Filesystem: from the disk
+        ftp_mode: str = 'Indexed'
+
+        # Zero-copy file transfers, transfer rate limit per connection [bytes/s] (0 = unlimited, a limit disables
+        # sendfile) and maximum number of simultaneous connections
+        ftp_sendfile: bool = True
+        ftp_transfer_limit: float = 0.0
+        ftp_max_connections: int = 8
 
         def validate(self):
             try:
@@ -89,48 +181,398 @@ class Config:
             except socket.error:
                 raise ValueError('Not a valid ip address')
 
+            parse_endpoints(self.motor_data_subscribers)
+            if self.motor_data_multicast_group:
+                try:
+                    is_multicast = socket.inet_aton(self.motor_data_multicast_group)[0] >> 4 == 0xE
+                except socket.error:
+                    is_multicast = False
+                if not is_multicast:
+                    raise ValueError('Network.motor_data_multicast_group must be an IPv4 multicast address')
+            if not (1 <= self.motor_data_samples_per_packet <= 255):
+                raise ValueError('Network.motor_data_samples_per_packet must be between 1 and 255')
+            supported_ftp_modes = [v.name for v in FtpMode]
+            if self.ftp_mode not in supported_ftp_modes:
+                raise ValueError(f'Network.ftp_mode must be one of {supported_ftp_modes}')
+            if self.ftp_max_connections < 1:
+                raise ValueError('Network.ftp_max_connections must be positive')
+            if not (0 <= self.motor_data_multicast_ttl < 256):
+                raise ValueError('Network.motor_data_multicast_ttl must be between 0 and 255')
+
             for name, value in vars(self).items():
                 if 'port' in name and not (0 <= value < (1 << 16)):
                     raise ValueError(f'Network.{name} must be unsigned 16-bit integer')
-                if 'loss_rate' in name and not (0.0 <= value <= 1.0):
+                if name.endswith('_rate') and not (0.0 <= value <= 1.0):
                     raise ValueError(f'Network.{name} must be between 0 and 1')
-    Network: NetworkSection = NetworkSection()
+                if any(s in name for s in ('latency', 'delay', 'limit')) and value < 0.0:
+                    raise ValueError(f'Network.{name} must not be negative')
+
+        def derive(self):
+            self._set_derived('ftp_mode_type', FtpMode[self.ftp_mode])
+            self._set_derived('motor_data_subscriber_endpoints', parse_endpoints(self.motor_data_subscribers))
+    Network: NetworkSection = field(default_factory=NetworkSection)
+
+    @dataclass(frozen=True)
+    class RealtimeSection(IniSection):
+        # Garbage collection while cycles are paced by the wall clock: Automatic (Python default) or Scheduled
+        # (long-lived objects frozen, collections in idle periods, see util/gc_control.py)
+        gc_mode: str = 'Scheduled'
+
+        # Pending objects (allocations minus deallocations) after which a young collection runs (Scheduled only)
+        gc_young_threshold: int = 700
+
+        # Allocation sampling with tracemalloc: one window of alloc_sample_cycles cycles every
+        # alloc_sample_interval seconds (0 = disabled), the allocations per cycle are printed after every window
+        alloc_sample_interval: float = 0.0
+        alloc_sample_cycles: int = 1000
+
+        def validate(self):
+            supported_gc_modes = [v.name for v in GcMode]
+            if self.gc_mode not in supported_gc_modes:
+                raise ValueError(f'Realtime.gc_mode must be one of {supported_gc_modes}')
+            if self.gc_young_threshold < 1 or self.alloc_sample_cycles < 1:
+                raise ValueError('Realtime.gc_young_threshold and alloc_sample_cycles must be positive')
+            if self.alloc_sample_interval < 0.0:
+                raise ValueError('Realtime.alloc_sample_interval must not be negative')
+
+        def derive(self):
+            self._set_derived('gc_mode_type', GcMode[self.gc_mode])
+    Realtime: RealtimeSection = field(default_factory=RealtimeSection)
 
-    @dataclass
+    @dataclass(frozen=True)
+    class SharedMemorySection(IniSection):
+        # Publish the motor state of every cycle in a shared memory ring buffer for tools running on the same host
+        enabled: bool = False
+        name: str = 'mike_simulator_motor_state'
+        slot_count: int = 4096
+
+        def validate(self):
+            if self.slot_count < 1:
+                raise ValueError('SharedMemory.slot_count must be positive')
+    SharedMemory: SharedMemorySection = field(default_factory=SharedMemorySection)
+
+    @dataclass(frozen=True)
     class TasksSection(IniSection):
         sensorimotor_movement_duration: float = 30.0
 
+        # Compute metrics of every trial while the session runs (printed at the end of each trial)
+        online_metrics: bool = True
+
+        # Directory containing protocol files (JSON/YAML task definitions), empty to only use the built-in tasks
+        protocol_dir: str = './protocols'
+
         def validate(self):
             pass
-    Tasks: TasksSection = TasksSection()
+    Tasks: TasksSection = field(default_factory=TasksSection)
+
+    @dataclass(frozen=True)
+    class TracingSection(IniSection):
+        # Trace the latency of control messages (receipt until the first motor state reflecting them was sent)
+        control_latency: bool = False
+
+        # Chrome trace / Perfetto file written when the frontend disconnects (empty = no trace file) and maximum
+        # number of events it contains
+        trace_file: str = ''
+        trace_max_events: int = 100000
+
+        # Local http endpoint ('host:port', empty = disabled) serving /metrics (Prometheus) and /metrics.json
+        metrics_address: str = ''
+
+        # Sampling profiler of the simulator thread, can also be toggled at runtime with the hotkey (serve only,
+        # empty = none) or a ToggleProfiler control message. A profile file per session is written to profile_dir.
+        profiler_enabled: bool = False
+        profiler_clock: str = 'Cpu'
+        profiler_interval: float = 0.005
+        profile_format: str = 'Speedscope'
+        profile_dir: str = './profiles'
+        profiler_hotkey: str = 'f9'
+
+        def validate(self):
+            if self.trace_max_events < 1:
+                raise ValueError('Tracing.trace_max_events must be positive')
+            supported_clocks = [v.name for v in ProfilerClock]
+            if self.profiler_clock not in supported_clocks:
+                raise ValueError(f'Tracing.profiler_clock must be one of {supported_clocks}')
+            supported_formats = [v.name for v in ProfileFormat]
+            if self.profile_format not in supported_formats:
+                raise ValueError(f'Tracing.profile_format must be one of {supported_formats}')
+            if self.profiler_interval <= 0.0:
+                raise ValueError('Tracing.profiler_interval must be positive')
+            if self.metrics_address:
+                host, _, port = self.metrics_address.rpartition(':')
+                if not host or not port.isdigit() or int(port) >= (1 << 16):
+                    raise ValueError('Tracing.metrics_address must be of the form host:port')
+
+        def derive(self):
+            self._set_derived('profiler_clock_type', ProfilerClock[self.profiler_clock])
+            self._set_derived('profile_format_type', ProfileFormat[self.profile_format])
+    Tracing: TracingSection = field(default_factory=TracingSection)
+
+
+# Prefix of environment variables overriding configuration entries (e.g. MIKE_SIMULATOR_NETWORK_FTP_PORT=2121)
+ENV_PREFIX = 'MIKE_SIMULATOR_'
+
+# Parsed ini files by path: ((mtime, size) of the parsed file, parsed configuration)
+_parse_cache: Dict[str, Tuple[Tuple[int, int], Config]] = {}
+
+
+def parse_configuration(filename: str) -> Config:
+    """
+    Parse and validate the specified ini file into a new Config object.
+    Sections and entries which are missing in the file keep their default values.
+    Files are only parsed again once they were modified, otherwise the previously parsed configuration is returned.
+
+    :param filename: path to the configuration ini file
+    :raise ValueError: if the file contains an invalid configuration value
+    """
+    path = os.path.realpath(filename)
+    try:
+        stat = os.stat(path)
+        file_version = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        file_version = None
+    cached = _parse_cache.get(path)
+    if cached is not None and cached[0] == file_version:
+        return cached[1]
+
+    config = ConfigParser()
+    config.read(path)
+    sections = {}
+    section_classes = {f.name: f.default_factory for f in fields(Config)}
+    for section in config.sections():
+        if section in section_classes:
+            section_class = section_classes[section]
+            section_fields = {f.name for f in fields(section_class)}
+            cfg_values = {k: v for k, v in config[section].items() if k in section_fields}
+            sections[section] = section_class(**cfg_values)
+    new_cfg = Config(**sections)
+    if file_version is not None:
+        _parse_cache[path] = (file_version, new_cfg)
+    return new_cfg
+
 
+def apply_overrides(config: Config, overrides: Mapping[str, Any]) -> Config:
+    """
+    Return a copy of config in which the given entries are replaced.
+
+    :param overrides: new values by 'Section.name', strings are parsed like values in the ini file
+    :raise ValueError: if an entry does not exist or a value is invalid
+    """
+    section_values: Dict[str, Dict[str, Any]] = {}
+    section_names = {f.name for f in fields(Config)}
+    for key, value in overrides.items():
+        section, _, name = key.partition('.')
+        if section not in section_names or name not in {f.name for f in fields(getattr(config, section))}:
+            raise ValueError(f'Unknown configuration entry {key}')
+        section_values.setdefault(section, {})[name] = value
+    if not section_values:
+        return config
+    return replace(config, **{section: replace(getattr(config, section), **values)
+                              for section, values in section_values.items()})
+
+
+# Configuration entry ('Section.name') by name of the environment variable overriding it
+_entries_by_env_name = {f'{ENV_PREFIX}{section.name}_{entry.name}'.upper(): f'{section.name}.{entry.name}'
+                        for section in fields(Config) for entry in fields(section.default_factory)}
+
+
+def environment_overrides(environ: Mapping[str, str] = os.environ) -> Dict[str, str]:
+    """Return the configuration entries set by environment variables ENV_PREFIX + SECTION_NAME (upper case)."""
+    return {_entries_by_env_name[name]: environ[name] for name in environ if name in _entries_by_env_name}
+
+
+def parse_override(spec: str) -> Tuple[str, str]:
+    """
+    Parse a command line override of the form Section.name=value.
+
+    :raise ValueError: if spec is malformed
+    """
+    key, sep, value = spec.partition('=')
+    if not sep or '.' not in key:
+        raise ValueError(f'Configuration override {spec} must be of the form Section.name=value')
+    return key.strip(), value.strip()
+
+
+class ActiveConfig:
+    """
+    The global configuration 'cfg': sections of the snapshot which is currently applied.
+
+    The sections are plain attributes of this object (no indirection on hot paths), which ConfigService rebinds
+    to the sections of a new snapshot between two simulator cycles. Code which needs a consistent view of all
+    sections across cycles should keep a reference to the snapshot instead.
+    """
+    Input: Config.InputSection
+    Logging: Config.LoggingSection
+    Network: Config.NetworkSection
+    Realtime: Config.RealtimeSection
+    SharedMemory: Config.SharedMemorySection
+    Tasks: Config.TasksSection
+    Tracing: Config.TracingSection
+
+    def __init__(self, snapshot: Config):
+        self.snapshot = snapshot
+        self._use(snapshot)
+
+    @property
+    def version(self) -> int:
+        return self.snapshot.version
+
+    def _use(self, snapshot: Config):
+        self.snapshot = snapshot
+        for section in fields(Config):
+            setattr(self, section.name, getattr(snapshot, section.name))
+
+
+class ConfigService:
+    """
+    Keeps the global configuration object in sync with the configuration file.
+
+    A polling watcher thread re-parses the file whenever it was modified. Valid configurations are staged and
+    only applied to 'cfg' when the simulator loop calls apply_pending() between two cycles, so that a cycle
+    never observes a partially updated configuration. Subscribers are notified about every changed section.
+    Invalid configurations are reported and ignored (the previous configuration stays active).
+
+    Every applied configuration is an immutable snapshot with a new version. Entries set in the environment
+    (see environment_overrides) and overrides given with set_overrides (e.g. from the command line) are applied
+    on top of the file.
+    """
 
-def load_configuration(filename: str = './simulator_config.ini'):
+    def __init__(self):
+        self.filename: Optional[str] = None
+        self.overrides: Dict[str, Any] = {}
+        self._mtime = None
+        # Parsed file and overrides from which the current configuration was built (see load)
+        self._sources: Optional[Tuple[Config, Dict[str, Any]]] = None
+        self._pending: Optional[Config] = None
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Callable[[IniSection], None]]] = {}
+        self._watcher: Optional[threading.Thread] = None
+
+    @property
+    def snapshot(self) -> Config:
+        """The currently applied configuration."""
+        return cfg.snapshot
+
+    def load(self, filename: str, overrides: Optional[Mapping[str, Any]] = None):
+        """
+        Load the configuration file into 'cfg' (creating it with default values if it does not exist).
+
+        :param overrides: additional overrides, only kept if the resulting configuration is valid
+        :raise ValueError: if the configuration contains an invalid value (nothing is applied in that case)
+        """
+        self.filename = os.path.realpath(filename)
+        if not os.path.exists(self.filename):
+            # If no configuration file exists, create one with the default settings as specified by the Config dataclass
+            os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+            config = ConfigParser()
+            config.read_dict(asdict(Config()))
+            with open(self.filename, 'w') as cfg_file:
+                config.write(cfg_file)
+        self._mtime = os.stat(self.filename).st_mtime_ns
+        file_cfg = parse_configuration(self.filename)
+        all_overrides = {**environment_overrides(), **self.overrides, **(overrides or {})}
+        if self._sources is not None and self._sources[0] is file_cfg and self._sources[1] == all_overrides:
+            # Unmodified file and overrides, the configuration is already applied
+            return
+        new_cfg = apply_overrides(file_cfg, all_overrides)
+        if overrides:
+            self.overrides.update(overrides)
+        self._sources = (file_cfg, all_overrides)
+        self._apply(new_cfg)
+
+    def set_overrides(self, overrides: Mapping[str, Any]):
+        """
+        Override configuration entries (by 'Section.name') on top of the file and the environment and apply them.
+
+        :raise ValueError: if an entry does not exist or a value is invalid (nothing is applied in that case)
+        """
+        new_cfg = apply_overrides(self.snapshot, overrides)
+        self.overrides.update(overrides)
+        self._sources = None
+        self._apply(new_cfg)
+
+    def subscribe(self, section: str, callback: Callable[[IniSection], None]):
+        """Register callback which is called with the new section object whenever the given section changed."""
+        self._subscribers.setdefault(section, []).append(callback)
+
+    def unsubscribe(self, section: str, callback: Callable[[IniSection], None]):
+        self._subscribers.get(section, []).remove(callback)
+
+    def start_watching(self, poll_interval: float = 1.0):
+        """Start a background thread which checks the configuration file for modifications."""
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, args=(poll_interval,), daemon=True)
+            self._watcher.start()
+
+    def check_for_changes(self) -> bool:
+        """
+        Re-parse the configuration file if it was modified and stage it for apply_pending().
+
+        :return: True if a new valid configuration was staged
+        """
+        try:
+            mtime = os.stat(self.filename).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        try:
+            new_cfg = self._with_overrides(parse_configuration(self.filename))
+        except ValueError as err:
+            print(f'Ignoring invalid configuration change: {err}')
+            return False
+        with self._lock:
+            self._pending = new_cfg
+        self._sources = None
+        return True
+
+    def apply_pending(self):
+        """Apply a staged configuration (if any), should be called by the simulator loop between two cycles."""
+        if self._pending is None:
+            return
+        with self._lock:
+            new_cfg, self._pending = self._pending, None
+        print('Configuration file changed, applying new configuration')
+        self._apply(new_cfg)
+
+    def _with_overrides(self, file_cfg: Config) -> Config:
+        return apply_overrides(file_cfg, {**environment_overrides(), **self.overrides})
+
+    def _apply(self, new_cfg: Config):
+        current = cfg.snapshot
+        changed = [f.name for f in fields(Config) if getattr(current, f.name) != getattr(new_cfg, f.name)]
+        if not changed and current.version > 0:
+            return
+        # Keep the unchanged section objects, so that subscribers and 'is' checks see them as unchanged
+        new_cfg = replace(current, **{section: getattr(new_cfg, section) for section in changed})
+        object.__setattr__(new_cfg, 'version', current.version + 1)
+        cfg._use(new_cfg)
+        for section in changed:
+            for callback in self._subscribers.get(section, []):
+                callback(getattr(cfg, section))
+
+    def _watch(self, poll_interval: float):
+        while True:
+            time.sleep(poll_interval)
+            self.check_for_changes()
+
+
+def load_configuration(filename: str = './simulator_config.ini', overrides: Optional[Mapping[str, Any]] = None):
     """
     Load configuration from specified ini file into the global configuration object 'cfg'.
     If the configuration file does not exist, it is created and populated with the default values as specified
-    by the Config dataclass.
+    by the Config dataclass. Loading an unmodified file again does not parse it again.
 
     :param filename: path to the configuration ini file
+    :param overrides: values by 'Section.name' which override the file (and the environment), e.g. from the CLI
+    :raise ValueError: if the configuration contains an invalid value
     """
-    global cfg
-    filename = os.path.realpath(filename)
-    config = ConfigParser()
-    if os.path.exists(filename):
-        # Read configuration file and set cfg entries based on its contents
-        config.read(filename)
-        for section in config.sections():
-            if hasattr(Config, section):
-                section_class = type(getattr(Config, section))
-                cfg_values = {k: v for k, v in config[section].items() if hasattr(section_class, k)}
-                setattr(cfg, section, section_class(**cfg_values))
-    else:
-        # If no configuration file exists, create one with the default settings as specified by the Config dataclass
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
-        config.read_dict(asdict(cfg))
-        with open(filename, 'w') as cfg_file:
-            config.write(cfg_file)
-
-
-# Global configuration object
-cfg: Config = Config()
+    config_service.load(filename, overrides)
+
+
+# Global configuration object, refers to the sections of the current configuration snapshot
+cfg: ActiveConfig = ActiveConfig(Config())
+
+# Global configuration service, keeps 'cfg' in sync with the configuration file
+config_service = ConfigService()
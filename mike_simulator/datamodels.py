@@ -83,6 +83,13 @@ class ControlResponse:
     TargetPosition: float = 0
     HapticBumpForce: float = 0
 
+    def command_name(self) -> str:
+        """Return the name of the command (in the order in which BackendSimulator.update_control_data checks them)."""
+        for name in ('EmergencyStop', 'Restart', 'Close', 'Start', 'FrontendStarted'):
+            if getattr(self, name):
+                return name
+        return 'Control'
+
 
 @dataclass
 class PatientResponse:
@@ -94,7 +101,7 @@ class PatientResponse:
     StudyName: str = ''
 
 
-@dataclass
+@dataclass(slots=True)
 class MotorState:
     Counter: UInt32 = 0
     Time: float = 0.0
@@ -119,6 +126,15 @@ class MotorState:
         assert 'StartingPosition' not in kwargs
         return MotorState(**kwargs)
 
+    def reset(self, **kwargs):
+        """
+        Reset all fields to their default values in place (without allocating a new motor state).
+
+        :param kwargs: used to specify values of additional MotorState fields
+        """
+        assert 'StartingPosition' not in kwargs
+        self.__init__(**kwargs)
+
     def move_using(self, auto_mover: AutoMover) -> AutoMover.MovementState:
         """
         Move the robot position using the given mover.
@@ -127,13 +143,16 @@ class MotorState:
         :return: MovementState which stores whether the movement described by auto_mover has finished
         """
         self.Position, state = auto_mover.get_current_position_and_state()
-        PrintUtil.print_inplace(f'Current robot position: {self.Position:.3f}°')
+        if PrintUtil.inplace_due():
+            PrintUtil.print_inplace(f'Current robot position: {self.Position:.3f}°')
         return state
 
     def move_target_using(self, auto_mover: AutoMover) -> AutoMover.MovementState:
         """Move the robot's *target* position using the given mover."""
         self.TargetPosition, state = auto_mover.get_current_position_and_state()
-        PrintUtil.print_inplace(f'Current robot position: {self.Position:.3f}°, target position: {self.TargetPosition:.3f}°')
+        if PrintUtil.inplace_due():
+            PrintUtil.print_inplace(f'Current robot position: {self.Position:.3f}°, '
+                                    f'target position: {self.TargetPosition:.3f}°')
         return state
 
     def is_at_position(self, position: float) -> bool:
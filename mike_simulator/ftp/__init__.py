@@ -0,0 +1,25 @@
+import importlib
+from enum import Enum
+
+# The ftp server (and with it pyftpdlib) is imported on first access only, the logger only needs the session index
+_modules_by_name = {
+    'SessionIndex': 'session_index',
+    'IndexedFilesystem': 'server',
+    'create_ftp_server': 'server',
+    'FtpService': 'server',
+    'run_ftp_server': 'server',
+}
+__all__ = list(_modules_by_name)
+
+
+def __getattr__(name):
+    if name in _modules_by_name:
+        return getattr(importlib.import_module(f'.{_modules_by_name[name]}', __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+class FtpMode(Enum):
+    # Listings are read from the filesystem on every request (pyftpdlib default)
+    Filesystem = 0
+    # Listings are served from an in-memory index of the session files, updated by the logger
+    Indexed = 1
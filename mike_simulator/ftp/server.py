@@ -0,0 +1,189 @@
+"""
+Simulated ftp server, through which the frontend downloads the session logs (as from the myRIO).
+
+File transfers use sendfile (zero-copy, the file content never passes through the Python process) unless a
+transfer rate limit is configured. In FtpMode.Indexed, directory listings are served from a SessionIndex instead
+of walking the Study/Subject/Task/Hand tree on every request.
+"""
+import errno
+import os
+import queue
+import stat
+import threading
+from multiprocessing import Queue
+from typing import Optional
+
+from pyftpdlib.authorizers import DummyAuthorizer
+from pyftpdlib.filesystems import AbstractedFS
+from pyftpdlib.handlers import FTPHandler, DTPHandler, ThrottledDTPHandler, sendfile
+from pyftpdlib.ioloop import IOLoop
+from pyftpdlib.servers import FTPServer
+
+from mike_simulator.config import cfg, load_configuration
+from mike_simulator.ftp import FtpMode
+from mike_simulator.ftp.session_index import SessionIndex
+from mike_simulator.logger import Logger
+
+_UID = os.getuid() if hasattr(os, 'getuid') else 0
+_GID = os.getgid() if hasattr(os, 'getgid') else 0
+
+
+class IndexedFilesystem(AbstractedFS):
+    """Read-only filesystem view whose metadata comes from the session index of the command channel"""
+
+    def _lookup(self, path: str):
+        entry = self.cmd_channel.session_index.lookup(self.fs2ftp(path).lstrip('/'))
+        if entry is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        return entry
+
+    def chdir(self, path: str):
+        # Unlike the default implementation, this does not change the working directory of the whole process
+        if not self.isdir(path):
+            raise NotADirectoryError(errno.ENOTDIR, os.strerror(errno.ENOTDIR), path)
+        self.cwd = self.fs2ftp(path)
+
+    def listdir(self, path: str):
+        names = self.cmd_channel.session_index.listdir(self.fs2ftp(path).lstrip('/'))
+        if names is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        return names
+
+    def listdirinfo(self, path: str):
+        return self.listdir(path)
+
+    def stat(self, path: str) -> os.stat_result:
+        is_dir, size, mtime = self._lookup(path)
+        mode = (stat.S_IFDIR | 0o555) if is_dir else (stat.S_IFREG | 0o444)
+        return os.stat_result((mode, 0, 0, 1, _UID, _GID, size, mtime, mtime, mtime))
+
+    lstat = stat
+
+    def isfile(self, path: str) -> bool:
+        entry = self.cmd_channel.session_index.lookup(self.fs2ftp(path).lstrip('/'))
+        return entry is not None and not entry[0]
+
+    def isdir(self, path: str) -> bool:
+        entry = self.cmd_channel.session_index.lookup(self.fs2ftp(path).lstrip('/'))
+        return entry is not None and entry[0]
+
+    def islink(self, path: str) -> bool:
+        return False
+
+    def lexists(self, path: str) -> bool:
+        return self.cmd_channel.session_index.lookup(self.fs2ftp(path).lstrip('/')) is not None
+
+    def getsize(self, path: str) -> int:
+        return self._lookup(path)[1]
+
+    def getmtime(self, path: str) -> float:
+        return self._lookup(path)[2]
+
+
+def create_ftp_server(log_dir: str, session_index: Optional[SessionIndex] = None, ioloop=None) -> FTPServer:
+    """
+    Create an ftp server (anonymous, read-only) for the log directory, configured from the [Network] section.
+
+    :param log_dir: directory served as ftp root
+    :param session_index: index of the files in log_dir, required in FtpMode.Indexed
+    :param ioloop: pyftpdlib IOLoop on which the server runs (None = default loop)
+    """
+    authorizer = DummyAuthorizer()
+    authorizer.add_anonymous(os.path.realpath(log_dir))
+
+    transfer_limit = int(cfg.Network.ftp_transfer_limit)
+    if transfer_limit > 0:
+        # Throttled transfers are sent in chunks by the ftp server (pyftpdlib cannot throttle sendfile)
+        dtp_handler = type('LogDTPHandler', (ThrottledDTPHandler, ), {'read_limit': transfer_limit,
+                                                                     'write_limit': transfer_limit})
+    else:
+        dtp_handler = DTPHandler
+
+    indexed = cfg.Network.ftp_mode_type == FtpMode.Indexed
+    handler = type('LogFTPHandler', (FTPHandler, ), {
+        'authorizer': authorizer,
+        'dtp_handler': dtp_handler,
+        'abstracted_fs': IndexedFilesystem if indexed else AbstractedFS,
+        'session_index': session_index,
+        'use_sendfile': cfg.Network.ftp_sendfile and sendfile is not None,
+    })
+
+    server = FTPServer((cfg.Network.server_bind_ip, cfg.Network.ftp_port), handler, ioloop=ioloop)
+    server.max_cons = cfg.Network.ftp_max_connections
+    return server
+
+
+class FtpService:
+    """Ftp server running on its own IO loop in a worker thread of the simulator process"""
+
+    def __init__(self, log_dir: str, poll_interval: float = 0.2):
+        """
+        :param log_dir: directory served as ftp root
+        :param poll_interval: maximum time [s] until stop() takes effect
+        """
+        self.log_dir = log_dir
+        self.poll_interval = poll_interval
+        self.session_index: Optional[SessionIndex] = None
+        self.server: Optional[FTPServer] = None
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Bind the ftp port and start serving in a daemon thread."""
+        if cfg.Network.ftp_mode_type == FtpMode.Indexed:
+            self.session_index = SessionIndex(self.log_dir)
+            self.session_index.scan()
+            # The index is updated directly by the logger (on the simulator thread)
+            Logger.file_closed_listeners.append(self.session_index.add_file)
+
+        self.server = create_ftp_server(self.log_dir, self.session_index, IOLoop())
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, name='FtpService', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Disconnect all clients, close the ftp port and wait for the worker thread to exit."""
+        if self.thread is None:
+            return
+        self.stopped.set()
+        self.thread.join()
+        self.thread = None
+        if self.session_index is not None:
+            Logger.file_closed_listeners.remove(self.session_index.add_file)
+            self.session_index = None
+
+    def _run(self):
+        # The loop is only ever touched from this thread, stop() just sets the event
+        # (driven directly, serve_forever would log the server start on every call)
+        host, port = self.server.address[:2]
+        print(f'Ftp server listening on {host}:{port}')
+        while not self.stopped.is_set():
+            self.server.ioloop.loop(timeout=self.poll_interval, blocking=False)
+        self.server.close_all()
+        self.server = None
+
+
+def run_ftp_server(log_dir: str, closed_files: Optional[Queue] = None, config_overrides: Optional[dict] = None):
+    """
+    Run the ftp server until the process is terminated (target of the ftp server process).
+
+    :param log_dir: directory served as ftp root
+    :param closed_files: queue receiving the filenames of log files closed by the simulator process
+    :param config_overrides: configuration overrides of the simulator process (e.g. from its command line)
+    """
+    load_configuration(overrides=config_overrides)
+    session_index = None
+    if cfg.Network.ftp_mode_type == FtpMode.Indexed:
+        session_index = SessionIndex(log_dir)
+        session_index.scan()
+
+    server = create_ftp_server(log_dir, session_index)
+    if session_index is not None and closed_files is not None:
+        def add_closed_files():
+            try:
+                while True:
+                    session_index.add_file(closed_files.get_nowait())
+            except queue.Empty:
+                pass
+        server.ioloop.call_every(0.5, add_closed_files)
+    server.serve_forever()
@@ -0,0 +1,88 @@
+import os
+import stat
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# Index entry: (is directory, size [bytes], modification time [s])
+Entry = Tuple[bool, int, float]
+
+
+class SessionIndex:
+    """
+    In-memory directory tree of the session files below the log directory.
+
+    The tree is scanned once at startup and afterwards only updated when the logger closes a session file,
+    so directory listings of the ftp server never touch the filesystem.
+    """
+
+    def __init__(self, root: str):
+        """
+        :param root: log directory (root of the ftp server)
+        """
+        self.root = os.path.realpath(root)
+        self.lock = threading.Lock()
+        # Relative directory path ('' = root) -> entry name -> entry
+        self.dirs: Dict[str, Dict[str, Entry]] = {'': {}}
+
+    def scan(self):
+        """Rebuild the index from the files currently below the root directory."""
+        dirs = {'': {}}
+        for dir_path, dir_names, file_names in os.walk(self.root):
+            rel_dir = self._relative(dir_path)
+            entries = dirs.setdefault(rel_dir, {})
+            for name in dir_names:
+                dirs.setdefault(self._join(rel_dir, name), {})
+            for name in dir_names + file_names:
+                try:
+                    st = os.stat(os.path.join(dir_path, name))
+                except OSError:
+                    continue
+                entries[name] = (stat.S_ISDIR(st.st_mode), st.st_size, st.st_mtime)
+        with self.lock:
+            self.dirs = dirs
+
+    def add_file(self, filename: str):
+        """
+        Add (or update) a file and its parent directories.
+
+        :param filename: path of a closed session file, files outside of the root directory are ignored
+        """
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return
+        rel_path = self._relative(os.path.realpath(filename))
+        if rel_path == '' or rel_path.startswith('..'):
+            return
+        with self.lock:
+            rel_dir, name = rel_path.rpartition('/')[::2]
+            self.dirs.setdefault(rel_dir, {})[name] = (False, st.st_size, st.st_mtime)
+            while rel_dir:
+                parent, name = rel_dir.rpartition('/')[::2]
+                parent_entries = self.dirs.setdefault(parent, {})
+                _, size, _ = parent_entries.get(name, (True, 0, 0.0))
+                parent_entries[name] = (True, size, st.st_mtime)
+                rel_dir = parent
+
+    def listdir(self, path: str) -> Optional[List[str]]:
+        """Return the entry names of directory path (relative to the root), None if it is not in the index."""
+        with self.lock:
+            entries = self.dirs.get(path)
+            return None if entries is None else list(entries)
+
+    def lookup(self, path: str) -> Optional[Entry]:
+        """Return the entry of path (relative to the root), None if it is not in the index."""
+        if path == '':
+            return True, 0, 0.0
+        parent, name = path.rpartition('/')[::2]
+        with self.lock:
+            entries = self.dirs.get(parent)
+            return None if entries is None else entries.get(name)
+
+    def _relative(self, path: str) -> str:
+        rel_path = os.path.relpath(path, self.root).replace(os.sep, '/')
+        return '' if rel_path == '.' else rel_path
+
+    @staticmethod
+    def _join(rel_dir: str, name: str) -> str:
+        return f'{rel_dir}/{name}' if rel_dir else name
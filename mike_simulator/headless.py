@@ -0,0 +1,66 @@
+from typing import Optional
+
+from mike_simulator.datamodels import ControlResponse, PatientResponse, MotorState, TaskType, Constants, Int32
+from mike_simulator.input import InputHandler
+from mike_simulator.input.backends.prerecorded_input import PrerecordedInputHandler
+from mike_simulator.simulator import BackendSimulator
+from mike_simulator.util import PrintUtil, SimulatedClock, set_time_source, reset_time_source
+
+
+class HeadlessSimulator:
+    """
+    Runs the backend simulator without network, keyboard or wall clock.
+
+    Every call to step() advances a simulated clock by exactly one cycle and updates the simulator once,
+    so sessions run as fast as the CPU allows and produce the same motor states on every run.
+    While a headless simulator is open, it replaces the global time source and silences console output.
+    """
+
+    def __init__(self, input_handler: Optional[InputHandler] = None, cycle_time: float = Constants.ROBOT_CYCLE_TIME,
+                 quiet: bool = True, logging_enabled: bool = False):
+        """
+        :param input_handler: input handler to use (default: a user who never presses a key)
+        :param cycle_time: simulated time per step [s]
+        :param quiet: whether to silence console output
+        :param logging_enabled: whether to write session logs (timestamps in simulated time)
+        """
+        self.clock = SimulatedClock()
+        self.cycle_time = cycle_time
+        set_time_source(self.clock)
+        PrintUtil.set_enabled(not quiet)
+        self.simulator = BackendSimulator(input_handler if input_handler is not None else PrerecordedInputHandler(),
+                                          realtime=False, logging_enabled=logging_enabled,
+                                          shared_memory_enabled=False)
+
+    def __enter__(self) -> 'HeadlessSimulator':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Restore the wall-clock time source and console output."""
+        self.simulator.close()
+        reset_time_source()
+        PrintUtil.set_enabled(True)
+
+    def select_patient(self, task: TaskType, left_hand: bool = True, trial_count: int = 2,
+                       study_name: str = 'Headless', subject_nr: str = '0', date_time: str = '0'):
+        """Equivalent to the frontend sending a PatientSelect message."""
+        self.simulator.update_patient_data(PatientResponse(LeftHand=left_hand, Task=task, SubjectNr=subject_nr,
+                                                           DateTime=date_time, PhaseTrialCount=Int32(trial_count),
+                                                           StudyName=study_name))
+
+    def start(self, starting_position: float = 0.0, target_position: float = 0.0):
+        """Equivalent to the frontend sending a Start control message."""
+        self.simulator.update_control_data(ControlResponse(Start=True, StartingPosition=starting_position,
+                                                           TargetPosition=target_position))
+
+    def skip(self):
+        """Equivalent to the frontend sending a Skip message."""
+        self.simulator.handle_skip()
+
+    def step(self) -> MotorState:
+        """Advance the simulation by one cycle and return the updated motor state."""
+        self.clock.advance(self.cycle_time)
+        return self.simulator.get_motor_state()
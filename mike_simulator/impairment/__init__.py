@@ -0,0 +1,2 @@
+from .interface import Impairment
+from .pipeline import ImpairmentPipeline
@@ -0,0 +1,51 @@
+import random
+
+from mike_simulator.impairment import ImpairmentPipeline
+from mike_simulator.impairment.models import *
+
+
+# Entries of the Network section which configure the impairment pipeline
+IMPAIRMENT_ENTRIES = ('motor_data_packet_loss_rate', 'motor_data_burst_enter_rate', 'motor_data_burst_exit_rate',
+                      'motor_data_burst_loss_rate', 'motor_data_latency', 'motor_data_latency_jitter',
+                      'motor_data_reorder_rate', 'motor_data_reorder_delay', 'motor_data_duplication_rate',
+                      'motor_data_bandwidth_limit', 'motor_data_max_queue_delay')
+
+
+class ImpairmentFactory:
+    @staticmethod
+    def create_pipeline(network_cfg, seed: int) -> ImpairmentPipeline:
+        """
+        Create the impairment pipeline for outgoing motor data as specified by the network configuration.
+
+        Every impairment model uses its own random number generator derived from seed,
+        so that enabling one model does not change the random sequence observed by the others.
+
+        :param network_cfg: the Network section of the configuration
+        :param seed: seed for the random number generators of the impairment models
+        :return: pipeline containing all enabled impairment models
+        """
+        stages = []
+        if network_cfg.motor_data_burst_enter_rate > 0.0:
+            stages.append(GilbertElliottLoss(network_cfg.motor_data_burst_enter_rate,
+                                             network_cfg.motor_data_burst_exit_rate,
+                                             network_cfg.motor_data_packet_loss_rate,
+                                             network_cfg.motor_data_burst_loss_rate,
+                                             random.Random(seed + 2)))
+        elif network_cfg.motor_data_packet_loss_rate > 0.0:
+            stages.append(UniformLoss(network_cfg.motor_data_packet_loss_rate, random.Random(seed + 2)))
+
+        if network_cfg.motor_data_duplication_rate > 0.0:
+            stages.append(Duplication(network_cfg.motor_data_duplication_rate, random.Random(seed + 3)))
+
+        if network_cfg.motor_data_bandwidth_limit > 0.0:
+            stages.append(BandwidthCap(network_cfg.motor_data_bandwidth_limit, network_cfg.motor_data_max_queue_delay))
+
+        if network_cfg.motor_data_latency > 0.0 or network_cfg.motor_data_latency_jitter > 0.0:
+            stages.append(Latency(network_cfg.motor_data_latency, network_cfg.motor_data_latency_jitter,
+                                  random.Random(seed + 4)))
+
+        if network_cfg.motor_data_reorder_rate > 0.0:
+            stages.append(Reordering(network_cfg.motor_data_reorder_rate, network_cfg.motor_data_reorder_delay,
+                                     random.Random(seed + 5)))
+
+        return ImpairmentPipeline(stages)
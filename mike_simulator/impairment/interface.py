@@ -0,0 +1,20 @@
+from abc import ABCMeta, abstractmethod
+from typing import Tuple
+
+
+class Impairment(metaclass=ABCMeta):
+    """Abstract interface for a network impairment model applied to outgoing packets"""
+
+    # Result for dropped packets (shared to avoid allocations)
+    DROP: Tuple[float, ...] = ()
+
+    @abstractmethod
+    def process(self, release_time: float, size: int) -> Tuple[float, ...]:
+        """
+        Apply the impairment to a single packet.
+
+        :param release_time: time (in [s]) at which the packet would currently be sent
+        :param size: packet size in bytes
+        :return: release times of all copies of the packet which should be sent (empty if the packet is dropped)
+        """
+        pass
@@ -0,0 +1,5 @@
+from .loss import UniformLoss, GilbertElliottLoss
+from .latency import Latency
+from .reordering import Reordering
+from .duplication import Duplication
+from .bandwidth import BandwidthCap
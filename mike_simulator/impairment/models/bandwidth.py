@@ -0,0 +1,24 @@
+from typing import Tuple
+
+from mike_simulator.impairment import Impairment
+
+
+class BandwidthCap(Impairment):
+    """
+    Limit throughput to a fixed number of bytes per second.
+
+    Packets are serialized onto the simulated link one after another. Packets which would have to wait longer
+    than max_queue_delay for the link to become free are dropped (tail drop of a full router queue).
+    """
+
+    def __init__(self, bytes_per_second: float, max_queue_delay: float):
+        self.seconds_per_byte = 1.0 / bytes_per_second
+        self.max_queue_delay = max_queue_delay
+        self.link_free_time = 0.0
+
+    def process(self, release_time: float, size: int) -> Tuple[float, ...]:
+        start_time = max(release_time, self.link_free_time)
+        if start_time - release_time > self.max_queue_delay:
+            return self.DROP
+        self.link_free_time = start_time + size * self.seconds_per_byte
+        return self.link_free_time,
@@ -0,0 +1,17 @@
+import random
+from typing import Tuple
+
+from mike_simulator.impairment import Impairment
+
+
+class Duplication(Impairment):
+    """Send randomly selected packets twice"""
+
+    def __init__(self, duplication_rate: float, rng: random.Random):
+        self.duplication_rate = duplication_rate
+        self.rng = rng
+
+    def process(self, release_time: float, size: int) -> Tuple[float, ...]:
+        if self.rng.random() < self.duplication_rate:
+            return release_time, release_time
+        return release_time,
@@ -0,0 +1,30 @@
+import random
+from typing import Tuple
+
+from mike_simulator.impairment import Impairment
+
+
+class Latency(Impairment):
+    """
+    Fixed delay plus normally distributed jitter.
+
+    Jitter can make packets overtake each other. If preserve_order is set, a packet is never released before
+    the previous one (as on a single FIFO link), otherwise jitter reorders packets naturally.
+    """
+
+    def __init__(self, delay: float, jitter: float, rng: random.Random, preserve_order: bool = True):
+        self.delay = delay
+        self.jitter = jitter
+        self.rng = rng
+        self.preserve_order = preserve_order
+        self.last_release_time = 0.0
+
+    def process(self, release_time: float, size: int) -> Tuple[float, ...]:
+        delay = self.delay
+        if self.jitter > 0.0:
+            delay = max(0.0, delay + self.rng.gauss(0.0, self.jitter))
+        release_time += delay
+        if self.preserve_order:
+            release_time = max(release_time, self.last_release_time)
+            self.last_release_time = release_time
+        return release_time,
@@ -0,0 +1,46 @@
+import random
+from typing import Tuple
+
+from mike_simulator.impairment import Impairment
+
+
+class UniformLoss(Impairment):
+    """Independent packet loss, every packet is dropped with the same probability"""
+
+    def __init__(self, loss_rate: float, rng: random.Random):
+        self.loss_rate = loss_rate
+        self.rng = rng
+
+    def process(self, release_time: float, size: int) -> Tuple[float, ...]:
+        if self.rng.random() < self.loss_rate:
+            return self.DROP
+        return release_time,
+
+
+class GilbertElliottLoss(Impairment):
+    """
+    Burst loss using the Gilbert-Elliott two state Markov model.
+
+    The channel alternates between a good and a bad state with a separate loss probability each.
+    The expected burst length (in packets) is 1 / bad_to_good_rate.
+    """
+
+    def __init__(self, good_to_bad_rate: float, bad_to_good_rate: float, good_loss_rate: float,
+                 bad_loss_rate: float, rng: random.Random):
+        self.good_to_bad_rate = good_to_bad_rate
+        self.bad_to_good_rate = bad_to_good_rate
+        self.good_loss_rate = good_loss_rate
+        self.bad_loss_rate = bad_loss_rate
+        self.rng = rng
+        self.bad = False
+
+    def process(self, release_time: float, size: int) -> Tuple[float, ...]:
+        rng = self.rng
+        if self.bad:
+            if rng.random() < self.bad_to_good_rate:
+                self.bad = False
+        elif rng.random() < self.good_to_bad_rate:
+            self.bad = True
+        if rng.random() < (self.bad_loss_rate if self.bad else self.good_loss_rate):
+            return self.DROP
+        return release_time,
@@ -0,0 +1,18 @@
+import random
+from typing import Tuple
+
+from mike_simulator.impairment import Impairment
+
+
+class Reordering(Impairment):
+    """Hold back randomly selected packets, so that the packets sent after them overtake them"""
+
+    def __init__(self, reorder_rate: float, hold_back_time: float, rng: random.Random):
+        self.reorder_rate = reorder_rate
+        self.hold_back_time = hold_back_time
+        self.rng = rng
+
+    def process(self, release_time: float, size: int) -> Tuple[float, ...]:
+        if self.rng.random() < self.reorder_rate:
+            return release_time + self.hold_back_time,
+        return release_time,
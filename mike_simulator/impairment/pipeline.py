@@ -0,0 +1,44 @@
+import heapq
+from typing import List, Tuple, Iterator
+
+from mike_simulator.impairment import Impairment
+
+
+class ImpairmentPipeline:
+    """
+    Chain of impairment models with a timed send queue.
+
+    Packets are submitted with the current time, passed through all impairment stages in order and queued
+    until their release time has come. Without any stages, packets are released immediately.
+    """
+
+    def __init__(self, stages: List[Impairment]):
+        self.stages = stages
+
+        # Heap of (release time, sequence number, packet), the sequence number keeps equal release times in order
+        self.queue: List[Tuple[float, int, bytes]] = []
+        self.sequence = 0
+
+    def submit(self, packet: bytes, now: float):
+        """Pass packet through all impairment stages and queue the resulting copies."""
+        release_times = (now,)
+        size = len(packet)
+        for stage in self.stages:
+            if len(release_times) == 1:
+                release_times = stage.process(release_times[0], size)
+            else:
+                release_times = tuple(t for rt in release_times for t in stage.process(rt, size))
+            if not release_times:
+                return
+        for release_time in release_times:
+            heapq.heappush(self.queue, (release_time, self.sequence, packet))
+            self.sequence += 1
+
+    def pop_due(self, now: float) -> Iterator[bytes]:
+        """Yield (and remove) all queued packets whose release time has come."""
+        queue = self.queue
+        while queue and queue[0][0] <= now:
+            yield heapq.heappop(queue)[2]
+
+    def clear(self):
+        self.queue.clear()
@@ -6,5 +6,15 @@ from .interface import InputHandler, InputState
 class InputMethod(Enum):
     Gamepad = 0
     Keyboard = 1
-    #Prerecorded
+    # Replays a recording, the configured input method is a user who never presses a key
+    Prerecorded = 2
     #Random
+
+
+class UserMovement(Enum):
+    """How a task expects the user to move the robot while movement is unlocked"""
+    Disabled = 0
+    # Velocity directly follows the (analog) input, limited to the normal user speed
+    Normal = 1
+    # Burst movements, input accelerates and releasing it decelerates quickly
+    Burst = 2
@@ -1,2 +1,15 @@
-from .gamepad_input import GamepadInputHandler
-from .keyboard_input import KeyboardInputHandler
+import importlib
+
+# Input handlers are imported on first access only (see InputHandlerFactory)
+_modules_by_class = {
+    'GamepadInputHandler': 'gamepad_input',
+    'KeyboardInputHandler': 'keyboard_input',
+    'PrerecordedInputHandler': 'prerecorded_input',
+}
+__all__ = list(_modules_by_class)
+
+
+def __getattr__(name):
+    if name in _modules_by_class:
+        return getattr(importlib.import_module(f'.{_modules_by_class[name]}', __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,8 +1,7 @@
 import os
 
-from mike_simulator.task.types import *
 from mike_simulator.datamodels import MotorState, Constants
-from mike_simulator.input import InputState
+from mike_simulator.input import InputState, UserMovement
 from mike_simulator.input.input_base import InputHandlerBase
 
 if os.name == 'nt':
@@ -24,13 +23,13 @@ if os.name == 'nt':
             return self.analog_velocity(self.get_directional_input(), Constants.MAX_FORCE)
 
         def get_current_velocity(self, prev_input: InputState, motor_state: MotorState, delta_time: float) -> float:
-            if isinstance(self.task, MotorAssessment):
+            if self.user_movement == UserMovement.Burst:
                 raw_input = self.get_directional_input()
                 return self.accelerate_or_decelerate(prev_input.velocity, raw_input,
                                                      Constants.USER_BURST_ACCEL_RATE,
                                                      6.0 * Constants.USER_BURST_ACCEL_RATE,
                                                      delta_time)
-            elif isinstance(self.task, (RangeOfMotionAssessment, SensoriMotorAssessment, PreciseReachAssessment, ActiveMatchingAssessment, TeachAndReproduceAssessment, HapticBumpAssessment)):
+            elif self.user_movement == UserMovement.Normal:
                 return self.analog_velocity(self.get_directional_input(), Constants.USER_NORMAL_MAX_SPEED)
             else:
                 return 0.0
@@ -1,8 +1,7 @@
 from keyboard import is_pressed
 
-from mike_simulator.task.types import *
 from mike_simulator.datamodels import MotorState, Constants
-from mike_simulator.input import InputState
+from mike_simulator.input import InputState, UserMovement
 from mike_simulator.input.input_base import InputHandlerBase
 
 
@@ -17,13 +16,13 @@ class KeyboardInputHandler(InputHandlerBase):
         return self.accelerate(prev_input.force, raw_input, Constants.USER_FORCE_ACCEL_RATE, delta_time)
 
     def get_current_velocity(self, prev_input: InputState, motor_state: MotorState, delta_time: float) -> float:
-        if isinstance(self.task, MotorAssessment):
+        if self.user_movement == UserMovement.Burst:
             raw_input = self.get_directional_input()
             return self.accelerate_or_decelerate(prev_input.velocity, raw_input,
                                                  Constants.USER_BURST_ACCEL_RATE,
                                                  6.0 * Constants.USER_BURST_ACCEL_RATE,
                                                  delta_time)
-        elif isinstance(self.task, (RangeOfMotionAssessment, SensoriMotorAssessment, PreciseReachAssessment, ActiveMatchingAssessment, TeachAndReproduceAssessment, HapticBumpAssessment)):
+        elif self.user_movement == UserMovement.Normal:
             return self.analog_velocity(self.get_directional_input(), Constants.USER_NORMAL_MAX_SPEED)
         else:
             return 0.0
@@ -0,0 +1,44 @@
+from typing import Sequence
+
+from mike_simulator.datamodels import MotorState, Constants
+from mike_simulator.input import InputState, UserMovement
+from mike_simulator.input.input_base import InputHandlerBase
+
+
+class PrerecordedInputHandler(InputHandlerBase):
+    """
+    Replays a prerecorded sequence of directional inputs (one value in [-1, 1] per simulator cycle).
+
+    Behaves like a keyboard user pressing the arrow keys as recorded. Once the recording is exhausted,
+    it is replayed from the beginning. An empty recording corresponds to a user which never presses any key.
+    """
+
+    def __init__(self, recording: Sequence[float] = ()):
+        super().__init__()
+        self.recording = recording
+        self.cycle = 0
+
+    def update_input_state(self, motor_state: MotorState, delta_time: float):
+        super().update_input_state(motor_state, delta_time)
+        self.cycle += 1
+
+    def get_directional_input(self) -> float:
+        if not self.recording:
+            return 0.0
+        return self.recording[self.cycle % len(self.recording)]
+
+    def get_current_force(self, prev_input: InputState, motor_state: MotorState, delta_time: float) -> float:
+        raw_input = self.get_directional_input()
+        return self.accelerate(prev_input.force, raw_input, Constants.USER_FORCE_ACCEL_RATE, delta_time)
+
+    def get_current_velocity(self, prev_input: InputState, motor_state: MotorState, delta_time: float) -> float:
+        if self.user_movement == UserMovement.Burst:
+            raw_input = self.get_directional_input()
+            return self.accelerate_or_decelerate(prev_input.velocity, raw_input,
+                                                 Constants.USER_BURST_ACCEL_RATE,
+                                                 6.0 * Constants.USER_BURST_ACCEL_RATE,
+                                                 delta_time)
+        elif self.user_movement == UserMovement.Normal:
+            return self.analog_velocity(self.get_directional_input(), Constants.USER_NORMAL_MAX_SPEED)
+        else:
+            return 0.0
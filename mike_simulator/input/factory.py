@@ -1,10 +1,13 @@
 from mike_simulator.input import InputHandler, InputMethod
-from mike_simulator.input.backends import *
+from mike_simulator.util.helpers import import_attribute
 
 # Dict for looking up class corresponding to InputMethod
+# Classes are referenced by (module, class name) so that backend dependencies (keyboard, XInput) are only
+# imported when the corresponding input method is actually used
 _input_class_for_type = {
-    InputMethod.Gamepad: GamepadInputHandler,
-    InputMethod.Keyboard: KeyboardInputHandler,
+    InputMethod.Gamepad: ('gamepad_input', 'GamepadInputHandler'),
+    InputMethod.Keyboard: ('keyboard_input', 'KeyboardInputHandler'),
+    InputMethod.Prerecorded: ('prerecorded_input', 'PrerecordedInputHandler'),
 }
 
 
@@ -12,4 +15,5 @@ class InputHandlerFactory:
     @staticmethod
     def create(method: InputMethod) -> InputHandler:
         """Create an input handler instance for the specified InputMethod."""
-        return _input_class_for_type[method]()
+        module_name, class_name = _input_class_for_type[method]
+        return import_attribute(f'mike_simulator.input.backends.{module_name}', class_name)()
@@ -2,7 +2,7 @@ import math
 from abc import abstractmethod, ABCMeta
 
 from mike_simulator.datamodels import MotorState, Constants
-from mike_simulator.input import InputHandler, InputState
+from mike_simulator.input import InputHandler, InputState, UserMovement
 
 
 class InputHandlerBase(InputHandler, metaclass=ABCMeta):
@@ -13,7 +13,7 @@ class InputHandlerBase(InputHandler, metaclass=ABCMeta):
 
     def begin_task(self, task):
         self.task = task
-        self._current_input_state = InputState()
+        self._current_input_state.reset()
         self.movement_locked = True
 
     def finish_task(self):
@@ -36,12 +36,17 @@ class InputHandlerBase(InputHandler, metaclass=ABCMeta):
         else:
             state.velocity = min(max(-Constants.MAX_SPEED, state.velocity), Constants.MAX_SPEED)
 
+    @property
+    def user_movement(self) -> UserMovement:
+        """Type of user movement expected by the current task."""
+        return self.task.USER_MOVEMENT if self.task is not None else UserMovement.Disabled
+
     @property
     def current_input_state(self) -> InputState:
         return self._current_input_state
 
     def reset_input(self):
-        self._current_input_state = InputState()
+        self._current_input_state.reset()
 
     def lock_movement(self):
         self.movement_locked = True
@@ -4,11 +4,15 @@ from dataclasses import dataclass
 from mike_simulator.datamodels import MotorState
 
 
-@dataclass
+@dataclass(slots=True)
 class InputState:
     force: float = 0.0
     velocity: float = 0.0
 
+    def reset(self):
+        self.force = 0.0
+        self.velocity = 0.0
+
 
 class InputHandler(metaclass=ABCMeta):
     """Abstract interface for input handler"""
@@ -0,0 +1,10 @@
+from enum import Enum
+
+from .interface import LogSink
+
+
+class LogSinkType(Enum):
+    # CSV files below Logging.log_dir
+    Csv = 0
+    # Binary records streamed to a telemetry collector (see tools/telemetry_collector.py)
+    Stream = 1
@@ -0,0 +1,25 @@
+from typing import Sequence
+
+from mike_simulator.log_sinks import LogSink, LogSinkType
+from mike_simulator.util.helpers import import_attribute
+
+# Dict for looking up class corresponding to LogSinkType
+# Classes are referenced by (module, class name) and only imported when the corresponding sink is used
+_sink_class_for_type = {
+    LogSinkType.Csv: ('csv_sink', 'CsvLogSink'),
+    LogSinkType.Stream: ('stream_sink', 'StreamLogSink'),
+}
+
+
+class LogSinkFactory:
+    @staticmethod
+    def create(sink_type: LogSinkType, session_path: str, fields: Sequence[str]) -> LogSink:
+        """
+        Create a log sink for a new logging session.
+
+        :param sink_type: type of the sink
+        :param session_path: path of the session's log file, relative to the log directory
+        :param fields: column names
+        """
+        module_name, class_name = _sink_class_for_type[sink_type]
+        return import_attribute(f'mike_simulator.log_sinks.sinks.{module_name}', class_name)(session_path, fields)
@@ -0,0 +1,16 @@
+from abc import ABCMeta, abstractmethod
+from typing import Sequence
+
+
+class LogSink(metaclass=ABCMeta):
+    """Abstract interface for the destination of the rows of one logging session"""
+
+    @abstractmethod
+    def write_row(self, row: Sequence):
+        """Write a single row (one value per column of Logger.FIELDS, see Logger.log)."""
+        pass
+
+    @abstractmethod
+    def close(self):
+        """Finish the logging session, may be called multiple times."""
+        pass
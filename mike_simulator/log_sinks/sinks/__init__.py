@@ -0,0 +1,14 @@
+import importlib
+
+# Log sinks are imported on first access only (see LogSinkFactory)
+_modules_by_class = {
+    'CsvLogSink': 'csv_sink',
+    'StreamLogSink': 'stream_sink',
+}
+__all__ = list(_modules_by_class)
+
+
+def __getattr__(name):
+    if name in _modules_by_class:
+        return getattr(importlib.import_module(f'.{_modules_by_class[name]}', __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
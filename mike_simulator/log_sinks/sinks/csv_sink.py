@@ -0,0 +1,28 @@
+import csv
+import os
+from typing import Sequence
+
+from mike_simulator.config import cfg
+from mike_simulator.log_sinks import LogSink
+
+
+class CsvLogSink(LogSink):
+    """Writes the session as csv file below the configured log directory"""
+
+    def __init__(self, session_path: str, fields: Sequence[str]):
+        # Create directories if needed
+        self.filename = os.path.join(cfg.Logging.log_dir, session_path)
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+
+        # Create log file
+        self.file = open(self.filename, 'w', buffering=1, newline='')
+
+        # Open csv writer for log file
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(fields)
+
+    def write_row(self, row: Sequence):
+        self.writer.writerow([str(elem) for elem in row])
+
+    def close(self):
+        self.file.close()
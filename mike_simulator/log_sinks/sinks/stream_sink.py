@@ -0,0 +1,134 @@
+import itertools
+import socket
+import threading
+from typing import Dict, Optional, Sequence
+
+from mike_simulator.config import cfg
+from mike_simulator.log_sinks import LogSink
+from mike_simulator.log_sinks.telemetry_protocol import encode_session_start, encode_row, encode_session_end
+
+
+def connect_to(address: str) -> socket.socket:
+    """
+    Connect to a telemetry collector.
+
+    :param address: 'host:port' for TCP or 'unix:path' for a Unix domain socket
+    """
+    if address.startswith('unix:'):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(address[len('unix:'):])
+        return sock
+    host, _, port = address.rpartition(':')
+    sock = socket.create_connection((host, int(port)))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+class TelemetryConnection:
+    """
+    Connection to the telemetry collector shared by all stream sinks.
+
+    Frames are appended to a bounded buffer by the simulator and sent by a background thread, which also
+    (re)connects to the collector. If the buffer is full (e.g. while the collector is not reachable), rows are
+    dropped, session start/end frames are always kept.
+    """
+
+    def __init__(self, address: str, max_buffer_size: int, reconnect_interval: float):
+        self.address = address
+        self.max_buffer_size = max_buffer_size
+        self.reconnect_interval = reconnect_interval
+
+        self.buffer = bytearray()
+        self.lock = threading.Lock()
+        self.data_available = threading.Event()
+        self.stopped = threading.Event()
+
+        # Start frames of the sessions which are currently active, repeated after reconnecting
+        self.active_sessions: Dict[int, bytes] = {}
+        self.dropped_rows = 0
+
+        self.thread = threading.Thread(target=self._run, name='TelemetryConnection', daemon=True)
+        self.thread.start()
+
+    def start_session(self, session_id: int, start_frame: bytes):
+        with self.lock:
+            self.active_sessions[session_id] = start_frame
+            self.buffer += start_frame
+        self.data_available.set()
+
+    def end_session(self, session_id: int, end_frame: bytes):
+        with self.lock:
+            self.active_sessions.pop(session_id, None)
+            self.buffer += end_frame
+        self.data_available.set()
+
+    def send_row(self, frame: bytes):
+        with self.lock:
+            if len(self.buffer) + len(frame) > self.max_buffer_size:
+                self.dropped_rows += 1
+                return
+            self.buffer += frame
+        self.data_available.set()
+
+    def stop(self):
+        self.stopped.set()
+        self.data_available.set()
+
+    def _run(self):
+        sock: Optional[socket.socket] = None
+        while not self.stopped.is_set():
+            if sock is None:
+                try:
+                    sock = connect_to(self.address)
+                except (OSError, ValueError):
+                    self.stopped.wait(self.reconnect_interval)
+                    continue
+                # The collector only knows the sessions announced over the current connection
+                with self.lock:
+                    self.buffer[:0] = b''.join(self.active_sessions.values())
+
+            self.data_available.wait()
+            with self.lock:
+                self.data_available.clear()
+                data, self.buffer = self.buffer, bytearray()
+            try:
+                sock.sendall(data)
+            except OSError:
+                # Data of the broken connection is lost, reconnect
+                sock.close()
+                sock = None
+        if sock is not None:
+            sock.close()
+
+
+_session_ids = itertools.count()
+_connection: Optional[TelemetryConnection] = None
+
+
+def get_connection() -> TelemetryConnection:
+    """Return the connection to the configured collector (created on first use or after the address changed)."""
+    global _connection
+    if _connection is None or _connection.address != cfg.Logging.stream_address:
+        if _connection is not None:
+            _connection.stop()
+        _connection = TelemetryConnection(cfg.Logging.stream_address, cfg.Logging.stream_buffer_size,
+                                          cfg.Logging.stream_reconnect_interval)
+    return _connection
+
+
+class StreamLogSink(LogSink):
+    """Streams the session as binary records to a telemetry collector instead of writing to disk"""
+
+    def __init__(self, session_path: str, fields: Sequence[str]):
+        self.connection = get_connection()
+        self.session_id = next(_session_ids)
+        self.connection.start_session(self.session_id, encode_session_start(self.session_id, session_path, fields))
+        self.closed = False
+
+    def write_row(self, row: Sequence):
+        self.connection.send_row(encode_row(self.session_id, row))
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.connection.end_session(self.session_id, encode_session_end(self.session_id))
@@ -0,0 +1,65 @@
+"""
+Wire format of the telemetry stream between StreamLogSink and the telemetry collector.
+
+The stream is a sequence of frames, each consisting of a header (message type u8, session id u32, payload length u32,
+network byte order) and the payload:
+    SESSION_START: UTF-8 JSON object {"path": log file path relative to the log directory, "fields": column names}
+    ROW:           one logger row packed as ROW_STRUCT
+    SESSION_END:   empty
+A sender which reconnects repeats the SESSION_START frames of all sessions which are still active.
+"""
+import json
+import struct
+from typing import Iterator, List, Sequence, Tuple
+
+MSG_SESSION_START = 1
+MSG_ROW = 2
+MSG_SESSION_END = 3
+
+FRAME_HEADER = struct.Struct('!BII')
+
+# Columns of Logger.log: time, position, target position, frontend started, trial nr, velocity, current,
+# starting position, voltage force, force, force filtered, velocity unfiltered, rom state
+ROW_STRUCT = struct.Struct('!dddBBdddddddB')
+
+
+def encode_session_start(session_id: int, path: str, fields: Sequence[str]) -> bytes:
+    payload = json.dumps({'path': path, 'fields': list(fields)}).encode('utf-8')
+    return FRAME_HEADER.pack(MSG_SESSION_START, session_id, len(payload)) + payload
+
+
+def encode_row(session_id: int, row: Sequence) -> bytes:
+    return FRAME_HEADER.pack(MSG_ROW, session_id, ROW_STRUCT.size) + ROW_STRUCT.pack(*row)
+
+
+def encode_session_end(session_id: int) -> bytes:
+    return FRAME_HEADER.pack(MSG_SESSION_END, session_id, 0)
+
+
+def decode_session_start(payload: bytes) -> Tuple[str, List[str]]:
+    start = json.loads(payload.decode('utf-8'))
+    return start['path'], start['fields']
+
+
+def decode_row(payload: bytes) -> tuple:
+    return ROW_STRUCT.unpack(payload)
+
+
+class FrameReader:
+    """Reassembles frames from the received byte stream"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data: bytes) -> Iterator[Tuple[int, int, bytes]]:
+        """Add received data, yield (message type, session id, payload) of all frames which are complete."""
+        self.buffer += data
+        offset = 0
+        while len(self.buffer) - offset >= FRAME_HEADER.size:
+            msg_type, session_id, length = FRAME_HEADER.unpack_from(self.buffer, offset)
+            end = offset + FRAME_HEADER.size + length
+            if end > len(self.buffer):
+                break
+            yield msg_type, session_id, bytes(self.buffer[offset + FRAME_HEADER.size:end])
+            offset = end
+        del self.buffer[:offset]
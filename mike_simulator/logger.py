@@ -1,11 +1,12 @@
-import csv
+import math
 import os
 import random
-from datetime import datetime
+from typing import Callable, List
 
 from mike_simulator.config import cfg
 from mike_simulator.datamodels import MotorState, PatientResponse, TaskType
 from mike_simulator.input import InputState
+from mike_simulator.log_sinks.factory import LogSinkFactory
 
 
 class Logger:
@@ -30,25 +31,36 @@ class Logger:
         TaskType.TrajectoryPerception: 'Trajectory Perception Task',
     }
 
-    def __init__(self, patient: PatientResponse):
-        # Create directories if needed
-        directory = os.path.join(cfg.Logging.log_dir,
-                                 cfg.Logging.data_root_dir,
-                                 patient.StudyName,
-                                 patient.SubjectNr,
-                                 Logger.TASK_NAMES[patient.Task],
-                                 f'{"Left" if patient.LeftHand else "Right"} Hand')
-        os.makedirs(directory, exist_ok=True)
+    # Called with the filename of every closed log file (e.g. to update the session index of the ftp server)
+    file_closed_listeners: List[Callable[[str], None]] = []
 
-        # Create log file
-        self.file = open(os.path.join(directory, f'{patient.DateTime}.csv'), 'w', buffering=1, newline='')
+    def __init__(self, patient: PatientResponse):
+        # Open log sink (csv file or telemetry stream) for this session
+        self.sink = LogSinkFactory.create(cfg.Logging.sink_type, Logger.session_path(patient), Logger.FIELDS)
 
-        # Open csv writer for log file
-        self.writer = csv.writer(self.file)
-        self.writer.writerow(Logger.FIELDS)
+    @staticmethod
+    def session_path(patient: PatientResponse) -> str:
+        """Return path of the session's log file relative to the log directory."""
+        return os.path.join(cfg.Logging.data_root_dir,
+                            patient.StudyName,
+                            patient.SubjectNr,
+                            Logger.TASK_NAMES[patient.Task],
+                            f'{"Left" if patient.LeftHand else "Right"} Hand',
+                            f'{patient.DateTime}.csv')
 
     def __del__(self):
-        self.file.close()
+        if getattr(self, 'sink', None) is not None:
+            self.close()
+
+    def close(self):
+        if self.sink is None:
+            return
+        self.sink.close()
+        filename = getattr(self.sink, 'filename', None)
+        self.sink = None
+        if filename is not None:
+            for listener in Logger.file_closed_listeners:
+                listener(filename)
 
     def log(self, elapsed_time: float, motor_state: MotorState, frontend_started: bool, input_state: InputState):
         row = (
@@ -58,7 +70,7 @@ class Logger:
             1 if frontend_started else 0,
             motor_state.TrialNr,
             input_state.velocity, # filtered velocity, for now == unfiltered
-            'nan', # Current
+            math.nan, # Current
             motor_state.StartingPosition,
             input_state.force / 10 + random.gauss(0.0, 0.1), # Voltage force
             input_state.force,
@@ -66,4 +78,4 @@ class Logger:
             input_state.velocity,
             int(motor_state.RomState)
         )
-        self.writer.writerow([str(elem) for elem in row])
+        self.sink.write_row(row)
@@ -0,0 +1,2 @@
+from .interface import MetricAccumulator
+from .accumulators import RunningMinMax, WelfordMeanVariance, RootMeanSquareError, PeakDetector, Histogram
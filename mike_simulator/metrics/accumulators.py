@@ -0,0 +1,124 @@
+import bisect
+import itertools
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from mike_simulator.metrics.interface import MetricAccumulator
+
+
+class RunningMinMax(MetricAccumulator):
+    """Minimum and maximum of the samples"""
+
+    def __init__(self, initial: Optional[float] = None):
+        """
+        :param initial: value included in the extremes from the start (and after every reset)
+        """
+        self.initial = initial
+        self.reset()
+
+    def update(self, value: float):
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    def reset(self):
+        self.minimum = math.inf if self.initial is None else self.initial
+        self.maximum = -math.inf if self.initial is None else self.initial
+
+    def result(self) -> Dict[str, float]:
+        if self.minimum > self.maximum:
+            return {'min': math.nan, 'max': math.nan}
+        return {'min': self.minimum, 'max': self.maximum}
+
+
+class WelfordMeanVariance(MetricAccumulator):
+    """Mean and standard deviation of the samples (numerically stable single pass algorithm by Welford)"""
+
+    def __init__(self):
+        self.reset()
+
+    def update(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def variance(self) -> float:
+        """Sample variance (NaN for less than two samples)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    def result(self) -> Dict[str, float]:
+        return {'mean': self.mean if self.count > 0 else math.nan, 'std': math.sqrt(self.variance())}
+
+
+class RootMeanSquareError(MetricAccumulator):
+    """Root mean square deviation of the samples from their targets"""
+
+    def __init__(self):
+        self.reset()
+
+    def update(self, value: float, target: float):
+        error = value - target
+        self.sum_of_squares += error * error
+        self.count += 1
+
+    def reset(self):
+        self.sum_of_squares = 0.0
+        self.count = 0
+
+    def result(self) -> Dict[str, float]:
+        return {'rmse': math.sqrt(self.sum_of_squares / self.count) if self.count > 0 else math.nan}
+
+
+class PeakDetector(MetricAccumulator):
+    """Largest absolute sample value and the time at which it occurred"""
+
+    def __init__(self):
+        self.reset()
+
+    def update(self, value: float, time: float = math.nan):
+        magnitude = math.fabs(value)
+        if magnitude > self.peak:
+            self.peak = magnitude
+            self.peak_time = time
+
+    def reset(self):
+        self.peak = 0.0
+        self.peak_time = math.nan
+
+    def result(self) -> Dict[str, float]:
+        return {'peak': self.peak, 'peak_time': self.peak_time}
+
+
+class Histogram(MetricAccumulator):
+    """Number of samples per bucket (cumulative, as Prometheus histograms) and sum of the samples"""
+
+    def __init__(self, bounds: Sequence[float]):
+        """
+        :param bounds: increasing upper bounds of the buckets (a last bucket without upper bound is added)
+        """
+        self.bounds = list(bounds)
+        self.reset()
+
+    def update(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def buckets(self) -> List[Tuple[float, int]]:
+        """Return (upper bound, number of samples <= upper bound) of every bucket, the last bound is inf."""
+        return list(zip(self.bounds + [math.inf], itertools.accumulate(self.counts)))
+
+    def result(self) -> Dict[str, float]:
+        return {f'le_{bound:g}': count for bound, count in self.buckets()}
@@ -0,0 +1,26 @@
+from abc import ABCMeta, abstractmethod
+from typing import Dict
+
+
+class MetricAccumulator(metaclass=ABCMeta):
+    """
+    Abstract interface for a streaming metric.
+
+    Accumulators consume one sample per update call (the arguments depend on the metric) in O(1) time and memory,
+    the metric of all samples since the last reset is available at any time through result().
+    """
+
+    @abstractmethod
+    def update(self, *values: float):
+        """Add a sample."""
+        pass
+
+    @abstractmethod
+    def reset(self):
+        """Discard all samples."""
+        pass
+
+    @abstractmethod
+    def result(self) -> Dict[str, float]:
+        """Return the metric values (NaN if there were no samples) by name."""
+        pass
@@ -0,0 +1,103 @@
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+
+from mike_simulator.datamodels import MotorState
+from mike_simulator.input import InputState
+from mike_simulator.metrics.interface import MetricAccumulator
+from mike_simulator.metrics.accumulators import RunningMinMax, WelfordMeanVariance, RootMeanSquareError, PeakDetector
+
+TrialResult = Dict[str, float]
+
+
+class TrialMetricsRecorder:
+    """
+    Computes metrics of every trial while the motor states stream by and emits them at the end of each trial.
+
+    A trial ends when the task changes the trial number or ROM state (in _prepare_next_trial_or_finish) or when the
+    session ends. Besides the generic metrics below, the result contains the accumulators the task registered in
+    its trial_metrics (as <name>_<metric>). Task accumulators are read, but not reset by the recorder.
+    """
+
+    def __init__(self):
+        self.position = RunningMinMax()
+        self.velocity = PeakDetector()
+        self.force = PeakDetector()
+        self.force_statistics = WelfordMeanVariance()
+        self.target_error = RootMeanSquareError()
+
+        # Called with the result of every finished trial
+        self.listeners: List[Callable[[TrialResult], None]] = []
+
+        # Results of all finished trials of the current session
+        self.results: List[TrialResult] = []
+
+        self.task_metrics: Dict[str, MetricAccumulator] = {}
+        self.trial: Optional[Tuple[int, int]] = None
+        self.trial_start_time = 0.0
+        self.last_time = 0.0
+
+    def begin_session(self, task_metrics: Dict[str, MetricAccumulator]):
+        """Start recording a new session whose task provides the accumulators task_metrics."""
+        self.task_metrics = task_metrics
+        self.results = []
+        self.trial = None
+
+    def end_session(self, emit: bool = True):
+        """Stop recording the session, emit the result of the trial in progress if emit is set."""
+        if emit and self.trial is not None:
+            self._finish_trial()
+        self.trial = None
+        self.task_metrics = {}
+
+    def update(self, motor_state: MotorState, input_state: InputState, time: float):
+        """Add the samples of a cycle at elapsed session time time [s]."""
+        trial = (motor_state.TrialNr, motor_state.RomState)
+        if trial != self.trial:
+            if self.trial is not None:
+                self._finish_trial()
+            self._begin_trial(trial, time)
+        self.last_time = time
+
+        self.position.update(motor_state.Position)
+        self.velocity.update(input_state.velocity, time)
+        self.force.update(input_state.force, time)
+        self.force_statistics.update(input_state.force)
+        if motor_state.TargetState:
+            self.target_error.update(motor_state.Position, motor_state.TargetPosition)
+
+    def _begin_trial(self, trial: Tuple[int, int], time: float):
+        self.trial = trial
+        self.trial_start_time = time
+        for accumulator in (self.position, self.velocity, self.force, self.force_statistics, self.target_error):
+            accumulator.reset()
+
+    def _finish_trial(self):
+        trial_nr, rom_state = self.trial
+        position = self.position.result()
+        force = self.force_statistics.result()
+        result = {
+            'trial': trial_nr,
+            'rom_state': int(rom_state),
+            'start_time': self.trial_start_time,
+            'duration': self.last_time - self.trial_start_time,
+            'position_min': position['min'],
+            'position_max': position['max'],
+            'velocity_peak': self.velocity.peak,
+            'force_peak': self.force.peak,
+            'force_mean': force['mean'],
+            'force_std': force['std'],
+            'target_rmse': self.target_error.result()['rmse'],
+        }
+        for name, accumulator in self.task_metrics.items():
+            for metric, value in accumulator.result().items():
+                result[f'{name}_{metric}'] = value
+        self.results.append(result)
+        for listener in self.listeners:
+            listener(result)
+
+
+def format_trial_result(result: TrialResult) -> str:
+    """Return a one line summary of a trial result."""
+    values = ', '.join(f'{name}: {value:.3f}' for name, value in result.items()
+                       if name not in ('trial', 'rom_state') and not math.isnan(value))
+    return f'Trial {result["trial"]} (ROM state {result["rom_state"]}) - {values}'
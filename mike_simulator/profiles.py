@@ -0,0 +1,65 @@
+"""
+Performance profiles of the simulator's run modes (subcommands of main.py).
+
+A profile decides how cycles are scheduled, whether session logs are written, how often in-place status lines
+are printed and whether keyboard hooks (which need root on Linux and a TTY) are used.
+"""
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Optional
+
+from mike_simulator.util import PrintUtil
+
+
+class Scheduler(Enum):
+    # Cycles are paced by the wall clock (one robot cycle time per cycle)
+    Realtime = 0
+    # Cycles run back to back on a simulated clock (as fast as the CPU allows, see HeadlessSimulator)
+    Simulated = 1
+
+
+class LoggingPolicy(Enum):
+    # Session logs are written as configured ([Logging] enabled)
+    Configured = 0
+    # No session logs are written
+    Disabled = 1
+
+
+@dataclass(frozen=True)
+class PerformanceProfile:
+    name: str
+    scheduler: Scheduler
+    logging: LoggingPolicy
+
+    # Maximum rate of in-place status lines [Hz] (0 = no status lines)
+    print_rate: float
+
+    # Privilege elevation (Linux), f10 polling and keyboard input
+    keyboard: bool
+
+    @property
+    def realtime(self) -> bool:
+        return self.scheduler == Scheduler.Realtime
+
+    @property
+    def logging_enabled(self) -> Optional[bool]:
+        """Value for the logging_enabled parameter of BackendSimulator (None = configured value)."""
+        return None if self.logging == LoggingPolicy.Configured else False
+
+    def apply(self):
+        """Apply the process wide settings of this profile (console output)."""
+        PrintUtil.set_inplace_rate(self.print_rate)
+
+
+PROFILES: Dict[str, PerformanceProfile] = {
+    # Production: frontend connected, operator at the keyboard
+    'serve': PerformanceProfile('serve', Scheduler.Realtime, LoggingPolicy.Configured, 30.0, True),
+    # Frontend connected, but no root, TTY or keyboard (CI, load tests)
+    'headless': PerformanceProfile('headless', Scheduler.Realtime, LoggingPolicy.Configured, 0.0, False),
+    # Recorded session sent to the frontend at the recorded pace
+    'replay': PerformanceProfile('replay', Scheduler.Realtime, LoggingPolicy.Disabled, 10.0, False),
+    # Throughput measurements of headless sessions
+    'bench': PerformanceProfile('bench', Scheduler.Simulated, LoggingPolicy.Disabled, 0.0, False),
+    # Scripted headless sessions producing session logs
+    'simulate': PerformanceProfile('simulate', Scheduler.Simulated, LoggingPolicy.Configured, 0.0, False),
+}
@@ -1,16 +1,21 @@
 import select
 import socket
-from dataclasses import dataclass
+import time
 from enum import IntEnum
 from typing import Optional
 
-import netstruct
-from keyboard import is_pressed
-
-from mike_simulator.config import cfg
-from mike_simulator.datamodels import PatientResponse, ControlResponse
+from mike_simulator.config import cfg, config_service
+from mike_simulator.datamodels import PatientResponse, ControlResponse, MotorState, TaskType
+from mike_simulator.impairment.factory import ImpairmentFactory, IMPAIRMENT_ENTRIES
+from mike_simulator.input import InputHandler, InputMethod
+from mike_simulator.input.factory import InputHandlerFactory
+from mike_simulator.profiles import PerformanceProfile, PROFILES
 from mike_simulator.simulator import BackendSimulator
-from mike_simulator.util.lab_view_serialization import unflatten_from_string, flatten_to_string
+from mike_simulator.transport.batching import MotorStateBatcher
+from mike_simulator.transport.fanout import FanOutSender
+from mike_simulator.transport.control_framing import ControlFrameReader, AckBatcher, ACK, NACK
+from mike_simulator.util import PrintUtil, get_tick_time
+from mike_simulator.util.lab_view_serialization import unflatten_from_string, FixedSizeFlattener
 
 
 class MsgType(IntEnum):
@@ -18,101 +23,405 @@ class MsgType(IntEnum):
     PatientSelect = 1
     Control = 2
     Skip = 3
+    # Not sent by the frontend, starts/stops the sampling profiler (diagnostics tools)
+    ToggleProfiler = 4
+
+
+# Maximum number of bytes read from the control connection at once (no more data is read while this many bytes
+# are buffered and contain at least one complete message, which is handled first)
+CONTROL_RECV_SIZE = 65536
 
+# Entries of the Tracing section used by the latency tracer (changing other entries keeps its statistics)
+LATENCY_TRACER_ENTRIES = ('control_latency', 'trace_file', 'trace_max_events')
 
-@dataclass
-class MsgHeader:
-    type: MsgType = MsgType.Invalid
-    msg_len: int = 0
-header_format = b'BH'
-header_size = netstruct.minimum_size(header_format)
+# Time per cycle [s] after which no further buffered control messages are handled (the remaining ones are handled
+# in the next cycles), so that a burst of pipelined messages does not delay the motor data stream
+CONTROL_TIME_BUDGET = 0.0003
 
 
 class MikeServer:
-    def __init__(self, packet_loss_rng) -> None:
+    def __init__(self, impairment_seed: int, profile: PerformanceProfile = PROFILES['serve']) -> None:
+        # Run mode (scheduling, logging, keyboard hooks)
+        self.profile = profile
+
         # UDP socket for sending data to frontend
         self.data_client_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 
         # Frontend endpoint
         self.data_dest_endpoint = ('0.0.0.0', cfg.Network.motor_data_port)
 
+        # Motor data is sent to the frontend and all configured subscribers
+        self.motor_data_sender = FanOutSender(self.data_client_socket)
+
+        # Motor state packets are flattened into a single preallocated buffer
+        self.motor_state_flattener = FixedSizeFlattener(MotorState)
+        self.motor_state_packet = bytearray(self.motor_state_flattener.size)
+
+        # Collects multiple motor states per packet (if configured)
+        self.motor_state_batcher = self._create_batcher(cfg.Network)
+
         # Socket used to accept tcp connections
         self.server_socket: Optional[socket.socket] = None
 
-        # TCP connection to frontend
+        # TCP connection to frontend, messages are reassembled from the received bytes and acknowledged in batches
         self.connection: Optional[socket.socket] = None
+        self.control_reader = ControlFrameReader()
+        self.control_acks = AckBatcher()
+
+        # Simulated network conditions for outgoing motor data
+        self.impairment_seed = impairment_seed
+        self.impairment = ImpairmentFactory.create_pipeline(cfg.Network, impairment_seed)
+        self.impairment_cfg = cfg.Network
+
+        # Control message latency tracing and local metrics endpoint (if enabled)
+        self.latency_tracer: Optional['ControlLatencyTracer'] = None
+        self.metrics_server: Optional['MetricsServer'] = None
+        self.trace_file = ''
+        # Tracing section the tracer and the metrics server were started with
+        self.tracing_cfg = None
 
-        self.packet_loss_rng = packet_loss_rng
+        # Sampling profiler of the simulator thread (while profiling), hotkey state and configured profiler state
+        self.profiler: Optional['SamplingProfiler'] = None
+        self.profiler_hotkey_down = False
+        self.invalid_profiler_hotkey = ''
+        self.profiler_configured = False
 
         self.simulator = None
 
     def start(self):
-        self.simulator = BackendSimulator()
         self.server_socket = socket.create_server((cfg.Network.server_bind_ip, cfg.Network.patient_port), backlog=1)
+        self.simulator = BackendSimulator(self._create_input_handler(), realtime=self.profile.realtime,
+                                          logging_enabled=self.profile.logging_enabled)
+        config_service.subscribe('Network', self._on_network_config_changed)
+        config_service.subscribe('Input', self._on_input_config_changed)
+        self._start_tracing(cfg.Tracing)
+        self.profiler_configured = cfg.Tracing.profiler_enabled
+        if self.profiler_configured:
+            self.start_profiler()
+        config_service.subscribe('Tracing', self._on_tracing_config_changed)
+        config_service.subscribe('Tracing', self._on_profiler_config_changed)
 
     def stop(self):
         self.server_socket.close()
+        self._stop_tracing()
+        self.stop_profiler()
+        if self.simulator is not None:
+            self.simulator.close()
 
     def wait_for_connection(self):
+        # Motor states batched for the previous frontend are still sent to it
+        self._flush_motor_state_batch()
         print('Servers and client started, waiting for frontend to connect...')
         # Wait until frontend connects
         self.connection, (host_addr, port) = self.server_socket.accept()
+        self.control_reader.reset()
+        self.control_acks.reset()
         self.data_dest_endpoint = (host_addr, cfg.Network.motor_data_port)
+        self._update_motor_data_destinations(cfg.Network)
+        if self.motor_state_batcher is not None:
+            self.motor_state_batcher.reset()
         print('Frontend connected')
 
     def main_loop(self):
+        if self.profile.keyboard:
+            from keyboard import is_pressed
+        else:
+            is_pressed = None
+
         while True:
             try:
                 # Wait until at least one of the sockets is ready for receiving/sending
-                receive_socks, send_socks, _ = select.select([self.connection], [self.data_client_socket], [])
+                backpressure = self.control_reader.buffered() >= CONTROL_RECV_SIZE and self.control_reader.has_message()
+                read_socks = [] if backpressure else [self.connection]
+                receive_socks, send_socks, _ = select.select(read_socks, [self.data_client_socket], [])
                 for _ in receive_socks:
-                    header = self._recv_header()
-                    if header.type == MsgType.Invalid:
-                        # received invalid message (probably connection closed -> restart server)
+                    data = self.connection.recv(CONTROL_RECV_SIZE)
+                    if not data:
+                        # Connection closed -> restart server
                         return
+                    # Messages are traced from the time their last byte was received
+                    mark = None
+                    if self.latency_tracer is not None:
+                        mark = (time.perf_counter_ns(), self.simulator.cycle_counter)
+                    self.control_reader.feed(data, mark)
 
-                    data = self.connection.recv(header.msg_len)
-                    #print(f"Received: 0x{data.hex()}")
-                    if header.type == MsgType.PatientSelect:
-                        # Receive patient data from frontend and update simulator accordingly
-                        data = unflatten_from_string(data, PatientResponse)
-                        self.connection.send('X'.encode('utf-8'))
-                        self.simulator.update_patient_data(data)
-                    elif header.type == MsgType.Control:
-                        # Receive control signal from frontend and update simulator accordingly
-                        data = unflatten_from_string(data, ControlResponse)
-                        self.connection.send('X'.encode('utf-8'))
-                        self.simulator.update_control_data(data)
-                    elif header.type == MsgType.Skip:
-                        self.connection.send('X'.encode('utf-8'))
-                        self.simulator.handle_skip()
-                    else:
-                        print(f'ERROR: Message type {header.type} is currently not handled.')
-                        self.connection.send('?'.encode('utf-8'))
+                # Handle complete messages (several may arrive at once), acknowledge them with one send
+                if not self._handle_control_messages():
+                    # Received invalid message (protocol out of sync -> restart server)
+                    return
 
                 for sock in send_socks:
                     assert sock == self.data_client_socket
+                    # Apply configuration file changes (if any) between two cycles
+                    config_service.apply_pending()
+
                     # Get updated motor state from simulator
                     ms = self.simulator.get_motor_state()
+                    if self.latency_tracer is not None:
+                        # Handled messages take effect once no task preparation is in flight
+                        self.latency_tracer.motor_state_produced(ms.Counter, self.simulator.pending_task is None)
 
-                    if is_pressed('f10'):
-                        return
+                    if is_pressed is not None:
+                        if is_pressed('f10'):
+                            return
+                        self._poll_profiler_hotkey(is_pressed)
 
-                    # Send new motor state to frontend
-                    if self.packet_loss_rng.random() >= cfg.Network.motor_data_packet_loss_rate:
-                        data = flatten_to_string(ms)
-                        self.data_client_socket.sendto(data, self.data_dest_endpoint)
+                    # Send new motor state to frontend (once a complete packet is available in batched mode)
+                    if self.motor_state_batcher is not None:
+                        packet = self.motor_state_batcher.add(ms)
+                    else:
+                        packet = self.motor_state_packet
+                        self.motor_state_flattener.flatten_into(packet, 0, ms)
+                    if self.impairment.stages:
+                        # Pass through simulated network impairments, send all packets which are due
+                        now = get_tick_time()
+                        if packet is not None:
+                            self.impairment.submit(bytes(packet), now)
+                        for due_packet in self.impairment.pop_due(now):
+                            self.motor_data_sender.send(due_packet)
+                    elif packet is not None:
+                        self.motor_data_sender.send(packet)
+                    if packet is not None and self.latency_tracer is not None:
+                        self.latency_tracer.packet_sent()
             except ConnectionError:
                 return
 
-    def _recv_header(self) -> MsgHeader:
-        data = self.connection.recv(header_size)
-        if data:
-            data = netstruct.unpack(header_format, data)
-            return MsgHeader(*data)
+    def _on_network_config_changed(self, network_cfg):
+        # Ports and bind address are only used when (re)starting the servers
+        if self.motor_state_batcher is not None and self.motor_state_batcher.samples_per_packet != network_cfg.motor_data_samples_per_packet:
+            self._flush_motor_state_batch()
+        # Recreating the pipeline drops the packets it holds back and resets the loss model state
+        if any(getattr(self.impairment_cfg, name) != getattr(network_cfg, name) for name in IMPAIRMENT_ENTRIES):
+            self.impairment = ImpairmentFactory.create_pipeline(network_cfg, self.impairment_seed)
+            self.impairment_cfg = network_cfg
+        self._update_motor_data_destinations(network_cfg)
+        if self.motor_state_batcher is None or self.motor_state_batcher.samples_per_packet != network_cfg.motor_data_samples_per_packet:
+            self.motor_state_batcher = self._create_batcher(network_cfg)
+
+    def _flush_motor_state_batch(self):
+        """Send the motor states of the incomplete batched packet (if any) before the batcher is replaced or reset."""
+        if self.motor_state_batcher is None:
+            return
+        packet = self.motor_state_batcher.flush()
+        if packet is None:
+            return
+        # Bypasses the impairment pipeline, packets it holds back would only be sent with the next motor state
+        self.motor_data_sender.send(packet)
+        if self.latency_tracer is not None:
+            self.latency_tracer.packet_sent()
+
+    @staticmethod
+    def _create_batcher(network_cfg) -> Optional[MotorStateBatcher]:
+        if network_cfg.motor_data_samples_per_packet == 1:
+            return None
+        return MotorStateBatcher(network_cfg.motor_data_samples_per_packet)
+
+    def _update_motor_data_destinations(self, network_cfg):
+        destinations = [self.data_dest_endpoint] + network_cfg.motor_data_subscriber_endpoints
+        if network_cfg.motor_data_multicast_group:
+            destinations.append((network_cfg.motor_data_multicast_group, network_cfg.motor_data_port))
+        self.motor_data_sender.set_destinations(destinations, network_cfg.motor_data_multicast_ttl)
+
+    def _on_input_config_changed(self, input_cfg):
+        self.simulator.replace_input_handler(self._create_input_handler())
+
+    def _create_input_handler(self) -> InputHandler:
+        if self.profile.keyboard:
+            return BackendSimulator.create_configured_input_handler()
+        if cfg.Input.input_method == InputMethod.Keyboard:
+            # Keyboard input needs keyboard hooks, simulate a user who never presses a key instead
+            return InputHandlerFactory.create(InputMethod.Prerecorded)
+        return BackendSimulator.create_configured_input_handler(fallback=InputMethod.Prerecorded)
+
+    def _handle_control_messages(self) -> bool:
+        """
+        Handle buffered control messages until there are none left or the time budget of this cycle is used up.
+
+        :return: False if an invalid message was received
+        """
+        deadline = time.perf_counter() + CONTROL_TIME_BUDGET
+        while True:
+            message = self.control_reader.next_message()
+            if message is None:
+                break
+            msg_type, payload = message
+            if msg_type == MsgType.Invalid:
+                return False
+            self._handle_control_message(msg_type, payload)
+            if time.perf_counter() >= deadline:
+                break
+        self.control_acks.flush(self.connection)
+        return True
+
+    def _handle_control_message(self, msg_type: int, payload: bytes):
+        if msg_type == MsgType.PatientSelect:
+            # Receive patient data from frontend and update simulator accordingly
+            self.control_acks.add(ACK)
+            if self.profiler is not None:
+                # One profile per session
+                self.stop_profiler()
+                self.simulator.update_patient_data(unflatten_from_string(payload, PatientResponse))
+                self.start_profiler()
+            else:
+                self.simulator.update_patient_data(unflatten_from_string(payload, PatientResponse))
+            name = 'PatientSelect'
+        elif msg_type == MsgType.Control:
+            # Receive control signal from frontend and update simulator accordingly
+            data = unflatten_from_string(payload, ControlResponse)
+            self.control_acks.add(ACK)
+            if data.EmergencyStop:
+                # The simulator exits while handling the message, acknowledge everything before
+                self.control_acks.flush(self.connection)
+            self.simulator.update_control_data(data)
+            name = data.command_name()
+        elif msg_type == MsgType.Skip:
+            self.control_acks.add(ACK)
+            self.simulator.handle_skip()
+            name = 'Skip'
+        elif msg_type == MsgType.ToggleProfiler:
+            self.control_acks.add(ACK)
+            self.toggle_profiler()
+            name = 'ToggleProfiler'
         else:
-            return MsgHeader()
+            print(f'ERROR: Message type {msg_type} is currently not handled.')
+            self.control_acks.add(NACK)
+            return
+
+        if self.latency_tracer is not None and self.control_reader.received_at is not None:
+            self.latency_tracer.message_handled(name, *self.control_reader.received_at)
 
     def close_connection(self):
         self.connection.close()
         self.connection = None
+        self.impairment.clear()
+        if self.latency_tracer is not None:
+            self.latency_tracer.reset()
+            self._write_trace()
+
+    def _start_tracing(self, tracing_cfg):
+        self.tracing_cfg = tracing_cfg
+        self._start_latency_tracer(tracing_cfg)
+        self._start_metrics_server(tracing_cfg)
+
+    def _stop_tracing(self):
+        self._stop_latency_tracer()
+        self._stop_metrics_server()
+
+    def _start_latency_tracer(self, tracing_cfg):
+        if tracing_cfg.control_latency:
+            from mike_simulator.tracing import ChromeTraceWriter, ControlLatencyTracer
+            trace = ChromeTraceWriter(tracing_cfg.trace_max_events) if tracing_cfg.trace_file else None
+            self.latency_tracer = ControlLatencyTracer(trace)
+            self.trace_file = tracing_cfg.trace_file
+
+    def _stop_latency_tracer(self):
+        if self.latency_tracer is not None:
+            self._write_trace()
+            self.latency_tracer = None
+
+    def _start_metrics_server(self, tracing_cfg):
+        if tracing_cfg.metrics_address:
+            from mike_simulator.tracing import MetricsServer
+            host, _, port = tracing_cfg.metrics_address.rpartition(':')
+            try:
+                self.metrics_server = MetricsServer((host, int(port)), self._metrics_text, self._metrics_summary)
+                self.metrics_server.start()
+            except OSError as e:
+                print(f'Could not start metrics server at {tracing_cfg.metrics_address} {e.args}')
+                self.metrics_server = None
+
+    def _stop_metrics_server(self):
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+
+    def _write_trace(self):
+        if self.latency_tracer.trace is not None:
+            try:
+                self.latency_tracer.trace.write(self.trace_file)
+            except OSError as e:
+                print(f'Could not write trace file {self.trace_file} {e.args}')
+
+    def _on_tracing_config_changed(self, tracing_cfg):
+        # The tracer (with its statistics) and the metrics server are only restarted if their entries changed
+        previous, self.tracing_cfg = self.tracing_cfg, tracing_cfg
+        if any(getattr(previous, name) != getattr(tracing_cfg, name) for name in LATENCY_TRACER_ENTRIES):
+            self._stop_latency_tracer()
+            self._start_latency_tracer(tracing_cfg)
+        if previous.metrics_address != tracing_cfg.metrics_address:
+            self._stop_metrics_server()
+            self._start_metrics_server(tracing_cfg)
+
+    def _on_profiler_config_changed(self, tracing_cfg):
+        # Only follow changes of the entry, the profiler may have been toggled at runtime
+        if tracing_cfg.profiler_enabled != self.profiler_configured:
+            self.profiler_configured = tracing_cfg.profiler_enabled
+            if self.profiler_configured:
+                self.start_profiler()
+            else:
+                self.stop_profiler()
+
+    def toggle_profiler(self):
+        if self.profiler is None:
+            self.start_profiler()
+        else:
+            self.stop_profiler()
+
+    def start_profiler(self):
+        """Start sampling the simulator thread (does nothing if the profiler is already running)."""
+        if self.profiler is not None:
+            return
+        from mike_simulator.tracing import SamplingProfiler
+        profiler = SamplingProfiler(cfg.Tracing.profiler_clock_type, cfg.Tracing.profiler_interval)
+        try:
+            profiler.start()
+        except RuntimeError as e:
+            print(f'Could not start profiler {e.args}')
+            return
+        self.profiler = profiler
+        PrintUtil.print_normally(f'Profiling started ({profiler.clock.name} clock)')
+
+    def stop_profiler(self):
+        """Stop sampling and write the profile of the current session (if the profiler is running)."""
+        if self.profiler is None:
+            return
+        profiler, self.profiler = self.profiler, None
+        profiler.stop()
+        try:
+            filename = profiler.save(cfg.Tracing.profile_dir, self._session_label(), cfg.Tracing.profile_format_type)
+            PrintUtil.print_normally(f'Profile ({profiler.sample_count} samples) written to {filename}')
+        except Exception as e:
+            # Profiling is a diagnostics aid, it must never take the server down
+            print(f'Could not write profile to {cfg.Tracing.profile_dir} {e!r}')
+
+    def _session_label(self) -> str:
+        if self.simulator is None:
+            return 'NoSession'
+        # Task arrives from the frontend as plain integer
+        task = self.simulator.current_patient.Task
+        try:
+            return TaskType(task).name
+        except ValueError:
+            return f'Task{task}'
+
+    def _poll_profiler_hotkey(self, is_pressed):
+        hotkey = cfg.Tracing.profiler_hotkey
+        if not hotkey or hotkey == self.invalid_profiler_hotkey:
+            return
+        try:
+            hotkey_down = is_pressed(hotkey)
+        except ValueError as e:
+            print(f'Invalid profiler hotkey {hotkey} {e.args}')
+            self.invalid_profiler_hotkey = hotkey
+            return
+        if hotkey_down and not self.profiler_hotkey_down:
+            self.toggle_profiler()
+        self.profiler_hotkey_down = hotkey_down
+
+    def _metrics_text(self) -> str:
+        tracer = self.latency_tracer
+        return tracer.prometheus_text() if tracer is not None else ''
+
+    def _metrics_summary(self) -> dict:
+        tracer = self.latency_tracer
+        return {'control_latency': tracer.summary() if tracer is not None else {}}
@@ -0,0 +1,165 @@
+"""
+Publication of the motor state stream to co-located processes via shared memory.
+
+The simulator writes the motor state of every cycle into a ring buffer in a named shared memory block.
+Every slot is protected by a sequence counter (seqlock): the writer makes the counter odd before and even after
+writing a slot, readers copy the record and accept it only if the counter was even and unchanged around the copy.
+Readers therefore never block the writer, and any number of readers can consume the stream without slowing
+down the simulator.
+
+Memory layout (little endian):
+    header: magic (u32), version (u32), slot size (u32), slot count (u32), number of published states (u64)
+    slots:  sequence counter (u64), motor state record (see RECORD_STRUCT), padding to the slot size
+"""
+import os
+import struct
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+from mike_simulator.datamodels import MotorState, RomState
+
+DEFAULT_NAME = 'mike_simulator_motor_state'
+
+_MAGIC = 0x4D494B45
+_VERSION = 1
+_HEADER_STRUCT = struct.Struct('<IIIIQ')
+_COUNT_STRUCT = struct.Struct('<Q')
+_COUNT_OFFSET = 16
+_SEQ_STRUCT = struct.Struct('<Q')
+
+# Full precision copy of the MotorState fields (in declaration order)
+RECORD_STRUCT = struct.Struct('<I5dBB???')
+SLOT_SIZE = 64
+assert _SEQ_STRUCT.size + RECORD_STRUCT.size <= SLOT_SIZE
+
+# Names of the blocks created by publishers in this process
+_published_names = set()
+
+
+class SharedMotorStatePublisher:
+    """Writer side of the shared memory ring buffer, owned by the simulator"""
+
+    def __init__(self, name: str = DEFAULT_NAME, slot_count: int = 4096):
+        """
+        :param name: name of the shared memory block (must not exist yet)
+        :param slot_count: number of motor states kept in the ring buffer
+        """
+        self.slot_count = slot_count
+        self.shm = shared_memory.SharedMemory(name, create=True, size=_HEADER_STRUCT.size + slot_count * SLOT_SIZE)
+        self.buffer = self.shm.buf
+        _HEADER_STRUCT.pack_into(self.buffer, 0, _MAGIC, _VERSION, SLOT_SIZE, slot_count, 0)
+        self.count = 0
+        _published_names.add(self.shm.name)
+
+    def publish(self, ms: MotorState):
+        """Write ms into the next slot of the ring buffer."""
+        offset = _HEADER_STRUCT.size + (self.count % self.slot_count) * SLOT_SIZE
+        seq = 2 * self.count
+        _SEQ_STRUCT.pack_into(self.buffer, offset, seq + 1)
+        RECORD_STRUCT.pack_into(self.buffer, offset + _SEQ_STRUCT.size, ms.Counter, ms.Time, ms.Position,
+                                ms.StartingPosition, ms.TargetPosition, ms.Force, ms.TrialNr, ms.RomState,
+                                ms.TargetState, ms.Finished, ms.Flexion)
+        _SEQ_STRUCT.pack_into(self.buffer, offset, seq + 2)
+        self.count += 1
+        _COUNT_STRUCT.pack_into(self.buffer, _COUNT_OFFSET, self.count)
+
+    def close(self):
+        """Release and remove the shared memory block."""
+        self.buffer = None
+        _published_names.discard(self.shm.name)
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SharedMotorStateReader:
+    """Reader side of the shared memory ring buffer, used by tools running on the same host"""
+
+    def __init__(self, name: str = DEFAULT_NAME):
+        """
+        :param name: name of the shared memory block published by the simulator
+        :raise FileNotFoundError: if no simulator is publishing under that name
+        :raise ValueError: if the block does not contain a motor state ring buffer
+        """
+        self.shm = shared_memory.SharedMemory(name)
+        _untrack(self.shm)
+        self.buffer = self.shm.buf
+        magic, version, self.slot_size, self.slot_count, _ = _HEADER_STRUCT.unpack_from(self.buffer, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError(f'{name} is not a motor state ring buffer (or has an unsupported version)')
+
+        # Index of the next motor state returned by read_new
+        self.next_index = self.published_count()
+
+        # Number of motor states which were overwritten before they could be read
+        self.lost = 0
+
+    def published_count(self) -> int:
+        """Return the number of motor states published so far."""
+        return _COUNT_STRUCT.unpack_from(self.buffer, _COUNT_OFFSET)[0]
+
+    def read(self, index: int) -> Optional[MotorState]:
+        """
+        Read the index-th published motor state.
+
+        :return: the motor state, None if it was already overwritten (or not yet published)
+        """
+        fields = self._read_record(index)
+        if fields is None:
+            return None
+        return MotorState(*fields[:7], RomState(fields[7]), *fields[8:])
+
+    def read_latest(self) -> Optional[MotorState]:
+        """Return the most recently published motor state (None if nothing was published yet)."""
+        count = self.published_count()
+        while count > 0:
+            ms = self.read(count - 1)
+            if ms is not None:
+                return ms
+            count = self.published_count()
+        return None
+
+    def read_new(self) -> List[MotorState]:
+        """Return all motor states which were published since the last call (in order)."""
+        count = self.published_count()
+        if count - self.next_index > self.slot_count:
+            self.lost += count - self.slot_count - self.next_index
+            self.next_index = count - self.slot_count
+        states = []
+        for index in range(self.next_index, count):
+            ms = self.read(index)
+            if ms is None:
+                self.lost += 1
+            else:
+                states.append(ms)
+        self.next_index = count
+        return states
+
+    def close(self):
+        self.buffer = None
+        self.shm.close()
+
+    def _read_record(self, index: int) -> Optional[Tuple]:
+        offset = self.slot_size * (index % self.slot_count) + _HEADER_STRUCT.size
+        expected_seq = 2 * index + 2
+        if _SEQ_STRUCT.unpack_from(self.buffer, offset)[0] != expected_seq:
+            return None
+        fields = RECORD_STRUCT.unpack_from(self.buffer, offset + _SEQ_STRUCT.size)
+        # Discard the copy if the writer started overwriting the slot in the meantime
+        if _SEQ_STRUCT.unpack_from(self.buffer, offset)[0] != expected_seq:
+            return None
+        return fields
+
+
+def _untrack(shm: shared_memory.SharedMemory):
+    """
+    Prevent the resource tracker of a reader process from removing the shared memory block when the reader exits
+    (only the simulator, which created the block, should remove it).
+    """
+    if os.name != 'posix' or shm.name in _published_names:
+        return
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except (ImportError, AttributeError, KeyError):
+        pass
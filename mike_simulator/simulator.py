@@ -1,5 +1,7 @@
 import sys
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
 
@@ -7,9 +9,11 @@ from mike_simulator.task.factory import Task, TaskFactory
 from mike_simulator.config import cfg
 from mike_simulator.datamodels import ControlResponse, PatientResponse, MotorState, Constants
 from mike_simulator.input.factory import InputHandlerFactory
-from mike_simulator.input import InputMethod
+from mike_simulator.input import InputHandler, InputMethod
 from mike_simulator.logger import Logger
-from mike_simulator.util import PrintUtil
+from mike_simulator.metrics.recorder import TrialMetricsRecorder, format_trial_result
+from mike_simulator.util import PrintUtil, TimerWheel, get_current_time_ns, update_tick_time
+from mike_simulator.util.gc_control import AllocationSampler, GcMode, GcScheduler
 from mike_simulator.util.helpers import clamp
 
 
@@ -25,30 +29,118 @@ class SimulatorState(Enum):
     FINISHED = 4
 
 
+@dataclass
+class PreparedTask:
+    """Everything needed to run a newly selected task, prepared outside of the simulator loop"""
+    motor_state: MotorState
+    task: Task
+    logger: Optional[Logger]
+
+
 class BackendSimulator:
-    def __init__(self):
+    def __init__(self, input_handler: Optional[InputHandler] = None, realtime: bool = True, logging_enabled: Optional[bool] = None,
+                 shared_memory_enabled: Optional[bool] = None):
+        """
+        :param input_handler: input handler to use, if None it is created based on the configured input method
+        :param realtime: if False, cycles are not throttled to the robot cycle time and tasks are prepared
+                         synchronously (used for headless stepping)
+        :param logging_enabled: whether to write log files, if None the configured value is used
+        :param shared_memory_enabled: whether to publish the motor states in shared memory,
+                                      if None the configured value is used
+        """
         self.current_patient: PatientResponse = PatientResponse()
         self.current_state = SimulatorState.WAITING_FOR_PATIENT
-        self.current_motor_state: Optional[MotorState] = None
+        self.current_motor_state: MotorState = MotorState.new()
         self.current_task: Optional[Task] = None
         self.logger: Optional[Logger] = None
 
         self.last_update = -1
+        self.realtime = realtime
+        self.logging_enabled = logging_enabled
 
-        try:
-            self.input_handler = InputHandlerFactory.create(InputMethod[cfg.Input.method])
-        except Exception as e:
-            print(f'Error while setting up input method {cfg.Input.method} {e.args}. '
-                  f'Falling back to Keyboard Input...')
-            self.input_handler = InputHandlerFactory.create(InputMethod.Keyboard)
+        # Task construction and log file setup run in the background, so that motor data keeps flowing
+        self.preparation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='TaskPreparation') if realtime else None
+        self.pending_task: Optional[Future] = None
+
+        # Events scheduled by tasks (e.g. end of a waiting phase), checked once per cycle
+        self.timer_wheel = TimerWheel(resolution_ns=round(Constants.ROBOT_CYCLE_TIME * 1_000_000_000))
+
+        if input_handler is not None:
+            self.input_handler = input_handler
+        else:
+            self.input_handler = self.create_configured_input_handler()
 
         self.frontend_started = False
 
+        # Motor state publication for co-located readers
+        self.shared_motor_state = None
+        if cfg.SharedMemory.enabled if shared_memory_enabled is None else shared_memory_enabled:
+            from mike_simulator.shared_motor_state import SharedMotorStatePublisher
+            try:
+                self.shared_motor_state = SharedMotorStatePublisher(cfg.SharedMemory.name, cfg.SharedMemory.slot_count)
+            except OSError as e:
+                print(f'Could not create shared memory {cfg.SharedMemory.name} {e.args}, motor states are not published')
+
+        # Per-trial metrics computed while the session runs (printed at the end of every trial)
+        self.trial_metrics: Optional[TrialMetricsRecorder] = None
+        if cfg.Tasks.online_metrics:
+            self.trial_metrics = TrialMetricsRecorder()
+            self.trial_metrics.listeners.append(lambda result: PrintUtil.print_normally(format_trial_result(result)))
+
+        # Garbage collection in idle periods and allocation sampling (realtime loop only)
+        self.gc_scheduler: Optional[GcScheduler] = None
+        self.allocation_sampler: Optional[AllocationSampler] = None
+        self.last_trial_nr = 0
+        if realtime:
+            if cfg.Realtime.gc_mode_type == GcMode.Scheduled:
+                self.gc_scheduler = GcScheduler(cfg.Realtime.gc_young_threshold)
+            if cfg.Realtime.alloc_sample_interval > 0.0:
+                self.allocation_sampler = AllocationSampler(cfg.Realtime.alloc_sample_interval,
+                                                            cfg.Realtime.alloc_sample_cycles, self.gc_scheduler)
+
         self.cycle_counter = 0
-        self.start_time = time.time_ns()
+        self.start_time = get_current_time_ns()
 
         self._reset()
 
+        # Everything allocated so far (modules, configuration, ...) lives until the end and is frozen
+        if self.gc_scheduler is not None:
+            self.gc_scheduler.start()
+
+    @staticmethod
+    def create_configured_input_handler(fallback: InputMethod = InputMethod.Keyboard) -> InputHandler:
+        """Create the configured input handler (or one of type fallback if that fails)."""
+        try:
+            return InputHandlerFactory.create(cfg.Input.input_method)
+        except Exception as e:
+            print(f'Error while setting up input method {cfg.Input.method} {e.args}. '
+                  f'Falling back to {fallback.name} Input...')
+            return InputHandlerFactory.create(fallback)
+
+    def replace_input_handler(self, input_handler: InputHandler):
+        """Switch to a different input handler, a running task continues with the new handler."""
+        movement_locked = self.input_handler.movement_locked
+        self.input_handler.finish_task()
+        self.input_handler = input_handler
+        self.input_handler.begin_task(self.current_task)
+        if not movement_locked:
+            self.input_handler.unlock_movement()
+
+    def close(self):
+        """Release resources held by the simulator."""
+        if self.logger is not None:
+            self.logger.close()
+            self.logger = None
+        if self.shared_motor_state is not None:
+            self.shared_motor_state.close()
+            self.shared_motor_state = None
+        if self.preparation_executor is not None:
+            self.preparation_executor.shutdown(wait=False)
+        if self.allocation_sampler is not None:
+            self.allocation_sampler.stop()
+        if self.gc_scheduler is not None:
+            self.gc_scheduler.stop()
+
     def goto_state(self, new_state: SimulatorState):
         self.current_state = new_state
 
@@ -64,14 +156,44 @@ class BackendSimulator:
         PrintUtil.print_normally(f'Received {data}')
         self.current_patient = data
         self._reset()
+        if self.preparation_executor is not None:
+            # The prepared task is activated by the simulator loop as soon as it is ready
+            self.pending_task = self.preparation_executor.submit(self._prepare_task, data)
+        else:
+            try:
+                self._activate_prepared_task(self._prepare_task(data))
+            except ValueError as err:
+                print(err.args)
+
+    def _prepare_task(self, patient: PatientResponse) -> PreparedTask:
+        """Create task (including its trial plan) and log file for the selected patient."""
+        motor_state = MotorState.new()
+        task = TaskFactory.create(patient.Task, motor_state, patient)
+        logger = None
+        logging_enabled = cfg.Logging.enabled if self.logging_enabled is None else self.logging_enabled
+        if logging_enabled:
+            logger = Logger(patient)
+        return PreparedTask(motor_state, task, logger)
+
+    def _activate_pending_task(self):
+        """Swap in the prepared task (waits for the preparation to finish if necessary)."""
+        pending_task, self.pending_task = self.pending_task, None
         try:
-            self.current_task = TaskFactory.create(data.Task, self.current_motor_state, self.current_patient)
-            self.input_handler.begin_task(self.current_task)
-            if cfg.Logging.enabled:
-                self.logger = Logger(self.current_patient)
-            self.goto_state(SimulatorState.READY)
+            prepared = pending_task.result()
         except ValueError as err:
             print(err.args)
+            return
+        self._activate_prepared_task(prepared)
+
+    def _activate_prepared_task(self, prepared: PreparedTask):
+        self.current_motor_state = prepared.motor_state
+        self.current_task = prepared.task
+        self.current_task.timer_wheel = self.timer_wheel
+        self.logger = prepared.logger
+        if self.trial_metrics is not None:
+            self.trial_metrics.begin_session(self.current_task.trial_metrics)
+        self.input_handler.begin_task(self.current_task)
+        self.goto_state(SimulatorState.READY)
 
     def update_control_data(self, data: ControlResponse):
         PrintUtil.print_normally(f'Received {data}')
@@ -82,9 +204,11 @@ class BackendSimulator:
             self._reset()
             self.goto_state(SimulatorState.WAITING_FOR_PATIENT)
         elif data.Start:
+            if self.pending_task is not None:
+                self._activate_pending_task()
             if self.check_in_state(SimulatorState.READY, SimulatorState.RUNNING):
+                self.last_update = update_tick_time()
                 self.current_task.on_start(self.current_motor_state, self.input_handler, data.StartingPosition, data.TargetPosition)
-                self.last_update = time.time_ns()
                 self.goto_state(SimulatorState.RUNNING)
         elif data.FrontendStarted:
             if self.check_in_state(SimulatorState.RUNNING):
@@ -92,7 +216,10 @@ class BackendSimulator:
                 self.frontend_started = True
 
     def handle_skip(self):
+        if self.pending_task is not None:
+            self._activate_pending_task()
         if self.check_in_state(SimulatorState.READY, SimulatorState.RUNNING):
+            update_tick_time()
             self.current_task.on_skip(self.current_motor_state)
 
     def get_motor_state(self) -> MotorState:
@@ -101,17 +228,30 @@ class BackendSimulator:
         return self.current_motor_state
 
     def _reset(self):
-        self.current_motor_state = MotorState.new()
+        self.pending_task = None
+        self.current_motor_state.reset()
         self.current_task = None
+        if self.logger is not None:
+            self.logger.close()
         self.logger = None
+        if self.trial_metrics is not None:
+            self.trial_metrics.end_session(emit=False)
+        self.timer_wheel.clear()
         self.input_handler.finish_task()
 
     def _update_motor_state(self):
-        # Compute delta time
-        current_time = time.time_ns()
+        if self.allocation_sampler is not None:
+            self.allocation_sampler.begin_cycle()
+
+        # Capture time of this cycle (used by all components updated within the cycle) and compute delta time
+        current_time = update_tick_time()
         delta_time = (current_time - self.last_update) / 1_000_000_000
         self.last_update = current_time
 
+        # Activate newly selected task once it has been prepared
+        if self.pending_task is not None and self.pending_task.done():
+            self._activate_pending_task()
+
         # Update user input state
         self.input_handler.update_input_state(self.current_motor_state, delta_time)
 
@@ -120,33 +260,57 @@ class BackendSimulator:
         pos = self.current_motor_state.Position
         self.current_motor_state.Force = input_state.force
         self.current_motor_state.Position = self.clamp_position(pos + input_state.velocity * delta_time)
+        elapsed_time = (current_time - self.start_time) / 1_000_000_000
 
         # Update task state (if any)
         if self.current_task is not None:
+            # Deliver expired task timers
+            for task, data in self.timer_wheel.pop_due(current_time):
+                if task is self.current_task:
+                    task.on_timer(self.current_motor_state, self.input_handler, data)
+
             self.current_task.on_update(self.current_motor_state, self.input_handler)
 
+            if self.trial_metrics is not None and self.current_state == SimulatorState.RUNNING:
+                self.trial_metrics.update(self.current_motor_state, input_state, elapsed_time)
+
             # Check if task is finished
             if self.current_task.is_finished():
                 if self.check_in_state(SimulatorState.RUNNING):
+                    if self.trial_metrics is not None:
+                        self.trial_metrics.end_session()
                     self.input_handler.finish_task()
                     self.current_task = None
-                    self.current_motor_state = MotorState.new(Finished=True)
+                    self.current_motor_state.reset(Finished=True)
                     self.goto_state(SimulatorState.FINISHED)
 
         # Update counter
-        elapsed_time = (time.time_ns() - self.start_time) / 1_000_000_000
         self.current_motor_state.Counter = self.cycle_counter
         self.current_motor_state.Time = elapsed_time
         self.cycle_counter += 1
 
         self.frontend_started = self.frontend_started and self.current_motor_state.TargetState
 
+        if self.shared_motor_state is not None:
+            self.shared_motor_state.publish(self.current_motor_state)
+
         if self.logger is not None:
             if self.cycle_counter % Constants.LOG_CYCLES == 0:
                 self.logger.log(elapsed_time, self.current_motor_state, self.frontend_started, self.input_handler.current_input_state)
 
+        if self.allocation_sampler is not None:
+            self.allocation_sampler.end_cycle()
+
         # Wait 1ms to simulate 1kHz update frequency, accuracy of this depends on OS
-        time.sleep(Constants.ROBOT_CYCLE_TIME)
+        if self.realtime:
+            # Garbage collections (if due) run in the waiting time
+            collection_time = 0.0
+            if self.gc_scheduler is not None:
+                trial_changed = self.current_motor_state.TrialNr != self.last_trial_nr
+                self.last_trial_nr = self.current_motor_state.TrialNr
+                collection_time = self.gc_scheduler.on_cycle(self.current_state != SimulatorState.RUNNING,
+                                                             trial_changed)
+            time.sleep(max(0.0, Constants.ROBOT_CYCLE_TIME - collection_time))
 
     @staticmethod
     def clamp_position(pos: float):
@@ -1,28 +1,71 @@
+from typing import Dict, Type
+
+from mike_simulator.config import cfg
 from mike_simulator.task import Task
-from mike_simulator.task.types import *
 from mike_simulator.datamodels import TaskType
+from mike_simulator.util.helpers import import_attribute
 
 # Dict for looking up class corresponding to task type
-from mike_simulator.task.types.trajectory_perception import TrajectoryPerceptionAssessment
-
+# Classes are referenced by (module, class name) and only imported once a task of that type is created
 _tasks_class_by_type = {
-    TaskType.Force: ForceAssessment,
-    TaskType.PositionMatching: PositionMatchingAssessment,
-    TaskType.RangeOfMotion: RangeOfMotionAssessment,
-    TaskType.Motor: MotorAssessment,
-    TaskType.SensoriMotor: SensoriMotorAssessment,
-    TaskType.PreciseReaching: PreciseReachAssessment,
-    TaskType.PassiveMatching: PassiveMatchingAssessment,
-    TaskType.ActiveMatching: ActiveMatchingAssessment,
-    TaskType.TeachAndReproduce: TeachAndReproduceAssessment,
-    TaskType.HapticBump: HapticBumpAssessment,
-    TaskType.TrajectoryPerception: TrajectoryPerceptionAssessment,
+    TaskType.Force: ('force', 'ForceAssessment'),
+    TaskType.PositionMatching: ('pos_match', 'PositionMatchingAssessment'),
+    TaskType.RangeOfMotion: ('rom', 'RangeOfMotionAssessment'),
+    TaskType.Motor: ('motor', 'MotorAssessment'),
+    TaskType.SensoriMotor: ('sensorimotor', 'SensoriMotorAssessment'),
+    TaskType.PreciseReaching: ('precise_reach', 'PreciseReachAssessment'),
+    TaskType.PassiveMatching: ('passive_matching', 'PassiveMatchingAssessment'),
+    TaskType.ActiveMatching: ('active_matching', 'ActiveMatchingAssessment'),
+    TaskType.TeachAndReproduce: ('teach_and_reproduce', 'TeachAndReproduceAssessment'),
+    TaskType.HapticBump: ('haptic_bump', 'HapticBumpAssessment'),
+    TaskType.TrajectoryPerception: ('trajectory_perception', 'TrajectoryPerceptionAssessment'),
 }
 
+# Task classes defined by protocol files, these take precedence over the built-in task classes
+_protocol_classes_by_type: Dict[TaskType, Type[Task]] = {}
+_protocol_loader = None
+
 
 class TaskFactory:
     @staticmethod
-    def create(task: TaskType, motor_state, patient_data) -> Task:
-        if (_tasks_class_by_type.get(task) is None):
+    def register(task: TaskType, task_class: Type[Task]):
+        """Use task_class (instead of the built-in task class) for tasks of the specified TaskType."""
+        _protocol_classes_by_type[task] = task_class
+
+    @staticmethod
+    def load_protocols(directory: str):
+        """
+        (Re-)register the tasks defined by the protocol files in directory.
+
+        Unmodified protocol files are not parsed again, tasks whose protocol file was removed fall back to the
+        built-in task class.
+        """
+        global _protocol_loader
+        if _protocol_loader is None:
+            from mike_simulator.task.protocol import ProtocolLoader
+            _protocol_loader = ProtocolLoader()
+        _protocol_classes_by_type.clear()
+        for task, task_class in _protocol_loader.load_directory(directory).items():
+            TaskFactory.register(task, task_class)
+
+    @staticmethod
+    def get_class(task: TaskType) -> Type[Task]:
+        """Return the class implementing the specified TaskType (importing its module if necessary)."""
+        protocol_class = _protocol_classes_by_type.get(task)
+        if protocol_class is not None:
+            return protocol_class
+        entry = _tasks_class_by_type.get(task)
+        if entry is None:
             raise ValueError('TaskType unknown')
-        return _tasks_class_by_type[task](motor_state, patient_data)
+        if isinstance(entry, tuple):
+            module_name, class_name = entry
+            entry = import_attribute(f'mike_simulator.task.types.{module_name}', class_name)
+            _tasks_class_by_type[task] = entry
+        return entry
+
+    @staticmethod
+    def create(task: TaskType, motor_state, patient_data) -> Task:
+        # Pick up new or modified protocol files whenever a task is selected
+        if cfg.Tasks.protocol_dir:
+            TaskFactory.load_protocols(cfg.Tasks.protocol_dir)
+        return TaskFactory.get_class(task)(motor_state, patient_data)
@@ -1,17 +1,29 @@
 from abc import ABCMeta, abstractmethod
+from typing import Any, Dict, Optional
 
 from mike_simulator.datamodels import MotorState
-from mike_simulator.input import InputHandler
+from mike_simulator.input import InputHandler, UserMovement
+from mike_simulator.metrics import MetricAccumulator
+from mike_simulator.util import TimerWheel, TimerHandle, get_tick_time_ns
 
 
 class Task(metaclass=ABCMeta):
     """Abstract interface for a task"""
 
+    # Type of user movement which input handlers should simulate for this task
+    USER_MOVEMENT = UserMovement.Disabled
+
     # Abstract Interface
 
     def __init__(self, state):
         self.state = state
 
+        # Timer wheel of the simulator running this task (set by the simulator when the task is activated)
+        self.timer_wheel: Optional[TimerWheel] = None
+
+        # Streaming metrics updated by the task, included (by name) in the trial results of the simulator
+        self.trial_metrics: Dict[str, MetricAccumulator] = {}
+
     @abstractmethod
     def on_start(self, motor_state: MotorState, input_handler: InputHandler, starting_position: float, target_position: float):
         """Should be called whenever the frontend issued a start command."""
@@ -26,6 +38,10 @@ class Task(metaclass=ABCMeta):
         """Called when the backend receives a skip signal"""
         pass
 
+    def on_timer(self, motor_state: MotorState, input_handler: InputHandler, data: Any):
+        """Called (before on_update) when a timer scheduled using schedule_timer expired."""
+        pass
+
     # Helper Functionality
 
     def is_finished(self) -> bool:
@@ -40,6 +56,10 @@ class Task(metaclass=ABCMeta):
         """Perform an task state transition."""
         self.state = state
 
+    def schedule_timer(self, delay: float, data: Any = None) -> TimerHandle:
+        """Schedule a call to on_timer(..., data) in delay seconds (relative to the current tick time)."""
+        return self.timer_wheel.schedule(get_tick_time_ns() + round(delay * 1_000_000_000), (self, data))
+
     @abstractmethod
     def _prepare_next_trial_or_finish(self, motor_state: MotorState):
         """This should be called internally at the beginning and whenever a trial is finished"""
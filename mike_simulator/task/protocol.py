@@ -0,0 +1,246 @@
+"""
+Tasks defined by protocol files (JSON or YAML) instead of Python classes.
+
+A protocol file declares the states, the trial plan and the transition table of a task and which TaskType
+(i.e. which task of the frontend) it implements. Example (YAML):
+
+    name: Slow passive matching
+    task_type: PassiveMatching
+    user_movement: Disabled                 # Disabled (default), Normal or Burst
+    states: [STANDBY, MOVING_TO_START, MOVING_TO_TARGET, USER_INPUT]
+    trial_count: 5                          # optional, defaults to the trial count sent by the frontend
+    initial_values: {StartingPosition: 30.0}
+    trials:                                 # optional, motor state values of the trials (repeated as needed)
+      shuffle: true
+      values:
+        - {TargetPosition: 50.0}
+        - {TargetPosition: 70.0}
+    transitions:
+      - {state: STANDBY, event: Start, next: MOVING_TO_START, mover: {target: StartingPosition, duration: 5.0}}
+      - state: MOVING_TO_START
+        next: MOVING_TO_TARGET
+        guard: movement_finished
+        actions: [{print: Reached start}]
+        mover: {target: TargetPosition, duration: 5.0}
+      ...
+
+Positions are specified for the left hand and mirrored for the right hand. Guards and actions are referenced by
+the names of the standard guards/actions of the state machine engine, parametrized ones are written as
+{set: FIELD, value: VALUE}, {print: TEXT}, {start_timer: DURATION}, {start_timeout: DURATION} (fires the
+Timeout transitions of the then current state), {mark_time: ATTRIBUTE} and
+{time_elapsed_since: ATTRIBUTE, duration: DURATION}. Values can be constants, MotorState field names or
+task attribute names (e.g. target_position, which holds the target position sent with the last start command).
+
+Every trial starts in the first state. Protocol files are parsed once; the resulting task class (including its
+compiled state machine) is cached until the file is modified.
+"""
+import json
+import os
+import random
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from mike_simulator.task.state_machine import StateMachineTask, Transition, Event, LinearMove, ANY, GUARDS, \
+    ACTIONS, set_motor_state, print_message, start_timer, start_timeout, mark_time, \
+    time_elapsed_since
+from mike_simulator.datamodels import MotorState, PatientResponse, TaskType
+from mike_simulator.input import UserMovement
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+PROTOCOL_EXTENSIONS = ('.json', '.yaml', '.yml')
+
+# MotorState fields holding positions, constant values for those are mirrored for the right hand
+_position_fields = ('Position', 'StartingPosition', 'TargetPosition')
+
+
+class ProtocolTask(StateMachineTask):
+    """Base class of all task classes generated from protocol files"""
+
+    # Set by the generated subclasses
+    TRIAL_COUNT: Optional[int] = None
+    INITIAL_VALUES: Dict[str, Any] = {}
+    TRIAL_VALUES: List[Dict[str, Any]] = []
+    SHUFFLE_TRIALS = False
+
+    def __init__(self, motor_state: MotorState, patient: PatientResponse) -> None:
+        super().__init__(self.STATES(0))
+        self.direction = 1.0 if patient.LeftHand else -1.0
+        self.trial_count = self.TRIAL_COUNT if self.TRIAL_COUNT is not None else patient.PhaseTrialCount
+
+        # Target position sent with the start command (see accept_target_position)
+        self.target_position = 0.0
+
+        # Precompute trial plan
+        self.trials = []
+        if self.TRIAL_VALUES:
+            self.trials = [self.TRIAL_VALUES[i % len(self.TRIAL_VALUES)] for i in range(self.trial_count)]
+            if self.SHUFFLE_TRIALS:
+                random.shuffle(self.trials)
+
+        # Set initial values and initialize trial
+        self._apply_values(motor_state, self.INITIAL_VALUES)
+        self._prepare_next_trial_or_finish(motor_state)
+
+    def _prepare_next_trial_or_finish(self, motor_state: MotorState):
+        if motor_state.TrialNr == self.trial_count:
+            self.goto_state(self.STATES.FINISHED)
+        else:
+            if self.trials:
+                self._apply_values(motor_state, self.trials[motor_state.TrialNr])
+            motor_state.TrialNr += 1
+            self.goto_state(self.STATES(0))
+
+    def _apply_values(self, motor_state: MotorState, values: Dict[str, Any]):
+        for field, value in values.items():
+            setattr(motor_state, field, value * self.direction if field in _position_fields else value)
+
+
+def _mirrored(value, field: str):
+    """Value reference which mirrors constant positions for the right hand."""
+    if field in _position_fields and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return lambda task, motor_state: value * task.direction
+    return value
+
+
+def _parse_guard(guard):
+    if guard is None or isinstance(guard, str):
+        if guard is not None and guard not in GUARDS:
+            raise ValueError(f'unknown guard {guard!r}')
+        return guard
+    if isinstance(guard, dict) and 'time_elapsed_since' in guard:
+        return time_elapsed_since(guard['time_elapsed_since'], float(guard['duration']))
+    raise ValueError(f'invalid guard {guard!r}')
+
+
+def _parse_action(action):
+    if isinstance(action, str):
+        if action not in ACTIONS:
+            raise ValueError(f'unknown action {action!r}')
+        return action
+    if isinstance(action, dict):
+        if 'set' in action:
+            return set_motor_state(action['set'], _mirrored(action['value'], action['set']))
+        if 'print' in action:
+            return print_message(str(action['print']))
+        if 'start_timer' in action:
+            return start_timer(action['start_timer'])
+        if 'start_timeout' in action:
+            return start_timeout(action['start_timeout'])
+        if 'mark_time' in action:
+            return mark_time(action['mark_time'])
+    raise ValueError(f'invalid action {action!r}')
+
+
+def _parse_transition(entry: Dict[str, Any], states: Type[IntEnum]) -> Transition:
+    def state(name):
+        if name is None:
+            return None
+        if name == 'ANY':
+            return ANY
+        try:
+            return states[name]
+        except KeyError:
+            raise ValueError(f'unknown state {name!r}')
+
+    actions = entry.get('actions', [])
+    if not isinstance(actions, list):
+        actions = [actions]
+    mover = entry.get('mover')
+    if mover is not None:
+        mover = LinearMove(_mirrored(mover['target'], 'TargetPosition'), mover['duration'])
+    return Transition(state(entry['state']),
+                      state(entry.get('next')),
+                      Event[entry.get('event', 'Update')],
+                      _parse_guard(entry.get('guard')),
+                      tuple(_parse_action(action) for action in actions),
+                      mover)
+
+
+def build_protocol_task(definition: Dict[str, Any]) -> Tuple[TaskType, Type[ProtocolTask]]:
+    """
+    Build a task class from a parsed protocol definition.
+
+    :return: the TaskType implemented by the protocol and the generated task class
+    :raise ValueError: if the definition is invalid
+    """
+    try:
+        task_type = TaskType[definition['task_type']]
+        name = definition.get('name', task_type.name)
+        state_names = list(definition['states'])
+        states = IntEnum(f'{task_type.name}ProtocolState', [(s, i) for i, s in enumerate(state_names)] + [('FINISHED', -1)])
+        trials = definition.get('trials', {})
+        attributes = {
+            '__module__': __name__,
+            'PROTOCOL_NAME': name,
+            'USER_MOVEMENT': UserMovement[definition.get('user_movement', 'Disabled')],
+            'STATES': states,
+            'TRANSITIONS': tuple(_parse_transition(entry, states) for entry in definition['transitions']),
+            'TRIAL_COUNT': definition.get('trial_count'),
+            'INITIAL_VALUES': dict(definition.get('initial_values', {})),
+            'TRIAL_VALUES': list(trials.get('values', [])),
+            'SHUFFLE_TRIALS': bool(trials.get('shuffle', False)),
+        }
+    except KeyError as err:
+        raise ValueError(f'missing or unknown entry {err}')
+    task_class = type(f'{task_type.name}Protocol', (ProtocolTask,), attributes)
+    # Compile now, so that errors in the transition table are reported when loading the protocol
+    task_class.get_state_machine()
+    return task_type, task_class
+
+
+def parse_protocol_file(filename: str) -> Dict[str, Any]:
+    with open(filename, 'r', encoding='utf-8') as file:
+        if filename.endswith('.json'):
+            return json.load(file)
+        if yaml is None:
+            raise ValueError('PyYAML is required to load YAML protocol files')
+        return yaml.safe_load(file)
+
+
+class ProtocolLoader:
+    """Loads protocol files and caches the generated task classes until the files are modified"""
+
+    def __init__(self):
+        self._cache: Dict[str, Tuple[int, TaskType, Type[ProtocolTask]]] = {}
+
+    def load(self, filename: str) -> Tuple[TaskType, Type[ProtocolTask]]:
+        """
+        Load a single protocol file (from cache, if it was not modified since it was loaded).
+
+        :raise ValueError: if the protocol file is invalid
+        """
+        mtime = os.stat(filename).st_mtime_ns
+        cached = self._cache.get(filename)
+        if cached is not None and cached[0] == mtime:
+            return cached[1], cached[2]
+        try:
+            task_type, task_class = build_protocol_task(parse_protocol_file(filename))
+        except (ValueError, TypeError, OSError) as err:
+            raise ValueError(f'Invalid protocol file {filename}: {err}')
+        self._cache[filename] = (mtime, task_type, task_class)
+        return task_type, task_class
+
+    def load_directory(self, directory: str) -> Dict[TaskType, Type[ProtocolTask]]:
+        """
+        Load all protocol files in directory (invalid files are reported and skipped).
+
+        :return: dictionary mapping task types to the task classes defined by the protocol files
+        """
+        classes = {}
+        if not os.path.isdir(directory):
+            return classes
+        for entry in sorted(os.listdir(directory)):
+            if entry.endswith(PROTOCOL_EXTENSIONS):
+                try:
+                    task_type, task_class = self.load(os.path.join(directory, entry))
+                except ValueError as err:
+                    print(err.args[0])
+                    continue
+                if task_type in classes:
+                    print(f'Protocol {entry} overrides another protocol for {task_type.name}')
+                classes[task_type] = task_class
+        return classes
@@ -0,0 +1,344 @@
+from dataclasses import dataclass, fields
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from mike_simulator.task import Task
+from mike_simulator.auto_movement.factory import AutoMover, AutoMoverFactory
+from mike_simulator.datamodels import MotorState
+from mike_simulator.input import InputHandler
+from mike_simulator.util import PrintUtil, Timer, TimerHandle, get_tick_time
+
+# Guards and actions are called with (task, motor_state, input_handler)
+Guard = Callable[[Task, MotorState, InputHandler], bool]
+Action = Callable[[Task, MotorState, InputHandler], None]
+
+# Values used by transitions can be constants, the name of a MotorState field, the name of a task attribute
+# or a callable computing the value from (task, motor_state)
+ValueRef = Union[float, bool, str, Callable[[Task, MotorState], Any]]
+
+# Use as state of a transition which should be considered in every state
+ANY = None
+
+_motor_state_fields = {field.name for field in fields(MotorState)}
+
+
+class Event(Enum):
+    Start = 0
+    Update = 1
+    Skip = 2
+    # Timer started using start_timeout expired
+    Timeout = 3
+
+
+@dataclass(frozen=True)
+class LinearMove:
+    """Mover spec: linear movement from the current robot position to target within duration seconds"""
+    target: ValueRef
+    duration: ValueRef
+
+
+@dataclass(frozen=True)
+class Transition:
+    """
+    Single entry of a task's transition table.
+
+    When the task receives event while being in state (and guard returns True), the actions are executed in order,
+    the automatic movement described by mover is started and the task goes to next_state.
+    Transitions without next_state stay in the current state (the actions may still change the state).
+
+    For the Update event, only the first matching transition of the current state fires (like an if/elif ladder).
+    For Start and Skip, all transitions are checked in table order against the then current state
+    (like a sequence of if statements), so that e.g. finishing a trial and starting the next one can happen
+    in response to the same start command.
+    Timeout transitions behave like Update transitions, but are only checked once when a timeout expires.
+    """
+    state: Optional[int]
+    next_state: Optional[int] = None
+    event: Event = Event.Update
+    guard: Union[None, str, Guard] = None
+    action: Union[None, str, Action, Sequence[Union[str, Action]]] = None
+    mover: Optional[LinearMove] = None
+
+
+# Standard guards
+
+def movement_finished(task, motor_state: MotorState, input_handler: InputHandler) -> bool:
+    """Move the robot using the task's auto mover and check whether the movement has finished."""
+    return motor_state.move_using(task.auto_mover).has_finished()
+
+
+def target_movement_finished(task, motor_state: MotorState, input_handler: InputHandler) -> bool:
+    """Move the target position using the task's auto mover and check whether the movement has finished."""
+    return motor_state.move_target_using(task.auto_mover).has_finished()
+
+
+def timer_finished(task, motor_state: MotorState, input_handler: InputHandler) -> bool:
+    return task.timer.has_finished()
+
+
+def time_elapsed_since(attribute: str, duration: float) -> Guard:
+    """Guard which checks whether more than duration seconds elapsed since the time stored in a task attribute."""
+    def guard(task, motor_state: MotorState, input_handler: InputHandler) -> bool:
+        return get_tick_time() - getattr(task, attribute) > duration
+    return guard
+
+
+# Standard actions
+
+def lock_movement(task, motor_state: MotorState, input_handler: InputHandler):
+    input_handler.lock_movement()
+
+
+def unlock_movement(task, motor_state: MotorState, input_handler: InputHandler):
+    input_handler.unlock_movement()
+
+
+def reset_input(task, motor_state: MotorState, input_handler: InputHandler):
+    input_handler.reset_input()
+
+
+def prepare_next_trial(task, motor_state: MotorState, input_handler: InputHandler):
+    task._prepare_next_trial_or_finish(motor_state)
+
+
+def reset_trial_metrics(task, motor_state: MotorState, input_handler: InputHandler):
+    """Discard the samples of all metrics in task.trial_metrics."""
+    for accumulator in task.trial_metrics.values():
+        accumulator.reset()
+
+
+def accept_starting_position(task, motor_state: MotorState, input_handler: InputHandler):
+    """Use the starting position sent with the start command."""
+    motor_state.StartingPosition = task.requested_starting_position
+
+
+def accept_target_position(task, motor_state: MotorState, input_handler: InputHandler):
+    """Remember the target position sent with the start command (as task attribute target_position)."""
+    task.target_position = task.requested_target_position
+
+
+def print_position(task, motor_state: MotorState, input_handler: InputHandler):
+    if PrintUtil.inplace_due():
+        PrintUtil.print_inplace(f'Current pos: {motor_state.Position:.3f}°')
+
+
+def print_force(task, motor_state: MotorState, input_handler: InputHandler):
+    if PrintUtil.inplace_due():
+        PrintUtil.print_inplace(f'Current force: {motor_state.Force:.3f} N')
+
+
+def print_message(text: str) -> Action:
+    def action(task, motor_state: MotorState, input_handler: InputHandler):
+        PrintUtil.print_normally(text)
+    return action
+
+
+def set_motor_state(field: str, value: ValueRef) -> Action:
+    """Action which sets a MotorState field to the given value."""
+    get_value = compile_value(value)
+
+    def action(task, motor_state: MotorState, input_handler: InputHandler):
+        setattr(motor_state, field, get_value(task, motor_state))
+    return action
+
+
+def start_timer(duration: ValueRef) -> Action:
+    get_duration = compile_value(duration)
+
+    def action(task, motor_state: MotorState, input_handler: InputHandler):
+        task.timer.start(get_duration(task, motor_state))
+    return action
+
+
+def start_timeout(duration: ValueRef) -> Action:
+    """
+    Action which fires the Timeout transitions of the then current state after duration seconds.
+    Unlike timer guards, the waiting state is not polled every cycle. Starting a new timeout cancels the previous one.
+    """
+    get_duration = compile_value(duration)
+
+    def action(task, motor_state: MotorState, input_handler: InputHandler):
+        if task.timeout is not None:
+            task.timer_wheel.cancel(task.timeout)
+        task.timeout = task.schedule_timer(get_duration(task, motor_state), Event.Timeout)
+    return action
+
+
+def mark_time(attribute: str) -> Action:
+    """Action which stores the current time in a task attribute."""
+    def action(task, motor_state: MotorState, input_handler: InputHandler):
+        setattr(task, attribute, get_tick_time())
+    return action
+
+
+# Name lookup for guards and actions which do not take parameters
+GUARDS: Dict[str, Guard] = {
+    'movement_finished': movement_finished,
+    'target_movement_finished': target_movement_finished,
+    'timer_finished': timer_finished,
+}
+ACTIONS: Dict[str, Action] = {
+    'lock_movement': lock_movement,
+    'unlock_movement': unlock_movement,
+    'reset_input': reset_input,
+    'prepare_next_trial': prepare_next_trial,
+    'reset_trial_metrics': reset_trial_metrics,
+    'accept_starting_position': accept_starting_position,
+    'accept_target_position': accept_target_position,
+    'print_position': print_position,
+    'print_force': print_force,
+}
+
+
+# Transition table compilation
+
+def compile_value(value: ValueRef) -> Callable[[Task, MotorState], Any]:
+    """Turn a value reference into a function of (task, motor_state)."""
+    if callable(value):
+        return value
+    if isinstance(value, str):
+        if value in _motor_state_fields:
+            return lambda task, motor_state: getattr(motor_state, value)
+        return lambda task, motor_state: getattr(task, value)
+    return lambda task, motor_state: value
+
+
+def _resolve(function: Union[str, Callable], task_class: type, standard: Dict[str, Callable]) -> Callable:
+    """Resolve a guard/action given by name (standard guard/action or method of the task class)."""
+    if not isinstance(function, str):
+        return function
+    if function in standard:
+        return standard[function]
+    if hasattr(task_class, function):
+        return getattr(task_class, function)
+    raise ValueError(f'{task_class.__name__}: unknown guard or action {function!r}')
+
+
+def compile_transition(transition: Transition, task_class: type) -> Callable[[Task, MotorState, InputHandler], bool]:
+    """
+    Compile a transition into a single handler function.
+
+    :return: function of (task, motor_state, input_handler) which fires the transition if its guard
+             allows it and returns whether the transition fired
+    """
+    guard = _resolve(transition.guard, task_class, GUARDS) if transition.guard is not None else None
+    action_list = transition.action
+    if action_list is None:
+        action_list = ()
+    elif isinstance(action_list, str) or callable(action_list):
+        action_list = (action_list,)
+    actions = tuple(_resolve(action, task_class, ACTIONS) for action in action_list)
+    next_state = transition.next_state
+
+    make_mover = None
+    if transition.mover is not None:
+        get_target = compile_value(transition.mover.target)
+        get_duration = compile_value(transition.mover.duration)
+
+        def make_mover(task, motor_state: MotorState) -> AutoMover:
+            return AutoMoverFactory.make_linear_mover(motor_state.Position, get_target(task, motor_state),
+                                                      get_duration(task, motor_state))
+
+    def handler(task, motor_state: MotorState, input_handler: InputHandler) -> bool:
+        if guard is not None and not guard(task, motor_state, input_handler):
+            return False
+        for action in actions:
+            action(task, motor_state, input_handler)
+        if make_mover is not None:
+            task.auto_mover = make_mover(task, motor_state)
+        if next_state is not None:
+            task.state = next_state
+        return True
+    return handler
+
+
+@dataclass
+class CompiledStateMachine:
+    # Update handlers per state (first handler which fires ends the update)
+    update: Dict[int, Tuple[Callable, ...]]
+    # (state, handler) pairs checked in order for start / skip events
+    start: Tuple[Tuple[Optional[int], Callable], ...]
+    skip: Tuple[Tuple[Optional[int], Callable], ...]
+    # Timeout handlers per state (first handler which fires ends the event)
+    timeout: Dict[int, Tuple[Callable, ...]]
+
+
+def compile_state_machine(transitions: Sequence[Transition], task_class: type, states) -> CompiledStateMachine:
+    """Compile a transition table into per-state handler tuples."""
+    update: Dict[int, List[Callable]] = {state: [] for state in states}
+    timeout: Dict[int, List[Callable]] = {state: [] for state in states}
+    start, skip = [], []
+    for transition in transitions:
+        handler = compile_transition(transition, task_class)
+        if transition.event in (Event.Update, Event.Timeout):
+            handlers_by_state = update if transition.event == Event.Update else timeout
+            for state in (handlers_by_state if transition.state is ANY else (transition.state,)):
+                handlers_by_state[state].append(handler)
+        elif transition.event == Event.Start:
+            start.append((transition.state, handler))
+        else:
+            skip.append((transition.state, handler))
+    return CompiledStateMachine({state: tuple(handlers) for state, handlers in update.items()},
+                                tuple(start), tuple(skip),
+                                {state: tuple(handlers) for state, handlers in timeout.items()})
+
+
+class StateMachineTask(Task):
+    """
+    Task whose behavior is declared by a transition table (class attribute TRANSITIONS) over the states
+    of an IntEnum (class attribute STATES).
+
+    The table is compiled once per class into per-state handler tuples, so every update only dispatches
+    to the handlers of the current state.
+    """
+    STATES: type = None
+    TRANSITIONS: Sequence[Transition] = ()
+
+    def __init__(self, state):
+        super().__init__(state)
+        self.auto_mover: Optional[AutoMover] = None
+        self.timer = Timer()
+        self.timeout: Optional[TimerHandle] = None
+
+        # Positions sent with the most recent start command
+        self.requested_starting_position = 0.0
+        self.requested_target_position = 0.0
+
+        self.machine = self.get_state_machine()
+
+    @classmethod
+    def get_state_machine(cls) -> CompiledStateMachine:
+        """Return the compiled state machine of this task class (compiled on first use)."""
+        machine = cls.__dict__.get('_compiled_state_machine')
+        if machine is None:
+            machine = compile_state_machine(cls.TRANSITIONS, cls, cls.STATES)
+            cls._compiled_state_machine = machine
+        return machine
+
+    def on_start(self, motor_state: MotorState, input_handler: InputHandler, starting_position: float, target_position: float):
+        self.requested_starting_position = starting_position
+        self.requested_target_position = target_position
+        self._fire_sequentially(self.machine.start, motor_state, input_handler)
+
+    def on_update(self, motor_state: MotorState, input_handler: InputHandler):
+        for handler in self.machine.update[self.state]:
+            if handler(self, motor_state, input_handler):
+                return
+
+    def on_skip(self, motor_state: MotorState):
+        self._fire_sequentially(self.machine.skip, motor_state, None)
+
+    def on_timer(self, motor_state: MotorState, input_handler: InputHandler, data):
+        if data is Event.Timeout:
+            self.timeout = None
+            self._fire_first(self.machine.timeout[self.state], motor_state, input_handler)
+
+    def _fire_first(self, handlers, motor_state: MotorState, input_handler: InputHandler):
+        for handler in handlers:
+            if handler(self, motor_state, input_handler):
+                return
+
+    def _fire_sequentially(self, handlers, motor_state: MotorState, input_handler: Optional[InputHandler]):
+        for state, handler in handlers:
+            if state is ANY or state == self.state:
+                handler(self, motor_state, input_handler)
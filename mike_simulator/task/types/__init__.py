@@ -1,10 +1,23 @@
-from .force import ForceAssessment
-from .motor import MotorAssessment
-from .pos_match import PositionMatchingAssessment
-from .rom import RangeOfMotionAssessment
-from .sensorimotor import SensoriMotorAssessment
-from .precise_reach import PreciseReachAssessment
-from .passive_matching import PassiveMatchingAssessment
-from .active_matching import ActiveMatchingAssessment
-from .teach_and_reproduce import TeachAndReproduceAssessment
-from .haptic_bump import HapticBumpAssessment
+import importlib
+
+# Task classes are imported on first access only (see TaskFactory)
+_modules_by_class = {
+    'ForceAssessment': 'force',
+    'MotorAssessment': 'motor',
+    'PositionMatchingAssessment': 'pos_match',
+    'RangeOfMotionAssessment': 'rom',
+    'SensoriMotorAssessment': 'sensorimotor',
+    'PreciseReachAssessment': 'precise_reach',
+    'PassiveMatchingAssessment': 'passive_matching',
+    'ActiveMatchingAssessment': 'active_matching',
+    'TeachAndReproduceAssessment': 'teach_and_reproduce',
+    'HapticBumpAssessment': 'haptic_bump',
+    'TrajectoryPerceptionAssessment': 'trajectory_perception',
+}
+__all__ = list(_modules_by_class)
+
+
+def __getattr__(name):
+    if name in _modules_by_class:
+        return getattr(importlib.import_module(f'.{_modules_by_class[name]}', __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
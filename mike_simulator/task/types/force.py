@@ -1,9 +1,7 @@
 from enum import IntEnum
 
-from mike_simulator.task import Task
+from mike_simulator.task.state_machine import StateMachineTask, Transition, Event, set_motor_state, start_timeout
 from mike_simulator.datamodels import MotorState, PatientResponse
-from mike_simulator.input import InputHandler
-from mike_simulator.util import PrintUtil, Timer
 
 
 class S(IntEnum):
@@ -14,13 +12,24 @@ class S(IntEnum):
     FINISHED = -1
 
 
-class ForceAssessment(Task):
+class ForceAssessment(StateMachineTask):
+    STATES = S
+    TRANSITIONS = (
+        # Start a trial
+        Transition(S.STANDBY, S.COUNTDOWN, event=Event.Start, action=start_timeout(3.0)),
+
+        # We are waiting for 3 sec until the user is asked to apply force
+        Transition(S.COUNTDOWN, S.USER_INPUT, event=Event.Timeout,
+                   action=(set_motor_state('TargetState', True), 'reset_input', start_timeout(3.0))),
+        # After 3 seconds, the trial ends
+        Transition(S.USER_INPUT, event=Event.Timeout,
+                   action=(set_motor_state('TargetState', False), 'reset_input', 'prepare_next_trial')),
+        Transition(S.USER_INPUT, action='print_force'),
+    )
+
     def __init__(self, motor_state: MotorState, patient: PatientResponse) -> None:
         super().__init__(S.STANDBY)
 
-        # Used to simulate delays
-        self.timer = Timer()
-
         self.phase_trial_count = patient.PhaseTrialCount
 
         # Set starting position and initialize trial
@@ -35,26 +44,3 @@ class ForceAssessment(Task):
                 motor_state.Flexion = False
             motor_state.TrialNr += 1
             self.goto_state(S.STANDBY)
-
-    def on_start(self, motor_state: MotorState, input_handler: InputHandler, starting_position: float, target_position: float):
-        if self.in_state(S.STANDBY):
-            # Start a trial
-            self.timer.start(3.0)
-            self.goto_state(S.COUNTDOWN)
-
-    def on_update(self, motor_state: MotorState, input_handler: InputHandler):
-        if self.in_state(S.COUNTDOWN):
-            # We are waiting for 3 sec until the user is asked to apply force
-            if self.timer.has_finished():
-                motor_state.TargetState = True
-                input_handler.reset_input()
-                self.timer.start(3.0)
-                self.goto_state(S.USER_INPUT)
-        elif self.in_state(S.USER_INPUT):
-            if self.timer.is_active():
-                PrintUtil.print_inplace(f'Current force: {motor_state.Force:.3f} N')
-            else:
-                # After 3 seconds, the trial ends
-                motor_state.TargetState = False
-                input_handler.reset_input()
-                self._prepare_next_trial_or_finish(motor_state)
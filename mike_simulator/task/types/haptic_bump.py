@@ -1,12 +1,8 @@
-import random
 from enum import IntEnum
-from typing import Optional
 
-from mike_simulator.task import Task
-from mike_simulator.auto_movement.factory import AutoMover, AutoMoverFactory
+from mike_simulator.task.state_machine import StateMachineTask, Transition, Event, LinearMove, ANY, set_motor_state
 from mike_simulator.datamodels import MotorState, PatientResponse
-from mike_simulator.input import InputHandler
-from mike_simulator.util import PrintUtil
+from mike_simulator.input import UserMovement
 
 
 class S(IntEnum):
@@ -17,16 +13,30 @@ class S(IntEnum):
     FINISHED = -1
 
 
-class HapticBumpAssessment(Task):
+class HapticBumpAssessment(StateMachineTask):
+    USER_MOVEMENT = UserMovement.Normal
+
+    STATES = S
+    TRANSITIONS = (
+        Transition(ANY, event=Event.Start, action='accept_starting_position'),
+        # Position confirmed, lock movement and wait for next trial to start (if any)
+        Transition(S.USER_INPUT, event=Event.Start,
+                   action=(set_motor_state('TargetState', False), 'lock_movement', 'prepare_next_trial')),
+        # Direct robot to move to starting position within 3 seconds
+        Transition(S.STANDBY, S.MOVING_TO_START, event=Event.Start, mover=LinearMove('StartingPosition', 3.0)),
+
+        # Allow user movement until validate is clicked
+        Transition(S.MOVING_TO_START, S.USER_INPUT, guard='movement_finished',
+                   action=(set_motor_state('TargetState', True), 'unlock_movement')),
+        Transition(S.USER_INPUT, action='print_position'),
+    )
+
     def __init__(self, motor_state: MotorState, patient: PatientResponse) -> None:
         super().__init__(S.STANDBY)
 
         self.direction = 1.0 if patient.LeftHand else -1.0
         self.trial_count = patient.PhaseTrialCount
 
-        # Used for automatic movement to starting position
-        self.auto_mover: Optional[AutoMover] = None
-
         # Initialize trial
         self._prepare_next_trial_or_finish(motor_state)
 
@@ -34,30 +44,5 @@ class HapticBumpAssessment(Task):
         if motor_state.TrialNr == self.trial_count:
             self.goto_state(S.FINISHED)
         else:
-            # Set start and end position according to random phase
             motor_state.TrialNr += 1
             self.goto_state(S.STANDBY)
-
-    def on_start(self, motor_state: MotorState, input_handler: InputHandler, starting_position: float, target_position: float):
-        motor_state.StartingPosition = starting_position;
-        if self.in_state(S.USER_INPUT):
-            # Time is up, lock movement and wait for next trial to start (if any)
-            motor_state.TargetState = False
-            input_handler.lock_movement()
-            self._prepare_next_trial_or_finish(motor_state)
-        if self.in_state(S.STANDBY):
-            # Direct robot to move to starting position within 3 seconds
-            self.auto_mover = AutoMoverFactory.make_linear_mover(motor_state.Position, motor_state.StartingPosition, 3.0)
-            self.goto_state(S.MOVING_TO_START)
-
-    def on_update(self, motor_state: MotorState, input_handler: InputHandler):
-        if self.in_state(S.MOVING_TO_START):
-            # Automatic movement towards starting position
-            if motor_state.move_using(self.auto_mover).has_finished():
-                # Allow user movement until validate is clicked
-                motor_state.TargetState = True
-                input_handler.unlock_movement()
-                self.goto_state(S.USER_INPUT)
-        elif self.in_state(S.USER_INPUT):
-            # Print current position
-            PrintUtil.print_inplace(f'Current pos: {motor_state.Position:.3f}°')
@@ -1,13 +1,11 @@
-import math
 import random
 from enum import IntEnum
-from typing import Optional
 
-from mike_simulator.task import Task
-from mike_simulator.auto_movement.factory import AutoMover, AutoMoverFactory
+from mike_simulator.task.state_machine import StateMachineTask, Transition, Event, LinearMove, set_motor_state, start_timeout
 from mike_simulator.datamodels import MotorState, PatientResponse
-from mike_simulator.input import InputHandler
-from mike_simulator.util import PrintUtil, Timer
+from mike_simulator.input import InputHandler, UserMovement
+from mike_simulator.metrics import PeakDetector
+from mike_simulator.util import PrintUtil
 
 
 class S(IntEnum):
@@ -18,20 +16,32 @@ class S(IntEnum):
     FINISHED = -1
 
 
-class MotorAssessment(Task):
+class MotorAssessment(StateMachineTask):
+    USER_MOVEMENT = UserMovement.Burst
+
+    STATES = S
+    TRANSITIONS = (
+        # Direct robot to move to starting position within 3 seconds
+        Transition(S.STANDBY, S.MOVING_TO_START, event=Event.Start, mover=LinearMove('StartingPosition', 3.0)),
+
+        # Allow user movement for 4 seconds
+        Transition(S.MOVING_TO_START, S.USER_INPUT, guard='movement_finished',
+                   action=(set_motor_state('TargetState', True), 'unlock_movement', 'reset_trial_metrics',
+                           start_timeout(4.0))),
+        # Time is up, lock movement and wait for next trial to start (if any)
+        Transition(S.USER_INPUT, event=Event.Timeout,
+                   action=(set_motor_state('TargetState', False), 'lock_movement', 'prepare_next_trial')),
+        Transition(S.USER_INPUT, action='_track_max_velocity'),
+    )
+
     def __init__(self, motor_state: MotorState, patient: PatientResponse) -> None:
         super().__init__(S.STANDBY)
 
         self.direction = 1.0 if patient.LeftHand else -1.0
 
         # Maximum velocity reached within phase
-        self.v_max = 0.0
-
-        # Used to simulate delays
-        self.timer = Timer()
-
-        # Used for automatic movement to starting position
-        self.auto_mover: Optional[AutoMover] = None
+        self.user_velocity = PeakDetector()
+        self.trial_metrics['user_velocity'] = self.user_velocity
 
         # Compute randomized list of 20 flexion/extension phases (10 each)
         count = patient.PhaseTrialCount
@@ -42,7 +52,6 @@ class MotorAssessment(Task):
         self._prepare_next_trial_or_finish(motor_state)
 
     def _prepare_next_trial_or_finish(self, motor_state: MotorState):
-        self.v_max = 0.0
         if motor_state.TrialNr == len(self.phases):
             self.goto_state(S.FINISHED)
         else:
@@ -57,30 +66,10 @@ class MotorAssessment(Task):
             motor_state.TrialNr += 1
             self.goto_state(S.STANDBY)
 
-    def on_start(self, motor_state: MotorState, input_handler: InputHandler, starting_position: float, target_position: float):
-        if self.in_state(S.STANDBY):
-            # Direct robot to move to starting position within 3 seconds
-            self.auto_mover = AutoMoverFactory.make_linear_mover(motor_state.Position, motor_state.StartingPosition, 3.0)
-            self.goto_state(S.MOVING_TO_START)
-
-    def on_update(self, motor_state: MotorState, input_handler: InputHandler):
-        if self.in_state(S.MOVING_TO_START):
-            # Automatic movement towards starting position
-            if motor_state.move_using(self.auto_mover).has_finished():
-                # Allow user movement for 4 seconds
-                motor_state.TargetState = True
-                input_handler.unlock_movement()
-                self.timer.start(4.0)
-                self.goto_state(S.USER_INPUT)
-        elif self.in_state(S.USER_INPUT):
-            if self.timer.is_active():
-                # Compute new v_max and print current data
-                v_current = input_handler.current_input_state.velocity
-                self.v_max = max(math.fabs(v_current), self.v_max)
-                PrintUtil.print_inplace(f'Current pos: {motor_state.Position:.3f}°, '
-                                        f'speed: {math.fabs(v_current):.3f} [max: {self.v_max:.3f}] °/s')
-            else:
-                # Time is up, lock movement and wait for next trial to start (if any)
-                motor_state.TargetState = False
-                input_handler.lock_movement()
-                self._prepare_next_trial_or_finish(motor_state)
+    def _track_max_velocity(self, motor_state: MotorState, input_handler: InputHandler):
+        # Update maximum velocity and print current data
+        v_current = input_handler.current_input_state.velocity
+        self.user_velocity.update(v_current, motor_state.Time)
+        if PrintUtil.inplace_due():
+            PrintUtil.print_inplace(f'Current pos: {motor_state.Position:.3f}°, '
+                                    f'speed: {abs(v_current):.3f} [max: {self.user_velocity.peak:.3f}] °/s')
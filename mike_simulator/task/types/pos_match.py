@@ -1,12 +1,8 @@
 import random
 from enum import IntEnum
-from typing import Optional
 
-from mike_simulator.task import Task
-from mike_simulator.auto_movement.factory import AutoMover, AutoMoverFactory
+from mike_simulator.task.state_machine import StateMachineTask, Transition, Event, LinearMove, set_motor_state, print_message
 from mike_simulator.datamodels import MotorState, PatientResponse
-from mike_simulator.input import InputHandler
-from mike_simulator.util import PrintUtil
 
 
 class S(IntEnum):
@@ -18,7 +14,29 @@ class S(IntEnum):
     FINISHED = -1
 
 
-class PositionMatchingAssessment(Task):
+class PositionMatchingAssessment(StateMachineTask):
+    STATES = S
+    TRANSITIONS = (
+        # User confirmed selected position -> start next trial (if any)
+        Transition(S.USER_INPUT, event=Event.Start,
+                   action=(set_motor_state('TargetState', False), 'prepare_next_trial')),
+        # Start new trial, instruct robot to move to starting position within 3 seconds
+        Transition(S.STANDBY, S.MOVING_TO_START, event=Event.Start, mover=LinearMove('StartingPosition', 3.0)),
+
+        # Robot is at starting position, instruct robot to move to random destination within 3 seconds
+        Transition(S.MOVING_TO_START, S.MOVING_TO_HIDDEN_DEST, guard='movement_finished',
+                   action=(print_message('Reached start'),
+                           set_motor_state('TargetPosition', lambda task, ms: task.target_positions[ms.TrialNr - 1])),
+                   mover=LinearMove('TargetPosition', 3.0)),
+        # Once target is reached, wait for user to enter a position in the frontend
+        Transition(S.MOVING_TO_HIDDEN_DEST, S.USER_INPUT, guard='movement_finished',
+                   action=set_motor_state('TargetState', True)),
+
+        # Uncomment to support skipping for position matching
+        # Transition(S.MOVING_TO_HIDDEN_DEST, event=Event.Skip, action='_skip_remaining_trials'),
+        # Transition(S.USER_INPUT, event=Event.Skip, action='_skip_remaining_trials'),
+    )
+
     def __init__(self, motor_state: MotorState, patient: PatientResponse) -> None:
         super().__init__(S.STANDBY)
         self.direction = 1 if patient.LeftHand else -1
@@ -30,9 +48,6 @@ class PositionMatchingAssessment(Task):
         self.target_positions = [self.direction * (40.0 + i * interval) for i in range(self.trial_count)]
         random.shuffle(self.target_positions)
 
-        # Used for automatic movement to starting position and target position
-        self.auto_mover: Optional[AutoMover] = None
-
         # Set starting position and initialize trial
         motor_state.StartingPosition = 30.0 * self.direction
         self._prepare_next_trial_or_finish(motor_state)
@@ -44,38 +59,7 @@ class PositionMatchingAssessment(Task):
             motor_state.TrialNr += 1
             self.goto_state(S.STANDBY)
 
-    def on_start(self, motor_state: MotorState, input_handler: InputHandler, starting_position: float, target_position: float):
-        if self.in_state(S.USER_INPUT):
-            # User confirmed selected position -> start next trial (if any)
-            motor_state.TargetState = False
-            self._prepare_next_trial_or_finish(motor_state)
-
-        if self.in_state(S.STANDBY):
-            # Start new trial, instruct robot to move to starting position within 3 seconds
-            self.auto_mover = AutoMoverFactory.make_linear_mover(motor_state.Position, motor_state.StartingPosition, 3.0)
-            self.goto_state(S.MOVING_TO_START)
-
-    def on_update(self, motor_state: MotorState, input_handler: InputHandler):
-        if self.in_state(S.MOVING_TO_START):
-            # Automatic movement towards starting position
-            if motor_state.move_using(self.auto_mover).has_finished():
-                # Robot is at starting position, compute random destination
-                PrintUtil.print_normally('Reached start')
-                motor_state.TargetPosition = self.target_positions[motor_state.TrialNr - 1]
-
-                # Instruct robot to move to random destination within 3 seconds
-                self.auto_mover = AutoMoverFactory.make_linear_mover(motor_state.Position, motor_state.TargetPosition, 3.0)
-                self.goto_state(S.MOVING_TO_HIDDEN_DEST)
-        elif self.in_state(S.MOVING_TO_HIDDEN_DEST):
-            # Automatic movement towards random destination
-            if motor_state.move_using(self.auto_mover).has_finished():
-                # Once target is reached, wait for user to enter a position in the frontend
-                motor_state.TargetState = True
-                self.goto_state(S.USER_INPUT)
-
-    # Uncomment to support skipping for position matching
-    # def on_skip(self, motor_state: MotorState):
-    #     if self.in_state(S.MOVING_TO_HIDDEN_DEST) or self.in_state(S.USER_INPUT):
-    #         if motor_state.TrialNr > 1:
-    #             motor_state.TrialNr = self.trial_count + 1
-    #             self.goto_state(S.FINISHED)
+    # def _skip_remaining_trials(self, motor_state: MotorState, input_handler):
+    #     if motor_state.TrialNr > 1:
+    #         motor_state.TrialNr = self.trial_count + 1
+    #         self.goto_state(S.FINISHED)
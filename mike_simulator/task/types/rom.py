@@ -1,10 +1,10 @@
 from enum import IntEnum
-from typing import Optional
 
-from mike_simulator.task import Task
-from mike_simulator.auto_movement.factory import AutoMover, AutoMoverFactory
+from mike_simulator.task.state_machine import StateMachineTask, Transition, Event, LinearMove, set_motor_state
+from mike_simulator.auto_movement.factory import AutoMoverFactory
 from mike_simulator.datamodels import MotorState, RomState, PatientResponse
-from mike_simulator.input import InputHandler
+from mike_simulator.input import InputHandler, UserMovement
+from mike_simulator.metrics import RunningMinMax
 from mike_simulator.util import PrintUtil
 
 
@@ -18,7 +18,26 @@ class S(IntEnum):
     FINISHED = -1
 
 
-class RangeOfMotionAssessment(Task):
+class RangeOfMotionAssessment(StateMachineTask):
+    USER_MOVEMENT = UserMovement.Normal
+
+    STATES = S
+    TRANSITIONS = (
+        Transition(S.INSTRUCTIONS, event=Event.Start, action='prepare_next_trial'),
+        # Finish currently active trial (disable user movement) if not in automatic passive movement phase
+        Transition(S.USER_INPUT, event=Event.Start,
+                   action=(set_motor_state('TargetState', False), 'lock_movement', 'prepare_next_trial')),
+        # Instruct robot to move to starting position in 3 seconds (immediately between automatic movements)
+        Transition(S.STANDBY, S.MOVING_TO_START, event=Event.Start,
+                   mover=LinearMove('StartingPosition',
+                                    lambda task, ms: 0.0 if ms.RomState == RomState.AutomaticPassiveMovement and ms.TrialNr > 1 else 3.0)),
+
+        Transition(S.MOVING_TO_START, guard='movement_finished', action='_on_reached_start'),
+        Transition(S.USER_INPUT, action='_record_passive_motion'),
+        # In automatic passive movement phase, automatically start next trial when movement is finished (if any)
+        Transition(S.AUTO_MOVE, guard='movement_finished', action='_start_next_automatic_trial'),
+    )
+
     def __init__(self, motor_state: MotorState, patient: PatientResponse) -> None:
         super().__init__(S.INSTRUCTIONS)
 
@@ -26,12 +45,9 @@ class RangeOfMotionAssessment(Task):
 
         self.phase_trial_count = patient.PhaseTrialCount
 
-        # Extreme positions recorded during passive movement phase
-        self.p_min_motion = 30.0 * self.direction
-        self.p_max_motion = self.p_min_motion
-
-        # Used for automatic movement to starting position
-        self.auto_mover: Optional[AutoMover] = None
+        # Extreme positions recorded during passive movement phase (over all trials of the phase)
+        self.passive_motion = RunningMinMax(30.0 * self.direction)
+        self.trial_metrics['passive_motion'] = self.passive_motion
 
         # Initialize trial
         motor_state.TrialNr = 1
@@ -47,9 +63,9 @@ class RangeOfMotionAssessment(Task):
                 motor_state.RomState = RomState(motor_state.RomState + 1)
                 if motor_state.RomState == RomState.AutomaticPassiveMovement:
                     if self.direction > 0:
-                        self.p_max_motion = min(self.p_max_motion, 80)
+                        self.passive_motion.maximum = min(self.passive_motion.maximum, 80)
                     else:
-                        self.p_min_motion = max(self.p_min_motion, -80)
+                        self.passive_motion.minimum = max(self.passive_motion.minimum, -80)
 
                 motor_state.TrialNr = 1
                 self.goto_state(S.INSTRUCTIONS)
@@ -62,52 +78,33 @@ class RangeOfMotionAssessment(Task):
 
         # Compute starting position
         if motor_state.RomState == RomState.AutomaticPassiveMovement:
-            motor_state.StartingPosition = (self.p_max_motion + self.p_min_motion) / 2.0
+            motor_state.StartingPosition = (self.passive_motion.maximum + self.passive_motion.minimum) / 2.0
         else:
             motor_state.StartingPosition = 30.0 * self.direction
 
-    def on_start(self, motor_state: MotorState, input_handler: InputHandler, starting_position: float, target_position: float):
-        if self.in_state(S.INSTRUCTIONS):
-            self._prepare_next_trial_or_finish(motor_state)
-
-        if self.in_state(S.USER_INPUT):
-            # Finish currently active trial (disable user movement) if not in automatic passive movement phase
-            motor_state.TargetState = False
-            input_handler.lock_movement()
-            self._prepare_next_trial_or_finish(motor_state)
-
-        if self.in_state(S.STANDBY):
-            # Instruct robot to move to starting position in 3 seconds
-            move_time = 0.0 if motor_state.RomState == RomState.AutomaticPassiveMovement and motor_state.TrialNr > 1 else 3.0
-            self.auto_mover = AutoMoverFactory.make_linear_mover(motor_state.Position, motor_state.StartingPosition, move_time)
-            self.goto_state(S.MOVING_TO_START)
-
-    def on_update(self, motor_state: MotorState, input_handler: InputHandler):
-        if self.in_state(S.MOVING_TO_START):
-            # Automatic movement towards starting position
-            if motor_state.move_using(self.auto_mover).has_finished():
-                if motor_state.RomState == RomState.AutomaticPassiveMovement:
-                    # In automatic passive movement phase, instruct robot to move along sine
-                    # with parameters based on passive movement phase for 2 seconds
-                    amplitude = ((self.p_max_motion - self.p_min_motion) / 2.0) * self.direction
-                    freq = 1.0
-                    self.auto_mover = AutoMoverFactory.make_sine_mover(motor_state.Position, 2.0, (amplitude, freq))
-                    self.goto_state(S.AUTO_MOVE)
-                else:
-                    # In other phases, allow user movement
-                    motor_state.TargetState = True
-                    input_handler.unlock_movement()
-                    self.goto_state(S.USER_INPUT)
-        elif self.in_state(S.USER_INPUT):
-            if motor_state.RomState == RomState.PassiveMotion:
-                # Record extreme values for Passive motion
-                self.p_min_motion = min(motor_state.Position, self.p_min_motion)
-                self.p_max_motion = max(motor_state.Position, self.p_max_motion)
+    def _on_reached_start(self, motor_state: MotorState, input_handler: InputHandler):
+        if motor_state.RomState == RomState.AutomaticPassiveMovement:
+            # In automatic passive movement phase, instruct robot to move along sine
+            # with parameters based on passive movement phase for 2 seconds
+            amplitude = ((self.passive_motion.maximum - self.passive_motion.minimum) / 2.0) * self.direction
+            freq = 1.0
+            self.auto_mover = AutoMoverFactory.make_sine_mover(motor_state.Position, 2.0, (amplitude, freq))
+            self.goto_state(S.AUTO_MOVE)
+        else:
+            # In other phases, allow user movement
+            motor_state.TargetState = True
+            input_handler.unlock_movement()
+            self.goto_state(S.USER_INPUT)
+
+    def _record_passive_motion(self, motor_state: MotorState, input_handler: InputHandler):
+        if motor_state.RomState == RomState.PassiveMotion:
+            # Record extreme values for Passive motion
+            self.passive_motion.update(motor_state.Position)
+            if PrintUtil.inplace_due():
                 PrintUtil.print_inplace(f'Current position: {motor_state.Position:.3f}°')
-        elif self.in_state(S.AUTO_MOVE):
-            # In automatic passive movement phase, automatically start next trial when movement is finished (if any)
-            if motor_state.move_using(self.auto_mover).has_finished():
-                # Automatically move on to next trial
-                self._prepare_next_trial_or_finish(motor_state)
-                if not self.in_state(S.FINISHED):
-                    self.on_start(motor_state, input_handler, 0, 0)
+
+    def _start_next_automatic_trial(self, motor_state: MotorState, input_handler: InputHandler):
+        # Automatically move on to next trial
+        self._prepare_next_trial_or_finish(motor_state)
+        if not self.in_state(S.FINISHED):
+            self.on_start(motor_state, input_handler, 0, 0)
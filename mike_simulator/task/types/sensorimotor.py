@@ -1,11 +1,10 @@
 from enum import IntEnum
-from typing import Optional
 
-from mike_simulator.task import Task
-from mike_simulator.auto_movement.factory import AutoMover, AutoMoverFactory
+from mike_simulator.task.state_machine import StateMachineTask, Transition, Event, LinearMove, set_motor_state
+from mike_simulator.auto_movement.factory import AutoMoverFactory
 from mike_simulator.config import cfg
 from mike_simulator.datamodels import MotorState, PatientResponse
-from mike_simulator.input import InputHandler
+from mike_simulator.input import InputHandler, UserMovement
 
 
 class S(IntEnum):
@@ -16,7 +15,24 @@ class S(IntEnum):
     FINISHED = -1
 
 
-class SensoriMotorAssessment(Task):
+class SensoriMotorAssessment(StateMachineTask):
+    USER_MOVEMENT = UserMovement.Normal
+
+    STATES = S
+    TRANSITIONS = (
+        # Move to starting position in 3 seconds
+        Transition(S.STANDBY, S.MOVING_TO_START, event=Event.Start, mover=LinearMove('StartingPosition', 3.0)),
+
+        # Instruct robot to move along mixture of sines and allow user movement
+        Transition(S.MOVING_TO_START, S.USER_FOLLOW, guard='movement_finished',
+                   action=('_start_sine_movement', set_motor_state('TargetState', True), 'unlock_movement')),
+        # Disable user movement after the movement duration and wait for next trial to start (if any)
+        Transition(S.USER_FOLLOW, guard='target_movement_finished',
+                   action=('lock_movement', set_motor_state('TargetState', False), 'prepare_next_trial')),
+
+        Transition(S.STANDBY, event=Event.Skip, action='_skip_phase'),
+    )
+
     def __init__(self, motor_state: MotorState, patient: PatientResponse):
         super().__init__(S.STANDBY)
         self.direction = 1.0 if patient.LeftHand else -1.0
@@ -26,9 +42,6 @@ class SensoriMotorAssessment(Task):
 
         self.phase_trial_count = patient.PhaseTrialCount
 
-        # Used for automatic movement to starting position
-        self.auto_mover: Optional[AutoMover] = None
-
         # Set starting position and initialize trial
         motor_state.StartingPosition = 45.0 * self.direction
         self._prepare_next_trial_or_finish(motor_state)
@@ -42,45 +55,23 @@ class SensoriMotorAssessment(Task):
             motor_state.TrialNr += 1
             self.goto_state(S.STANDBY)
 
-    def on_start(self, motor_state: MotorState, input_handler: InputHandler, starting_position: float, target_position: float):
-        if self.in_state(S.STANDBY):
-            # Move to starting position in 3 seconds
-            self.auto_mover = AutoMoverFactory.make_linear_mover(motor_state.Position, motor_state.StartingPosition, 3.0)
-            self.goto_state(S.MOVING_TO_START)
-
-    def on_update(self, motor_state: MotorState, input_handler: InputHandler):
-        if self.in_state(S.MOVING_TO_START):
-            if motor_state.move_using(self.auto_mover).has_finished():
-                # Instruct robot to move along mixture of sines for 30 seconds
-                factor = 3.0 if self.fast_phase else 1.0
-                amplitude = 15.0 * self.direction
-                sine_params = [
-                    (amplitude, 1.0 * factor),
-                    (amplitude, 2.0 * factor),
-                    (amplitude, 4.0 * factor)
-                ]
-                self.auto_mover = AutoMoverFactory.make_sine_mover(motor_state.StartingPosition,
-                                                                   cfg.Tasks.sensorimotor_movement_duration,
-                                                                   *sine_params)
-
-                # Allow user movement
-                motor_state.TargetState = True
-                input_handler.unlock_movement()
-
-                self.goto_state(S.USER_FOLLOW)
-        elif self.in_state(S.USER_FOLLOW):
-            if motor_state.move_target_using(self.auto_mover).has_finished():
-                # Disable user movement after 30 seconds and wait for next trial to start (if any)
-                input_handler.lock_movement()
-                motor_state.TargetState = False
-                self._prepare_next_trial_or_finish(motor_state)
-
-    def on_skip(self, motor_state: MotorState):
-        if self.in_state(S.STANDBY):
-            firstTrialOfPhase = motor_state.TrialNr % self.phase_trial_count == 1
-            afterFirstInLastPhase = motor_state.TrialNr > self.phase_trial_count + 1
-            if not (firstTrialOfPhase or afterFirstInLastPhase):
-                motor_state.TrialNr = self.phase_trial_count
-                self._prepare_next_trial_or_finish(motor_state)
-            if afterFirstInLastPhase:
-                self.goto_state(S.FINISHED)
+    def _start_sine_movement(self, motor_state: MotorState, input_handler: InputHandler):
+        factor = 3.0 if self.fast_phase else 1.0
+        amplitude = 15.0 * self.direction
+        sine_params = [
+            (amplitude, 1.0 * factor),
+            (amplitude, 2.0 * factor),
+            (amplitude, 4.0 * factor)
+        ]
+        self.auto_mover = AutoMoverFactory.make_sine_mover(motor_state.StartingPosition,
+                                                           cfg.Tasks.sensorimotor_movement_duration,
+                                                           *sine_params)
+
+    def _skip_phase(self, motor_state: MotorState, input_handler: InputHandler):
+        firstTrialOfPhase = motor_state.TrialNr % self.phase_trial_count == 1
+        afterFirstInLastPhase = motor_state.TrialNr > self.phase_trial_count + 1
+        if not (firstTrialOfPhase or afterFirstInLastPhase):
+            motor_state.TrialNr = self.phase_trial_count
+            self._prepare_next_trial_or_finish(motor_state)
+        if afterFirstInLastPhase:
+            self.goto_state(S.FINISHED)
@@ -1,13 +1,9 @@
-import random
-import time
 from enum import IntEnum
-from typing import Optional
 
-from mike_simulator.task import Task
-from mike_simulator.auto_movement.factory import AutoMover, AutoMoverFactory
+from mike_simulator.task.state_machine import StateMachineTask, Transition, Event, LinearMove, ANY, set_motor_state, \
+    print_message, start_timeout
 from mike_simulator.datamodels import MotorState, PatientResponse
-from mike_simulator.input import InputHandler
-from mike_simulator.util import PrintUtil
+from mike_simulator.input import UserMovement
 
 
 class S(IntEnum):
@@ -21,80 +17,49 @@ class S(IntEnum):
     FINISHED = -1
 
 
-class TeachAndReproduceAssessment(Task):
+class TeachAndReproduceAssessment(StateMachineTask):
+    USER_MOVEMENT = UserMovement.Normal
+
+    STATES = S
+    TRANSITIONS = (
+        Transition(ANY, event=Event.Start, action='accept_starting_position'),
+        # User confirmed selected position -> start next trial (if any)
+        Transition(S.USER_INPUT, event=Event.Start,
+                   action=(set_motor_state('TargetState', False), 'lock_movement', 'prepare_next_trial')),
+        # Start new trial, instruct robot to move to starting position within 1.5 seconds
+        Transition(S.STANDBY, S.MOVING_TO_START, event=Event.Start,
+                   action='accept_target_position', mover=LinearMove('StartingPosition', 1.5)),
+
+        # Robot is at starting position, instruct robot to move to target destination within 1.5 seconds
+        Transition(S.MOVING_TO_START, S.MOVING_TO_TARGET, guard='movement_finished',
+                   action=(print_message('Reached start'), set_motor_state('TargetPosition', 'target_position')),
+                   mover=LinearMove('TargetPosition', 1.5)),
+        Transition(S.MOVING_TO_TARGET, S.WAIT_AT_TARGET, guard='movement_finished',
+                   action=(print_message('Reached target'), start_timeout(3.0))),
+        # Wait for 3 seconds, then instruct robot to move back to start position within 1.5 seconds
+        Transition(S.WAIT_AT_TARGET, S.MOVING_BACK_TO_START, event=Event.Timeout,
+                   mover=LinearMove('StartingPosition', 1.5)),
+        # Once start is reached, wait for user to move back to the target and confirm input
+        Transition(S.MOVING_BACK_TO_START, S.USER_INPUT, guard='movement_finished',
+                   action=(print_message('Back at start'), set_motor_state('TargetState', True), 'unlock_movement')),
+        Transition(S.USER_INPUT, action='print_position'),
+    )
+
     def __init__(self, motor_state: MotorState, patient: PatientResponse) -> None:
         super().__init__(S.STANDBY)
         self.direction = 1 if patient.LeftHand else -1
 
         self.trial_count = patient.PhaseTrialCount
 
-        # Used for automatic movement to starting position and target position
-        self.auto_mover: Optional[AutoMover] = None
-
         # Set starting position and initialize trial
         self._prepare_next_trial_or_finish(motor_state)
 
         # Get Target Position in the beginning
         self.target_position = 0
 
-        self.waiting_since = time.time()
-
     def _prepare_next_trial_or_finish(self, motor_state: MotorState):
         if motor_state.TrialNr == self.trial_count:
             self.goto_state(S.FINISHED)
         else:
             motor_state.TrialNr += 1
             self.goto_state(S.STANDBY)
-
-    def on_start(self, motor_state: MotorState, input_handler: InputHandler, starting_position: float, target_position: float):
-        motor_state.StartingPosition = starting_position;
-        if self.in_state(S.USER_INPUT):
-            # User confirmed selected position -> start next trial (if any)
-            motor_state.TargetState = False
-            input_handler.lock_movement()
-            self._prepare_next_trial_or_finish(motor_state)
-
-        if self.in_state(S.STANDBY):
-            # Start new trial, instruct robot to move to starting position within 1.5 seconds
-            self.auto_mover = AutoMoverFactory.make_linear_mover(motor_state.Position, motor_state.StartingPosition, 1.5)
-            self.goto_state(S.MOVING_TO_START)
-            self.target_position = target_position
-
-    def on_update(self, motor_state: MotorState, input_handler: InputHandler):
-        if self.in_state(S.MOVING_TO_START):
-            # Automatic movement towards starting position
-            if motor_state.move_using(self.auto_mover).has_finished():
-                # Robot is at starting position, compute random destination
-                PrintUtil.print_normally('Reached start')
-                motor_state.TargetPosition = self.target_position
-
-                # Instruct robot to move to target destination within 1.5 seconds
-                self.auto_mover = AutoMoverFactory.make_linear_mover(motor_state.Position, motor_state.TargetPosition, 1.5)
-                self.goto_state(S.MOVING_TO_TARGET)
-
-        elif self.in_state(S.MOVING_TO_TARGET):
-            # Automatic movement towards target destination
-            if motor_state.move_using(self.auto_mover).has_finished():
-                PrintUtil.print_normally('Reached target')
-                self.waiting_since = time.time()
-                self.goto_state(S.WAIT_AT_TARGET)
-
-        elif self.in_state(S.WAIT_AT_TARGET):
-            time_elapsed = time.time() - self.waiting_since
-            if time_elapsed > 3.0:  # wait for 3 second
-                # Instruct robot to move to back to start position within 1.5 seconds
-                self.auto_mover = AutoMoverFactory.make_linear_mover(motor_state.Position, motor_state.StartingPosition, 1.5)
-                self.goto_state(S.MOVING_BACK_TO_START)
-
-        elif self.in_state(S.MOVING_BACK_TO_START):
-            # Automatic movement back to start destination
-            if motor_state.move_using(self.auto_mover).has_finished():
-                PrintUtil.print_normally('Back at start')
-                # Once target is reached, wait for user to move back to the target and confirm input
-                motor_state.TargetState = True
-                input_handler.unlock_movement()
-                self.goto_state(S.USER_INPUT)
-
-        elif self.in_state(S.USER_INPUT):
-            # Print current position
-            PrintUtil.print_inplace(f'Current pos: {motor_state.Position:.3f}°')
@@ -0,0 +1,35 @@
+"""
+Summary of the outcome metrics of all session logs below a log directory (one row per trial).
+
+Usage:
+    python -m mike_simulator.tools.analyze_logs [--logs ./logs] [--out summary.csv] [--workers N] [--compact]
+"""
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+from mike_simulator.analytics import write_summary
+from mike_simulator.config import cfg, load_configuration
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_configuration()
+    parser = argparse.ArgumentParser(description='Compute per-trial outcome metrics of all session logs.')
+    parser.add_argument('--logs', default=cfg.Logging.log_dir, help='directory containing the session logs')
+    parser.add_argument('--out', default='summary.csv', help='summary table (csv) to write')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of worker processes (default: number of CPUs, 0: no worker processes)')
+    parser.add_argument('--compact', action='store_true',
+                        help='store compact binary copies of the csv session logs (used instead of the csv files '
+                             'by later runs)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    count = write_summary(args.logs, args.out, args.workers, cfg.Tasks.sensorimotor_movement_duration, args.compact)
+    print(f'Analyzed {count} sessions in {time.perf_counter() - start:.2f} s, summary written to {args.out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Throughput benchmark of headless sessions.
+
+Runs every task (or the selected ones) through the scripted user input and start commands of ControlScript
+(see golden.py) on a simulated clock and reports how many simulator cycles per second the host achieves
+(best of --repeat runs). A session runs in real time on the robot, so cycles/s divided by 1000 is the headroom
+of the simulator on this host.
+
+Usage:
+    python main.py bench [--task Motor ...] [--repeat 3] [--out bench.json]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+from mike_simulator.config import config_service
+from mike_simulator.datamodels import Constants, TaskType
+from mike_simulator.headless import HeadlessSimulator
+from mike_simulator.input.backends.prerecorded_input import PrerecordedInputHandler
+from mike_simulator.profiles import PROFILES
+from mike_simulator.task.factory import _tasks_class_by_type
+from mike_simulator.tools.golden import ControlScript
+
+
+def bench_task(task: TaskType, script: ControlScript, repeat: int) -> Dict[str, float]:
+    """
+    Run a headless session of task repeat times.
+
+    :return: number of cycles of the session and the shortest run time [s]
+    """
+    best = float('inf')
+    cycles = 0
+    direction = 1.0 if script.left_hand else -1.0
+    for _ in range(repeat):
+        random.seed(script.seed)
+        with HeadlessSimulator(PrerecordedInputHandler(script.make_input_recording())) as sim:
+            sim.select_patient(task, script.left_hand, script.trial_count)
+            t_start = time.perf_counter()
+            for cycle in range(script.max_cycles):
+                if cycle % script.start_interval == 0:
+                    sim.start(script.starting_position * direction, script.target_position * direction)
+                if sim.step().Finished:
+                    break
+            best = min(best, time.perf_counter() - t_start)
+            cycles = cycle + 1
+    return {'cycles': cycles, 'seconds': best}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='main.py bench', description='Measure the throughput of headless sessions.')
+    parser.add_argument('--task', action='append', help='TaskType name (repeatable, default: all tasks)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per task, the fastest one is reported')
+    parser.add_argument('--out', help='write the results as json to this file')
+    args = parser.parse_args(argv)
+
+    try:
+        tasks = [TaskType[name] for name in args.task] if args.task else list(_tasks_class_by_type)
+    except KeyError as e:
+        parser.error(f'Unknown task {e}')
+
+    PROFILES['bench'].apply()
+    script = ControlScript()
+    config_service.set_overrides({'Tasks.sensorimotor_movement_duration': script.sensorimotor_movement_duration})
+    results = {}
+    for task in tasks:
+        result = bench_task(task, script, args.repeat)
+        result['cycles_per_second'] = result['cycles'] / result['seconds']
+        results[task.name] = result
+        print(f'{task.name:<22} {result["cycles"]:>7} cycles {result["seconds"]:7.3f} s '
+              f'{result["cycles_per_second"] / 1000.0:8.1f}k cycles/s '
+              f'{result["cycles_per_second"] * Constants.ROBOT_CYCLE_TIME:6.1f}x realtime')
+
+    total_cycles = sum(r['cycles'] for r in results.values())
+    total_seconds = sum(r['seconds'] for r in results.values())
+    print(f'{"Total":<22} {total_cycles:>7} cycles {total_seconds:7.3f} s '
+          f'{total_cycles / total_seconds / 1000.0:8.1f}k cycles/s')
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Golden MotorState stream recording and diffing.
+
+Every task type is driven headlessly through the same scripted control sequence. The resulting MotorState time
+series is stored as a compressed binary golden file per task. Later runs are compared against those files
+numerically (with tolerances) to detect any behavioral change introduced when refactoring task implementations.
+
+Usage:
+    python -m mike_simulator.tools.golden record [--dir golden] [TASK ...]
+    python -m mike_simulator.tools.golden check [--dir golden] [--atol 1e-6] [--rtol 1e-9] [TASK ...]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, asdict, fields
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from mike_simulator.config import cfg, config_service
+from mike_simulator.datamodels import MotorState, TaskType
+from mike_simulator.headless import HeadlessSimulator
+from mike_simulator.input.backends.prerecorded_input import PrerecordedInputHandler
+from mike_simulator.task.factory import _tasks_class_by_type
+
+# Storage type of every MotorState field in the golden files
+FIELD_DTYPES = {
+    'Counter': np.uint32,
+    'Time': np.float64,
+    'Position': np.float64,
+    'StartingPosition': np.float64,
+    'TargetPosition': np.float64,
+    'Force': np.float64,
+    'TrialNr': np.uint8,
+    'RomState': np.uint8,
+    'TargetState': np.bool_,
+    'Finished': np.bool_,
+    'Flexion': np.bool_,
+}
+assert list(FIELD_DTYPES) == [field.name for field in fields(MotorState)]
+
+
+@dataclass
+class ControlScript:
+    """Scripted frontend behavior used to drive a task through all of its states."""
+    seed: int = 42
+    left_hand: bool = True
+    trial_count: int = 2
+
+    # A start command is issued every start_interval cycles until the task is finished
+    start_interval: int = 8000
+    max_cycles: int = 400_000
+
+    # User input pattern (in cycles): push right, release, push left, release
+    push_cycles: int = 600
+    release_cycles: int = 150
+
+    # Starting and target positions sent with the start commands (direction is applied by the tasks)
+    starting_position: float = 30.0
+    target_position: float = 50.0
+
+    # Overrides to keep the long running tasks short
+    sensorimotor_movement_duration: float = 10.0
+
+    def make_input_recording(self) -> List[float]:
+        return ([1.0] * self.push_cycles + [0.0] * self.release_cycles
+                + [-1.0] * self.push_cycles + [0.0] * self.release_cycles)
+
+
+def run_task(task: TaskType, script: ControlScript) -> Dict[str, np.ndarray]:
+    """
+    Run a single task headlessly through the control script.
+
+    :return: dictionary mapping each MotorState field name to the per-cycle values of that field
+    """
+    random.seed(script.seed)
+    previous = cfg.Tasks.sensorimotor_movement_duration
+    config_service.set_overrides({'Tasks.sensorimotor_movement_duration': script.sensorimotor_movement_duration})
+
+    columns = {name: [] for name in FIELD_DTYPES}
+    direction = 1.0 if script.left_hand else -1.0
+    try:
+        with HeadlessSimulator(PrerecordedInputHandler(script.make_input_recording())) as sim:
+            sim.select_patient(task, script.left_hand, script.trial_count)
+            for cycle in range(script.max_cycles):
+                if cycle % script.start_interval == 0:
+                    sim.start(script.starting_position * direction, script.target_position * direction)
+                ms = sim.step()
+                for name, column in columns.items():
+                    column.append(getattr(ms, name))
+                if ms.Finished:
+                    break
+    finally:
+        # Later code in the same process (e.g. other tools) sees the previous value again
+        config_service.set_overrides({'Tasks.sensorimotor_movement_duration': previous})
+    return {name: np.array(column, dtype=FIELD_DTYPES[name]) for name, column in columns.items()}
+
+
+def golden_path(directory: str, task: TaskType) -> str:
+    return os.path.join(directory, f'{task.name}.npz')
+
+
+def save_golden(filename: str, series: Dict[str, np.ndarray], script: ControlScript):
+    np.savez_compressed(filename, __script__=np.array(json.dumps(asdict(script))), **series)
+
+
+def load_golden(filename: str) -> Tuple[Dict[str, np.ndarray], ControlScript]:
+    with np.load(filename) as data:
+        script = ControlScript(**json.loads(str(data['__script__'])))
+        series = {name: data[name] for name in FIELD_DTYPES}
+    return series, script
+
+
+@dataclass
+class Divergence:
+    cycle: int
+    field: str
+    expected: Optional[float]
+    actual: Optional[float]
+
+    def __str__(self):
+        return f'first divergence at cycle {self.cycle} in {self.field}: expected {self.expected}, got {self.actual}'
+
+
+def diff_series(expected: Dict[str, np.ndarray], actual: Dict[str, np.ndarray],
+                atol: float, rtol: float) -> Optional[Divergence]:
+    """
+    Compare two motor state time series.
+
+    Floating point fields are compared with the given tolerances, all other fields exactly.
+    :return: the first divergent cycle (or None if both series match)
+    """
+    n_expected, n_actual = len(expected['Counter']), len(actual['Counter'])
+    n = min(n_expected, n_actual)
+    first: Optional[Divergence] = None
+    for name, dtype in FIELD_DTYPES.items():
+        e, a = expected[name][:n], actual[name][:n]
+        if dtype == np.float64:
+            mismatch = ~np.isclose(a, e, rtol=rtol, atol=atol)
+        else:
+            mismatch = a != e
+        if mismatch.any():
+            cycle = int(np.argmax(mismatch))
+            if first is None or cycle < first.cycle:
+                first = Divergence(cycle, name, e[cycle].item(), a[cycle].item())
+    if first is None and n_expected != n_actual:
+        first = Divergence(n, 'length', n_expected, n_actual)
+    return first
+
+
+def _parse_tasks(names: List[str]) -> List[TaskType]:
+    if not names:
+        return list(_tasks_class_by_type)
+    return [TaskType[name] for name in names]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Record or check golden MotorState streams for all tasks.')
+    parser.add_argument('command', choices=['record', 'check'])
+    parser.add_argument('tasks', nargs='*', help='TaskType names (default: all tasks)')
+    parser.add_argument('--dir', default='./golden', help='directory containing the golden files')
+    parser.add_argument('--atol', type=float, default=1e-6, help='absolute tolerance for floating point fields')
+    parser.add_argument('--rtol', type=float, default=1e-9, help='relative tolerance for floating point fields')
+    args = parser.parse_intermixed_args(argv)
+
+    os.makedirs(args.dir, exist_ok=True)
+    failures = 0
+    for task in _parse_tasks(args.tasks):
+        t_start = time.perf_counter()
+        filename = golden_path(args.dir, task)
+        if args.command == 'record':
+            script = ControlScript()
+            series = run_task(task, script)
+            save_golden(filename, series, script)
+            result = f'recorded {len(series["Counter"])} cycles'
+        elif not os.path.exists(filename):
+            failures += 1
+            result = 'MISSING golden file'
+        else:
+            expected, script = load_golden(filename)
+            divergence = diff_series(expected, run_task(task, script), args.atol, args.rtol)
+            if divergence is not None:
+                failures += 1
+                result = f'FAILED, {divergence}'
+            else:
+                result = f'ok ({len(expected["Counter"])} cycles)'
+        print(f'{task.name:<22} {result} [{time.perf_counter() - t_start:.2f}s]')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Replays recorded sessions as motor data stream.
+
+The rows of session logs (csv written by the simulator or compact .npy, see analytics/session_log.py) are
+converted back into motor states and sent as motor data packets to the frontend port and the configured
+subscribers, paced by the logged time stamps (--speed 2 replays twice as fast, 0 as fast as possible).
+Only the logged fields are restored: the target state is not logged and always False, Flexion is always set and
+Finished is set in the last motor state of every session.
+Sessions are logged every Constants.LOG_CYCLES cycles, so a replay sends fewer packets than the original session.
+
+Usage:
+    python main.py replay LOG [LOG ...] [--to host:port ...] [--speed 1.0] [--loop] [--set Section.name=value ...]
+"""
+import argparse
+import os
+import socket
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from mike_simulator.analytics.session_log import load_session_log, TIME, POSITION, TARGET_POSITION, \
+    TRIAL, STARTING_POSITION, FORCE, ROM_STATE
+from mike_simulator.config import cfg, load_configuration, parse_override
+from mike_simulator.datamodels import Constants, MotorState, RomState
+from mike_simulator.profiles import PROFILES
+from mike_simulator.transport import FanOutSender, parse_endpoints
+from mike_simulator.util import PrintUtil
+from mike_simulator.util.lab_view_serialization import FixedSizeFlattener
+
+
+def replay_session(rows: np.ndarray, sender: FanOutSender, speed: float, label: str = ''):
+    """
+    Send the motor states of a session log at the logged pace.
+
+    :param rows: session log rows (see load_session_log)
+    :param speed: replay speed relative to the recording (0 = as fast as possible)
+    """
+    flattener = FixedSizeFlattener(MotorState)
+    packet = bytearray(flattener.size)
+    ms = MotorState.new()
+    duration = rows[-1, TIME] - rows[0, TIME]
+    t_start = time.perf_counter()
+    for index, row in enumerate(rows.tolist()):
+        elapsed = row[TIME] - rows[0, TIME]
+        if speed > 0.0:
+            delay = t_start + elapsed / speed - time.perf_counter()
+            if delay > 0.0:
+                time.sleep(delay)
+
+        ms.Counter = index * Constants.LOG_CYCLES
+        ms.Time = row[TIME]
+        ms.Position = row[POSITION]
+        ms.StartingPosition = row[STARTING_POSITION]
+        ms.TargetPosition = row[TARGET_POSITION]
+        ms.Force = row[FORCE]
+        ms.TrialNr = int(row[TRIAL])
+        ms.RomState = RomState(int(row[ROM_STATE]))
+        ms.Finished = index == len(rows) - 1
+        flattener.flatten_into(packet, 0, ms)
+        sender.send(packet)
+        PrintUtil.print_inplace(f'{label} {elapsed:.1f}/{duration:.1f} s, trial {ms.TrialNr}')
+
+
+def _destinations(targets: List[str]) -> Tuple[List[Tuple[str, int]], int]:
+    """Return the explicitly given destinations or those of the motor data stream of the simulator."""
+    if targets:
+        return parse_endpoints(','.join(targets)), 1
+    destinations = [('127.0.0.1', cfg.Network.motor_data_port)] + cfg.Network.motor_data_subscriber_endpoints
+    if cfg.Network.motor_data_multicast_group:
+        destinations.append((cfg.Network.motor_data_multicast_group, cfg.Network.motor_data_port))
+    return destinations, cfg.Network.motor_data_multicast_ttl
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='main.py replay', description='Replay session logs as motor data stream.')
+    parser.add_argument('logs', nargs='+', help='session log files (csv or .npy)')
+    parser.add_argument('--to', action='append', default=[], metavar='HOST:PORT',
+                        help='destination (repeatable, default: frontend port on localhost and configured subscribers)')
+    parser.add_argument('--speed', type=float, default=1.0, help='replay speed (0 = as fast as possible)')
+    parser.add_argument('--loop', action='store_true', help='replay the sessions until interrupted')
+    parser.add_argument('--set', action='append', default=[], metavar='SECTION.NAME=VALUE',
+                        help='override a configuration entry (repeatable)')
+    args = parser.parse_args(argv)
+
+    try:
+        load_configuration(overrides=dict(parse_override(spec) for spec in args.set))
+        destinations, multicast_ttl = _destinations(args.to)
+        sessions = [(filename, load_session_log(filename)) for filename in args.logs]
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    sessions = [(filename, rows) for filename, rows in sessions if len(rows) > 0]
+
+    PROFILES['replay'].apply()
+    sender = FanOutSender(socket.socket(socket.AF_INET, socket.SOCK_DGRAM))
+    sender.set_destinations(destinations, multicast_ttl)
+    print(f'Replaying {len(sessions)} sessions to {sender.destinations}')
+    try:
+        while True:
+            for filename, rows in sessions:
+                replay_session(rows, sender, args.speed, os.path.basename(filename))
+                PrintUtil.print_normally(f'Replayed {filename}')
+            if not args.loop:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sender.sock.close()
+    if sender.send_errors:
+        print(f'{sender.send_errors} packets could not be sent')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Scripted headless session of a single task.
+
+Runs the task on a simulated clock, driven by the scripted user input and start commands of ControlScript
+(see golden.py). The session log is written as configured ([Logging] section, time stamps in simulated time)
+and the per-trial metrics are printed, so sessions for offline analysis (see analyze_logs.py) can be produced
+in a fraction of their real duration without a frontend.
+
+Usage:
+    python main.py simulate --task Motor [--right] [--trials 2] [--study Simulated] [--subject 0] [--seed 42]
+        [--set Section.name=value ...]
+"""
+import argparse
+import random
+import sys
+import time
+from dataclasses import replace
+from typing import List, Optional
+
+from mike_simulator.config import cfg, load_configuration, parse_override
+from mike_simulator.datamodels import TaskType
+from mike_simulator.headless import HeadlessSimulator
+from mike_simulator.input.backends.prerecorded_input import PrerecordedInputHandler
+from mike_simulator.profiles import PROFILES
+from mike_simulator.tools.golden import ControlScript
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='main.py simulate', description='Run a scripted headless session.')
+    parser.add_argument('--task', required=True, help='TaskType name')
+    parser.add_argument('--right', action='store_true', help='use the right hand (default: left hand)')
+    parser.add_argument('--trials', type=int, default=2, help='number of trials per phase')
+    parser.add_argument('--study', default='Simulated', help='study name (part of the log file path)')
+    parser.add_argument('--subject', default='0', help='subject number (part of the log file path)')
+    parser.add_argument('--seed', type=int, default=42, help='seed for the randomized parts of the task')
+    parser.add_argument('--set', action='append', default=[], metavar='SECTION.NAME=VALUE',
+                        help='override a configuration entry (repeatable)')
+    args = parser.parse_args(argv)
+
+    try:
+        task = TaskType[args.task]
+        overrides = dict(parse_override(spec) for spec in args.set)
+        load_configuration(overrides=overrides)
+    except KeyError as e:
+        parser.error(f'Unknown task {e}')
+    except ValueError as e:
+        parser.error(str(e))
+
+    profile = PROFILES['simulate']
+    profile.apply()
+    logging_enabled = cfg.Logging.enabled if profile.logging_enabled is None else profile.logging_enabled
+    script = replace(ControlScript(), seed=args.seed, left_hand=not args.right, trial_count=args.trials)
+    direction = 1.0 if script.left_hand else -1.0
+
+    random.seed(script.seed)
+    t_start = time.perf_counter()
+    with HeadlessSimulator(PrerecordedInputHandler(script.make_input_recording()), quiet=False,
+                           logging_enabled=logging_enabled) as sim:
+        sim.select_patient(task, script.left_hand, script.trial_count, args.study, args.subject,
+                           time.strftime('%Y%m%d_%H%M%S'))
+        log_file = getattr(getattr(sim.simulator.logger, 'sink', None), 'filename', None)
+        for cycle in range(script.max_cycles):
+            if cycle % script.start_interval == 0:
+                sim.start(script.starting_position * direction, script.target_position * direction)
+            if sim.step().Finished:
+                break
+        else:
+            print(f'{task.name} did not finish within {script.max_cycles} cycles')
+        simulated = sim.clock.now_ns / 1_000_000_000
+    print(f'Simulated {simulated:.1f} s in {time.perf_counter() - t_start:.2f} s'
+          + (f', session log: {log_file}' if log_file else ''))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
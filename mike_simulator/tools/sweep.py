@@ -0,0 +1,250 @@
+"""
+Parameter sweeps over headless sessions.
+
+Every point of a sweep (one combination of parameter values) runs one headless session per task, driven by the
+scripted user input and start commands of ControlScript (see golden.py), in a pool of worker processes. The
+per-trial metrics of all sessions (see metrics/recorder.py) are collected into a single csv result table.
+Results are cached per point (keyed by a hash of the task, the parameter values and the script), so repeating
+or extending a sweep only runs the points which were not run before.
+
+Parameters are given as TARGET.NAME=VALUES, where TARGET is Constants, Script (a ControlScript field) or a config
+section (e.g. Tasks.sensorimotor_movement_duration), and VALUES is either a list 'a,b,c' or a range 'lo:hi:n'
+(n evenly spaced values for a grid, the interval [lo, hi] for random sampling).
+
+Usage:
+    python -m mike_simulator.tools.sweep --task Motor --param Constants.USER_BURST_ACCEL_RATE=1000:3000:5
+        [--param Constants.MASS_CONSTANT=0.2,0.3 ...] [--random N [--seed S]] [--workers N]
+        [--cache .sweep_cache] [--out sweep.csv]
+"""
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, asdict, fields, replace
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from mike_simulator.config import cfg, config_service, IniSection
+from mike_simulator.datamodels import Constants, TaskType
+from mike_simulator.headless import HeadlessSimulator
+from mike_simulator.input.backends.prerecorded_input import PrerecordedInputHandler
+from mike_simulator.tools.golden import ControlScript
+
+# Increment when a change of the simulator invalidates cached results
+CACHE_VERSION = 1
+
+Point = Dict[str, float]
+
+
+@dataclass
+class Parameter:
+    """Swept parameter and its values"""
+    target: str
+    name: str
+    values: List[float]
+    # Interval for random sampling (None if the values were given as list)
+    interval: Optional[Tuple[float, float]] = None
+
+    @property
+    def key(self) -> str:
+        return f'{self.target}.{self.name}'
+
+
+def parse_parameter(spec: str) -> Parameter:
+    """
+    Parse a parameter specification of the form TARGET.NAME=a,b,c or TARGET.NAME=lo:hi:n.
+
+    :raise ValueError: if the specification is malformed or the parameter does not exist
+    """
+    key, sep, values = spec.partition('=')
+    target, _, name = key.partition('.')
+    if not sep or not name:
+        raise ValueError(f'Parameter {spec} must be of the form TARGET.NAME=VALUES')
+    _get_parameter(target, name)
+
+    if ':' in values:
+        low, high, count = values.split(':')
+        low, high = float(low), float(high)
+        return Parameter(target, name, np.linspace(low, high, int(count)).tolist(), (low, high))
+    return Parameter(target, name, [float(value) for value in values.split(',')])
+
+
+def grid_points(parameters: List[Parameter]) -> List[Point]:
+    """Return all combinations of the parameter values."""
+    keys = [parameter.key for parameter in parameters]
+    return [dict(zip(keys, values)) for values in itertools.product(*(p.values for p in parameters))]
+
+
+def random_points(parameters: List[Parameter], count: int, seed: int) -> List[Point]:
+    """Return count points with values drawn uniformly from the parameter intervals (or value lists)."""
+    rng = random.Random(seed)
+    return [{p.key: rng.uniform(*p.interval) if p.interval is not None else rng.choice(p.values) for p in parameters}
+            for _ in range(count)]
+
+
+def point_hash(task: TaskType, point: Point, script: ControlScript) -> str:
+    """Cache key of a point."""
+    description = {'version': CACHE_VERSION, 'task': task.name, 'point': point, 'script': asdict(script)}
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()[:20]
+
+
+def run_point(task: TaskType, point: Point, script: ControlScript) -> List[Dict[str, float]]:
+    """
+    Run a headless session of task with the parameter values of point.
+
+    :return: per-trial metrics of the session
+    """
+    previous = _current_values(point)
+    script = _apply_parameters(point, script)
+    random.seed(script.seed)
+    # Set from the swept script (unless the config entry itself is swept)
+    overrides = {'Tasks.online_metrics': True}
+    if 'Tasks.sensorimotor_movement_duration' not in point:
+        overrides['Tasks.sensorimotor_movement_duration'] = script.sensorimotor_movement_duration
+    config_service.set_overrides(overrides)
+    try:
+        direction = 1.0 if script.left_hand else -1.0
+        with HeadlessSimulator(PrerecordedInputHandler(script.make_input_recording())) as sim:
+            sim.select_patient(task, script.left_hand, script.trial_count)
+            for cycle in range(script.max_cycles):
+                if cycle % script.start_interval == 0:
+                    sim.start(script.starting_position * direction, script.target_position * direction)
+                if sim.step().Finished:
+                    break
+            return sim.simulator.trial_metrics.results
+    finally:
+        # Worker processes run many points, restore the previous values for the next one
+        _apply_parameters(previous, script)
+
+
+def run_sweep(tasks: List[TaskType], points: List[Point], script: ControlScript, cache_dir: str,
+              workers: Optional[int] = None) -> List[Tuple[TaskType, Point, List[Dict[str, float]]]]:
+    """
+    Run all points (which are not cached yet) for every task.
+
+    :param workers: number of worker processes (None = number of CPUs)
+    :return: task, point and per-trial metrics of every run, in the order of tasks and points
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    runs = [(task, point, os.path.join(cache_dir, point_hash(task, point, script) + '.json'))
+            for task in tasks for point in points]
+    results = {}
+    missing = []
+    for task, point, filename in runs:
+        if os.path.exists(filename):
+            with open(filename) as f:
+                results[filename] = json.load(f)['trials']
+        else:
+            missing.append((task, point, filename))
+    print(f'{len(runs) - len(missing)} of {len(runs)} runs cached, running {len(missing)}')
+
+    if missing:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run_point, task, point, script): (task, point, filename)
+                       for task, point, filename in missing}
+            for done, future in enumerate(as_completed(futures), 1):
+                task, point, filename = futures[future]
+                results[filename] = future.result()
+                _write_cache(filename, task, point, results[filename])
+                print(f'[{done}/{len(missing)}] {task.name} {point}')
+    return [(task, point, results[filename]) for task, point, filename in runs]
+
+
+def write_table(filename: str, runs: List[Tuple[TaskType, Point, List[Dict[str, float]]]]):
+    """Write one row per trial of every run (parameter values followed by the trial metrics)."""
+    parameter_keys = list(dict.fromkeys(key for _, point, _ in runs for key in point))
+    metric_keys = list(dict.fromkeys(key for _, _, trials in runs for trial in trials for key in trial))
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['task'] + parameter_keys + metric_keys)
+        for task, point, trials in runs:
+            for trial in trials:
+                writer.writerow([task.name] + [point.get(key, '') for key in parameter_keys]
+                                + [trial.get(key, '') for key in metric_keys])
+
+
+def _get_parameter(target: str, name: str):
+    """Return the object holding parameter target.name (raise ValueError if it does not exist)."""
+    if target == 'Constants':
+        holder = Constants
+        if not hasattr(holder, name):
+            raise ValueError(f'Unknown parameter {target}.{name}')
+    elif target == 'Script':
+        if name not in {f.name for f in fields(ControlScript)}:
+            raise ValueError(f'ControlScript has no field {name}')
+        return None
+    else:
+        holder = getattr(cfg, target, None)
+        if not isinstance(holder, IniSection) or name not in {f.name for f in fields(holder)}:
+            raise ValueError(f'Unknown parameter {target}.{name}')
+    return holder
+
+
+def _current_values(point: Point) -> Point:
+    """Return the current values of the config and Constants parameters of point."""
+    values = {}
+    for key in point:
+        holder = _get_parameter(*key.split('.', 1))
+        if holder is not None:
+            values[key] = getattr(holder, key.split('.', 1)[1])
+    return values
+
+
+def _apply_parameters(point: Point, script: ControlScript) -> ControlScript:
+    """Set the parameter values of point (Constants in place, config as overrides) and return the modified script."""
+    script_values = {}
+    config_values = {}
+    for key, value in point.items():
+        target, name = key.split('.', 1)
+        holder = _get_parameter(target, name)
+        if holder is None:
+            script_values[name] = type(getattr(script, name))(value)
+        elif holder is Constants:
+            setattr(holder, name, type(getattr(holder, name))(value))
+        else:
+            config_values[key] = type(getattr(holder, name))(value)
+    config_service.set_overrides(config_values)
+    return replace(script, **script_values)
+
+
+def _write_cache(filename: str, task: TaskType, point: Point, trials: List[Dict[str, float]]):
+    tmp_filename = filename + '.tmp'
+    with open(tmp_filename, 'w') as f:
+        json.dump({'task': task.name, 'point': point, 'trials': trials}, f)
+    os.replace(tmp_filename, filename)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Run headless sessions for a grid or random sample of parameters.')
+    parser.add_argument('--task', action='append', required=True, help='TaskType name (repeatable)')
+    parser.add_argument('--param', action='append', default=[], help='TARGET.NAME=a,b,c or TARGET.NAME=lo:hi:n')
+    parser.add_argument('--random', type=int, default=0, help='number of random points instead of the full grid')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the random points')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: CPUs)')
+    parser.add_argument('--cache', default='.sweep_cache', help='directory in which results are cached')
+    parser.add_argument('--out', default='sweep.csv', help='result table (csv) to write')
+    args = parser.parse_args(argv)
+
+    try:
+        tasks = [TaskType[name] for name in args.task]
+        parameters = [parse_parameter(spec) for spec in args.param]
+    except (KeyError, ValueError) as e:
+        parser.error(str(e))
+    points = random_points(parameters, args.random, args.seed) if args.random else grid_points(parameters)
+
+    t_start = time.perf_counter()
+    runs = run_sweep(tasks, points, ControlScript(), args.cache, args.workers)
+    write_table(args.out, runs)
+    print(f'{len(runs)} runs in {time.perf_counter() - t_start:.2f}s, results written to {args.out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Telemetry collector: receives the binary log stream of one or more simulators (Logging.sink = Stream)
+and writes the sessions as csv files, identical to the files the simulator would write itself.
+
+Usage:
+    python -m mike_simulator.tools.telemetry_collector [--listen 127.0.0.1:6670 | --listen unix:PATH] [--out ./logs]
+"""
+import argparse
+import csv
+import os
+import socket
+import socketserver
+import sys
+import threading
+from typing import List, Optional
+
+from mike_simulator.log_sinks.telemetry_protocol import FrameReader, MSG_SESSION_START, MSG_ROW, MSG_SESSION_END, \
+    decode_session_start, decode_row
+
+
+class SessionWriter:
+    """Csv file of a single session"""
+
+    def __init__(self, filename: str, fields: List[str], append: bool):
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        self.file = open(filename, 'a' if append else 'w', newline='')
+        self.writer = csv.writer(self.file)
+        if not append:
+            self.writer.writerow(fields)
+
+    def write_row(self, row: tuple):
+        self.writer.writerow([str(elem) for elem in row])
+
+    def close(self):
+        self.file.close()
+
+
+class Collector:
+    def __init__(self, out_dir: str):
+        self.out_dir = out_dir
+        self.lock = threading.Lock()
+        # Files written by this collector so far, sessions announced again after a reconnect are appended
+        self.known_files = set()
+
+    def open_session(self, path: str, fields: List[str]) -> SessionWriter:
+        filename = os.path.normpath(os.path.join(self.out_dir, path))
+        if not filename.startswith(os.path.normpath(self.out_dir) + os.sep):
+            raise ValueError(f'Session path {path} is outside of the output directory')
+        with self.lock:
+            append = filename in self.known_files
+            self.known_files.add(filename)
+        print(f'{"Resuming" if append else "Recording"} {filename}')
+        return SessionWriter(filename, fields, append)
+
+    def handle_stream(self, sock: socket.socket):
+        """Receive frames from a single simulator connection until it is closed."""
+        reader = FrameReader()
+        sessions = {}
+        try:
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    break
+                for msg_type, session_id, payload in reader.feed(data):
+                    if msg_type == MSG_SESSION_START:
+                        if session_id not in sessions:
+                            sessions[session_id] = self.open_session(*decode_session_start(payload))
+                    elif msg_type == MSG_ROW:
+                        session = sessions.get(session_id)
+                        if session is not None:
+                            session.write_row(decode_row(payload))
+                    elif msg_type == MSG_SESSION_END:
+                        session = sessions.pop(session_id, None)
+                        if session is not None:
+                            session.close()
+        except (OSError, ValueError) as e:
+            print(f'Connection aborted {e.args}')
+        finally:
+            for session in sessions.values():
+                session.close()
+
+
+def create_server(address: str, collector: Collector) -> socketserver.BaseServer:
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            print('Simulator connected')
+            collector.handle_stream(self.request)
+            print('Simulator disconnected')
+
+    if address.startswith('unix:'):
+        path = address[len('unix:'):]
+        if os.path.exists(path):
+            os.remove(path)
+        return socketserver.ThreadingUnixStreamServer(path, Handler)
+    host, _, port = address.rpartition(':')
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    return socketserver.ThreadingTCPServer((host, int(port)), Handler)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Record the telemetry stream of simulators as csv session files.')
+    parser.add_argument('--listen', default='127.0.0.1:6670', help="'host:port' or 'unix:path' to listen on")
+    parser.add_argument('--out', default='./logs', help='directory in which the session files are written')
+    args = parser.parse_args(argv)
+
+    with create_server(args.listen, Collector(args.out)) as server:
+        print(f'Listening on {args.listen}, writing sessions to {os.path.realpath(args.out)}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,31 @@
+import importlib
+from enum import Enum
+
+# Tracing is disabled by default, its modules are imported on first access only
+_modules_by_name = {
+    'ChromeTraceWriter': 'chrome_trace',
+    'ControlLatencyTracer': 'control_latency',
+    'MetricsServer': 'metrics_server',
+    'SamplingProfiler': 'sampling_profiler',
+}
+__all__ = list(_modules_by_name)
+
+
+def __getattr__(name):
+    if name in _modules_by_name:
+        return getattr(importlib.import_module(f'.{_modules_by_name[name]}', __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+class ProfilerClock(Enum):
+    # Samples are taken every interval of CPU time used by the process (SIGPROF timer, POSIX only)
+    Cpu = 0
+    # Samples are taken every interval of wall-clock time by a sampler thread (includes idle time)
+    Wall = 1
+
+
+class ProfileFormat(Enum):
+    # speedscope json (https://www.speedscope.app)
+    Speedscope = 0
+    # One line 'outer;...;inner count' per stack (flamegraph.pl, speedscope, inferno, ...)
+    Collapsed = 1
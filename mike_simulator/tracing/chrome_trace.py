@@ -0,0 +1,51 @@
+"""
+Trace files in the Chrome trace event format (JSON object format), which can be opened in chrome://tracing,
+https://ui.perfetto.dev or speedscope.
+"""
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+
+class ChromeTraceWriter:
+    """Collects trace events in memory (up to max_events) and writes them as a single trace file"""
+
+    def __init__(self, max_events: int = 100000, process_name: str = 'mike_simulator'):
+        """
+        :param max_events: maximum number of collected events, later events are dropped (and counted)
+        :param process_name: name of the process shown in the trace viewer
+        """
+        self.max_events = max_events
+        self.events: List[Dict[str, Any]] = []
+        self.dropped = 0
+        self.pid = os.getpid()
+        self.metadata = [{'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'args': {'name': process_name}}]
+
+    def add(self, name: str, phase: str, ts_us: float, cat: str = '', args: Optional[Dict[str, Any]] = None, **fields):
+        """
+        Add an event.
+
+        :param phase: event type ('X' = complete, 'i' = instant, 'b'/'e' = begin/end of an async span, 'C' = counter)
+        :param ts_us: timestamp [µs]
+        :param fields: additional event fields (e.g. dur for complete events, id for async events)
+        """
+        if len(self.events) >= self.max_events:
+            self.dropped += 1
+            return
+        event = {'name': name, 'ph': phase, 'ts': ts_us, 'pid': self.pid, 'tid': fields.pop('tid', 0), **fields}
+        if cat:
+            event['cat'] = cat
+        if args:
+            event['args'] = args
+        self.events.append(event)
+
+    def write(self, filename: str):
+        """Write all events collected so far (replaces the file)."""
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_filename = filename + '.tmp'
+        with open(tmp_filename, 'w') as f:
+            json.dump({'traceEvents': self.metadata + self.events, 'displayTimeUnit': 'ms',
+                       'otherData': {'dropped_events': self.dropped}}, f)
+        os.replace(tmp_filename, filename)
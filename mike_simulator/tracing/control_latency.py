@@ -0,0 +1,153 @@
+"""
+Latency of control messages, from their receipt until the first motor state reflecting them was sent.
+
+For every control message, the server reports the time at which the data completing the message was received
+(together with the counter of the next motor state at that time) and when the message was handled. A message is
+reflected by the first motor state produced after it was handled once no task preparation is in flight (a
+PatientSelect only takes effect once its task was prepared and activated). The message is complete once a packet
+containing that motor state was sent (or handed to the network impairment pipeline).
+"""
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from mike_simulator.metrics import Histogram, RunningMinMax, WelfordMeanVariance
+from mike_simulator.tracing.chrome_trace import ChromeTraceWriter
+
+# Bucket bounds of the latency histograms [s] and of the cycle histograms [motor states]
+LATENCY_BUCKETS = [0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+CYCLE_BUCKETS = [0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 1000]
+
+
+@dataclass
+class ControlTrace:
+    id: int
+    name: str
+    received_ns: int
+    # Counter of the next motor state at the time of receipt
+    received_counter: int
+    handled_ns: int
+    # Counter of the first motor state reflecting the message (None = not produced yet)
+    reflected_counter: Optional[int] = None
+
+
+class LatencyDistribution:
+    """Latency statistics of one kind of control message"""
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.handling = Histogram(LATENCY_BUCKETS)
+        self.cycles = Histogram(CYCLE_BUCKETS)
+        self.latency_extremes = RunningMinMax()
+        self.latency_statistics = WelfordMeanVariance()
+
+    def update(self, latency: float, handling: float, cycles: int):
+        self.latency.update(latency)
+        self.handling.update(handling)
+        self.cycles.update(cycles)
+        self.latency_extremes.update(latency)
+        self.latency_statistics.update(latency)
+
+    def summary(self) -> Dict[str, float]:
+        return {'count': self.latency.count, **self.latency_extremes.result(), **self.latency_statistics.result(),
+                'handling_mean': self.handling.sum / self.handling.count,
+                'cycles_mean': self.cycles.sum / self.cycles.count}
+
+
+class ControlLatencyTracer:
+    """Traces control messages, collects their latency distributions and (optionally) trace events"""
+
+    def __init__(self, trace: Optional[ChromeTraceWriter] = None):
+        """
+        :param trace: trace to which an async span per control message is added (None = statistics only)
+        """
+        self.trace = trace
+        self.start_ns = time.perf_counter_ns()
+        self.next_id = 0
+        self.distributions: Dict[str, LatencyDistribution] = {}
+
+        # Handled messages which are not reflected by a motor state yet / whose motor state was not sent yet
+        self.waiting_for_state: List[ControlTrace] = []
+        self.waiting_for_send: List[ControlTrace] = []
+
+    def message_handled(self, name: str, received_ns: int, received_counter: int):
+        """
+        Start tracing a message which was just handled.
+
+        :param name: kind of message (e.g. PatientSelect, Skip or ControlResponse.command_name())
+        :param received_ns: time (perf_counter_ns) at which the data completing the message was received
+        :param received_counter: counter of the next motor state at that time
+        """
+        self.waiting_for_state.append(ControlTrace(self.next_id, name, received_ns, received_counter,
+                                                   time.perf_counter_ns()))
+        self.next_id += 1
+
+    def motor_state_produced(self, counter: int, reflects_handled: bool):
+        """
+        Report a new motor state (before it is sent).
+
+        :param reflects_handled: whether the motor state reflects all messages handled so far
+                                 (False while a task preparation is in flight)
+        """
+        if reflects_handled and self.waiting_for_state:
+            for trace in self.waiting_for_state:
+                trace.reflected_counter = counter
+            self.waiting_for_send += self.waiting_for_state
+            self.waiting_for_state.clear()
+
+    def packet_sent(self):
+        """Report that all motor states produced so far were sent."""
+        if not self.waiting_for_send:
+            return
+        sent_ns = time.perf_counter_ns()
+        for trace in self.waiting_for_send:
+            distribution = self.distributions.get(trace.name)
+            if distribution is None:
+                distribution = self.distributions[trace.name] = LatencyDistribution()
+            distribution.update((sent_ns - trace.received_ns) / 1e9, (trace.handled_ns - trace.received_ns) / 1e9,
+                                trace.reflected_counter - trace.received_counter)
+            if self.trace is not None:
+                self._add_trace_events(trace, sent_ns)
+        self.waiting_for_send.clear()
+
+    def reset(self):
+        """Discard messages in flight (e.g. when the connection is closed), the statistics are kept."""
+        self.waiting_for_state.clear()
+        self.waiting_for_send.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return the latency statistics [s] and the mean number of cycles per kind of message."""
+        # Copy, the metrics server calls this from its own thread
+        return {name: distribution.summary() for name, distribution in list(self.distributions.items())}
+
+    def prometheus_text(self) -> str:
+        """Return the latency histograms in the Prometheus text exposition format."""
+        lines = []
+        for metric, attribute, description in (
+                ('mike_control_latency_seconds', 'latency',
+                 'Time from receipt of a control message until the first motor state reflecting it was sent'),
+                ('mike_control_handling_seconds', 'handling',
+                 'Time from receipt of a control message until it was handled'),
+                ('mike_control_latency_cycles', 'cycles',
+                 'Motor states sent between receipt of a control message and the first one reflecting it')):
+            lines += [f'# HELP {metric} {description}', f'# TYPE {metric} histogram']
+            for name, distribution in sorted(list(self.distributions.items())):
+                histogram: Histogram = getattr(distribution, attribute)
+                for bound, count in histogram.buckets():
+                    lines.append(f'{metric}_bucket{{message="{name}",le="{bound:g}"}} {count}'
+                                 .replace('le="inf"', 'le="+Inf"'))
+                lines.append(f'{metric}_sum{{message="{name}"}} {histogram.sum:g}')
+                lines.append(f'{metric}_count{{message="{name}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def _add_trace_events(self, trace: ControlTrace, sent_ns: int):
+        def ts(ns: int) -> float:
+            return (ns - self.start_ns) / 1000.0
+
+        # Overlapping messages are shown as nested async spans: receipt -> sent, receipt -> handled
+        args = {'received_counter': trace.received_counter, 'reflected_counter': trace.reflected_counter,
+                'cycles': trace.reflected_counter - trace.received_counter}
+        self.trace.add(trace.name, 'b', ts(trace.received_ns), 'control', args, id=trace.id)
+        self.trace.add('handling', 'b', ts(trace.received_ns), 'control', id=trace.id)
+        self.trace.add('handling', 'e', ts(trace.handled_ns), 'control', id=trace.id)
+        self.trace.add(trace.name, 'e', ts(sent_ns), 'control', id=trace.id)
@@ -0,0 +1,62 @@
+"""
+Local http endpoint serving runtime metrics of the simulator:
+GET /metrics (Prometheus text exposition format) and GET /metrics.json (summary as JSON).
+"""
+import json
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Tuple
+
+
+def _finite(value):
+    """Replace non-finite floats (e.g. the NaN std of a single sample) by None, which JSON can represent."""
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+class MetricsServer:
+    """Http server on a daemon thread, the metrics are collected on every request by the given callables"""
+
+    def __init__(self, address: Tuple[str, int], prometheus_text: Callable[[], str], summary: Callable[[], Dict]):
+        """
+        :param address: (host, port) to listen on
+        :param prometheus_text: returns the metrics in the Prometheus text format
+        :param summary: returns the metrics as JSON serializable object
+        """
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, content_type = prometheus_text().encode(), 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body, content_type = json.dumps(_finite(summary()), allow_nan=False).encode(), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Requests are not printed (they would interrupt the in-place status line)
+                pass
+
+        self.server = ThreadingHTTPServer(address, Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name='MetricsServer', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        """Close the port and wait for the server thread to exit."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
@@ -0,0 +1,159 @@
+"""
+In-process sampling profiler for the simulator thread.
+
+Stacks are sampled either by a SIGPROF interval timer (ProfilerClock.Cpu: the handler runs in the simulator thread
+and only fires while the process uses CPU time, so idle time such as the sleep of every cycle is not sampled,
+POSIX only) or by a sampler thread reading the stack of the simulator thread (ProfilerClock.Wall: includes idle
+time, samples are taken when the simulator thread releases the GIL). Identical stacks are aggregated, memory use
+only depends on the number of distinct stacks.
+"""
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from mike_simulator.tracing import ProfileFormat, ProfilerClock
+
+# Paths of frames in the simulator package are shown relative to this directory
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class SamplingProfiler:
+    """Samples the stack of the thread which calls start() until stop() is called"""
+
+    def __init__(self, clock: ProfilerClock = ProfilerClock.Cpu, interval: float = 0.005):
+        """
+        :param clock: time base of the sampling interval (Cpu falls back to Wall if SIGPROF is not available)
+        :param interval: time between two samples [s]
+        """
+        if clock == ProfilerClock.Cpu and not hasattr(signal, 'setitimer'):
+            print('Cpu profiler clock is not supported on this platform, sampling wall-clock time instead')
+            clock = ProfilerClock.Wall
+        self.clock = clock
+        self.interval = interval
+
+        # Distinct frames (name, file, line) and their ids by (code, line)
+        self.frames: List[Tuple[str, str, int]] = []
+        self.frame_ids: Dict[tuple, int] = {}
+
+        # Number of samples per stack (frame ids, outermost frame first)
+        self.stacks: Dict[Tuple[int, ...], int] = {}
+        self.sample_count = 0
+
+        self.thread_id: Optional[int] = None
+        self.sampler: Optional[threading.Thread] = None
+        self.stopped = threading.Event()
+        self.start_time = 0.0
+        self.duration = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self.thread_id is not None
+
+    def start(self):
+        """Start sampling the calling thread (which must be the main thread for the Cpu clock)."""
+        if self.running:
+            return
+        self.thread_id = threading.get_ident()
+        self.start_time = time.perf_counter()
+        if self.clock == ProfilerClock.Cpu:
+            if threading.current_thread() is not threading.main_thread():
+                raise RuntimeError('The Cpu profiler clock can only sample the main thread')
+            signal.signal(signal.SIGPROF, self._on_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        else:
+            self.stopped.clear()
+            self.sampler = threading.Thread(target=self._run_sampler, name='SamplingProfiler', daemon=True)
+            self.sampler.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        if self.clock == ProfilerClock.Cpu:
+            signal.setitimer(signal.ITIMER_PROF, 0.0)
+            signal.signal(signal.SIGPROF, signal.SIG_DFL)
+        else:
+            self.stopped.set()
+            self.sampler.join()
+            self.sampler = None
+        self.duration += time.perf_counter() - self.start_time
+        self.thread_id = None
+
+    def save(self, directory: str, label: str, profile_format: ProfileFormat) -> str:
+        """
+        Write the samples collected so far to a new file in directory.
+
+        :param label: describes the profiled session, part of the filename
+        :return: name of the written file
+        """
+        os.makedirs(directory, exist_ok=True)
+        name = f'profile_{time.strftime("%Y%m%d-%H%M%S")}_{label}'
+        if profile_format == ProfileFormat.Collapsed:
+            filename = os.path.join(directory, name + '.collapsed')
+            self.write_collapsed(filename)
+        else:
+            filename = os.path.join(directory, name + '.speedscope.json')
+            self.write_speedscope(filename, name)
+        return filename
+
+    def write_collapsed(self, filename: str):
+        """Write one line 'outer;...;inner count' per stack (input format of flamegraph.pl, speedscope, ...)."""
+        labels = [f'{name} ({file}:{line})' for name, file, line in self.frames]
+        with open(filename, 'w') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(';'.join(labels[frame] for frame in stack) + f' {count}\n')
+
+    def write_speedscope(self, filename: str, name: str):
+        """Write a speedscope sampled profile (one weighted sample per distinct stack, weight in seconds)."""
+        stacks = sorted(self.stacks.items())
+        profile = {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'mike_simulator',
+            'shared': {'frames': [{'name': name, 'file': file, 'line': line} for name, file, line in self.frames]},
+            'profiles': [{
+                'type': 'sampled',
+                'name': f'{name} ({self.clock.name} clock, {self.interval * 1000:g} ms interval)',
+                'unit': 'seconds',
+                'startValue': 0.0,
+                'endValue': self.sample_count * self.interval,
+                'samples': [list(stack) for stack, _ in stacks],
+                'weights': [count * self.interval for _, count in stacks],
+            }],
+        }
+        with open(filename, 'w') as f:
+            json.dump(profile, f)
+
+    def _on_signal(self, signum, frame):
+        self._sample(frame)
+
+    def _run_sampler(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self._sample(frame)
+
+    def _sample(self, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            key = (code, frame.f_lineno)
+            frame_id = self.frame_ids.get(key)
+            if frame_id is None:
+                frame_id = self.frame_ids[key] = len(self.frames)
+                self.frames.append((getattr(code, 'co_qualname', code.co_name), self._short_path(code.co_filename),
+                                    frame.f_lineno))
+            stack.append(frame_id)
+            frame = frame.f_back
+        stack = tuple(reversed(stack))
+        self.stacks[stack] = self.stacks.get(stack, 0) + 1
+        self.sample_count += 1
+
+    @staticmethod
+    def _short_path(filename: str) -> str:
+        if filename.startswith(_ROOT_DIR):
+            return os.path.relpath(filename, _ROOT_DIR)
+        return filename
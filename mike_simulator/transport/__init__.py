@@ -0,0 +1,18 @@
+import importlib
+
+# Transport helpers are imported on first access only (the configuration only needs parse_endpoints)
+_modules_by_name = {
+    'FanOutSender': 'fanout',
+    'parse_endpoints': 'fanout',
+    'MotorStateBatcher': 'batching',
+    'unpack_motor_state_batch': 'batching',
+    'ControlFrameReader': 'control_framing',
+    'AckBatcher': 'control_framing',
+}
+__all__ = list(_modules_by_name)
+
+
+def __getattr__(name):
+    if name in _modules_by_name:
+        return getattr(importlib.import_module(f'.{_modules_by_name[name]}', __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
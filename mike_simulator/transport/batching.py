@@ -0,0 +1,80 @@
+"""
+Batched motor data packets: K consecutive motor states in one datagram.
+
+Packet layout (network byte order):
+    header:  magic (u16, 'MB'), version (u8), sample count K (u8), packet sequence number (u32)
+    samples: K motor states, each flattened like a single motor data packet (see flatten_to_string)
+"""
+import struct
+from typing import List, Optional, Tuple
+
+from mike_simulator.datamodels import MotorState
+from mike_simulator.util.lab_view_serialization import FixedSizeFlattener
+
+BATCH_MAGIC = 0x4D42
+BATCH_VERSION = 1
+BATCH_HEADER = struct.Struct('!HBBI')
+MAX_SAMPLES_PER_PACKET = 255
+
+_motor_state_flattener = FixedSizeFlattener(MotorState)
+
+
+class MotorStateBatcher:
+    """Collects motor states into batched packets"""
+
+    def __init__(self, samples_per_packet: int):
+        assert 1 <= samples_per_packet <= MAX_SAMPLES_PER_PACKET
+        self.samples_per_packet = samples_per_packet
+        self.sample_size = _motor_state_flattener.size
+        self.packet = bytearray(BATCH_HEADER.size + samples_per_packet * self.sample_size)
+        self.count = 0
+        self.sequence = 0
+
+    def add(self, ms: MotorState) -> Optional[bytearray]:
+        """
+        Add a motor state to the current packet.
+
+        :return: the completed packet once it contains samples_per_packet motor states, else None
+                 (the returned buffer is reused, it has to be sent or copied before the next call)
+        """
+        _motor_state_flattener.flatten_into(self.packet, BATCH_HEADER.size + self.count * self.sample_size, ms)
+        self.count += 1
+        if self.count < self.samples_per_packet:
+            return None
+        return self._finish_packet()
+
+    def flush(self) -> Optional[bytes]:
+        """Return the incomplete current packet (None if it is empty) and start a new one."""
+        if self.count == 0:
+            return None
+        size = BATCH_HEADER.size + self.count * self.sample_size
+        return bytes(self._finish_packet()[:size])
+
+    def reset(self):
+        """Discard the current packet and restart the sequence numbers."""
+        self.count = 0
+        self.sequence = 0
+
+    def _finish_packet(self) -> bytearray:
+        BATCH_HEADER.pack_into(self.packet, 0, BATCH_MAGIC, BATCH_VERSION, self.count, self.sequence)
+        self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+        self.count = 0
+        return self.packet
+
+
+def unpack_motor_state_batch(packet: bytes) -> Tuple[int, List[MotorState]]:
+    """
+    Unpack a batched motor data packet.
+
+    :return: packet sequence number and the contained motor states (in the order they were produced)
+    :raise ValueError: if packet is not a valid batched motor data packet
+    """
+    if len(packet) < BATCH_HEADER.size:
+        raise ValueError('Packet too short')
+    magic, version, count, sequence = BATCH_HEADER.unpack_from(packet, 0)
+    if magic != BATCH_MAGIC or version != BATCH_VERSION:
+        raise ValueError('Not a batched motor data packet')
+    if len(packet) != BATCH_HEADER.size + count * _motor_state_flattener.size:
+        raise ValueError(f'Packet size does not match sample count {count}')
+    return sequence, [_motor_state_flattener.unflatten_from(packet, BATCH_HEADER.size + i * _motor_state_flattener.size)
+                      for i in range(count)]
@@ -0,0 +1,103 @@
+"""
+Framing of the TCP control connection between the frontend and the simulator.
+
+Every message consists of a header (message type u8, payload length u16, network byte order) and the payload
+(LabView flattened PatientResponse / ControlResponse, empty for Skip). The simulator acknowledges every message
+with a single byte ('X' = handled, '?' = unknown message type), in the order in which the messages were received.
+
+TCP does not preserve message boundaries: a recv may return a partial message or several (pipelined) messages.
+ControlFrameReader reassembles the messages from the received bytes and hands them out one at a time (so that the
+receiver can spread a burst of messages over several cycles), AckBatcher collects the acknowledgements of all
+messages handled in one cycle so that they are sent with a single send call.
+"""
+import socket
+import struct
+from collections import deque
+from typing import Any, Optional, Tuple
+
+CONTROL_HEADER = struct.Struct('!BH')
+
+ACK = b'X'
+NACK = b'?'
+
+
+class ControlFrameReader:
+    """Reassembles control messages from the received byte stream"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        # Start of the first message which was not returned yet
+        self.offset = 0
+
+        # Number of bytes removed from the buffer so far and (stream position after the data, mark) of every feed
+        self.discarded = 0
+        self.marks = deque()
+
+        # Mark of the data which completed the message returned last
+        self.received_at: Any = None
+
+    def feed(self, data: bytes, mark: Any = None):
+        """
+        Add received data.
+
+        :param mark: value associated with the data (e.g. receive time), available as received_at once a
+                     message completed by this data is returned
+        """
+        if self.offset:
+            del self.buffer[:self.offset]
+            self.discarded += self.offset
+            self.offset = 0
+        self.buffer += data
+        self.marks.append((self.discarded + len(self.buffer), mark))
+
+    def next_message(self) -> Optional[Tuple[int, bytes]]:
+        """Return (message type, payload) of the next complete message, None if there is none (yet)."""
+        if not self.has_message():
+            return None
+        msg_type, length = CONTROL_HEADER.unpack_from(self.buffer, self.offset)
+        start = self.offset + CONTROL_HEADER.size
+        end = start + length
+        self.offset = end
+        while self.marks[0][0] < self.discarded + end:
+            self.marks.popleft()
+        self.received_at = self.marks[0][1]
+        return msg_type, bytes(self.buffer[start:end])
+
+    def has_message(self) -> bool:
+        """Return whether a complete message is buffered."""
+        if len(self.buffer) - self.offset < CONTROL_HEADER.size:
+            return False
+        _, length = CONTROL_HEADER.unpack_from(self.buffer, self.offset)
+        return self.offset + CONTROL_HEADER.size + length <= len(self.buffer)
+
+    def buffered(self) -> int:
+        """Return the number of received bytes which were not returned as message yet."""
+        return len(self.buffer) - self.offset
+
+    def reset(self):
+        """Discard all received data (e.g. when a new connection is accepted)."""
+        self.buffer.clear()
+        self.offset = 0
+        self.discarded = 0
+        self.marks.clear()
+        self.received_at = None
+
+
+class AckBatcher:
+    """Collects acknowledgements and sends them with one call"""
+
+    def __init__(self):
+        self.pending = bytearray()
+
+    def add(self, ack: bytes):
+        self.pending += ack
+
+    def flush(self, sock: socket.socket):
+        """Send all pending acknowledgements (blocks until they are handed to the OS)."""
+        if self.pending:
+            sock.sendall(self.pending)
+            self.pending.clear()
+
+    def reset(self):
+        """Discard pending acknowledgements (e.g. when a new connection is accepted)."""
+        self.pending.clear()
@@ -0,0 +1,74 @@
+import socket
+from typing import List, Tuple
+
+
+def parse_endpoints(endpoints: str) -> List[Tuple[str, int]]:
+    """
+    Parse a comma separated list of host:port entries.
+
+    :raise ValueError: if an entry is malformed
+    """
+    result = []
+    for entry in endpoints.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, sep, port = entry.rpartition(':')
+        if not sep or not host or not port.isdigit() or not (0 < int(port) < (1 << 16)):
+            raise ValueError(f'{entry!r} is not of the form host:port')
+        result.append((host, int(port)))
+    return result
+
+
+class FanOutSender:
+    """
+    Sends every motor data packet to a list of UDP destinations (frontend, additional subscribers, multicast group).
+
+    With more than one destination, all copies are handed to the OS with a single sendmmsg call where available,
+    so that additional subscribers do not add per-packet Python overhead. Send errors (e.g. unreachable
+    subscribers) are counted but do not interrupt the stream to the other destinations.
+    """
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.destinations: List[Tuple[str, int]] = []
+        self.multi_sender = None
+        self.send_errors = 0
+
+    def set_destinations(self, destinations: List[Tuple[str, int]], multicast_ttl: int = 1):
+        """
+        Replace the list of destinations (duplicates are removed, host names are resolved once).
+
+        :param destinations: (host, port) pairs
+        :param multicast_ttl: time to live of packets sent to multicast groups
+        """
+        resolved = []
+        for host, port in destinations:
+            try:
+                endpoint = (socket.gethostbyname(host), port)
+            except OSError as e:
+                print(f'Could not resolve motor data subscriber {host} {e.args}, ignoring it')
+                continue
+            if endpoint not in resolved:
+                resolved.append(endpoint)
+        if any(socket.inet_aton(host)[0] >> 4 == 0xE for host, _ in resolved):
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, multicast_ttl)
+        self.destinations = resolved
+
+        # ctypes is only loaded once there are multiple destinations
+        self.multi_sender = None
+        if len(resolved) > 1:
+            from mike_simulator.transport import sendmmsg
+            if sendmmsg.AVAILABLE:
+                self.multi_sender = sendmmsg.MultiSender(self.sock, resolved)
+
+    def send(self, packet):
+        """Send packet (bytes or bytearray) to all destinations."""
+        if self.multi_sender is not None:
+            self.send_errors += self.multi_sender.send(packet)
+        else:
+            for destination in self.destinations:
+                try:
+                    self.sock.sendto(packet, destination)
+                except OSError:
+                    self.send_errors += 1
@@ -0,0 +1,86 @@
+"""
+Batched UDP sending using the Linux sendmmsg system call (not exposed by the socket module, called via ctypes).
+
+MultiSender sends one datagram to a fixed list of IPv4 destinations with a single system call.
+AVAILABLE is False on platforms without sendmmsg, in which case callers have to fall back to sendto.
+"""
+import ctypes
+import ctypes.util
+import socket
+import struct
+import sys
+from typing import List, Tuple
+
+_libc = None
+if sys.platform.startswith('linux'):
+    try:
+        _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        _libc.sendmmsg
+    except (OSError, AttributeError):
+        _libc = None
+AVAILABLE = _libc is not None
+
+
+class _IoVec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p), ('iov_len', ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [('msg_name', ctypes.c_void_p), ('msg_namelen', ctypes.c_uint32),
+                ('msg_iov', ctypes.POINTER(_IoVec)), ('msg_iovlen', ctypes.c_size_t),
+                ('msg_control', ctypes.c_void_p), ('msg_controllen', ctypes.c_size_t),
+                ('msg_flags', ctypes.c_int)]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [('msg_hdr', _MsgHdr), ('msg_len', ctypes.c_uint)]
+
+
+def _sockaddr_in(host: str, port: int) -> bytes:
+    return struct.pack('=H', socket.AF_INET) + struct.pack('!H', port) + socket.inet_aton(host) + bytes(8)
+
+
+class MultiSender:
+    """Sends the same datagram to several destinations with a single sendmmsg call"""
+
+    def __init__(self, sock: socket.socket, destinations: List[Tuple[str, int]]):
+        """
+        :param sock: IPv4 UDP socket
+        :param destinations: (ip address, port) pairs
+        """
+        assert AVAILABLE
+        self.fd = sock.fileno()
+        self.count = len(destinations)
+        self.addresses = [ctypes.create_string_buffer(_sockaddr_in(*dest), 16) for dest in destinations]
+        # All messages share one io vector, which points to the datagram being sent
+        self.iov = _IoVec()
+        self.messages = (_MMsgHdr * self.count)()
+        for msg, address in zip(self.messages, self.addresses):
+            msg.msg_hdr.msg_name = ctypes.cast(address, ctypes.c_void_p)
+            msg.msg_hdr.msg_namelen = 16
+            msg.msg_hdr.msg_iov = ctypes.pointer(self.iov)
+            msg.msg_hdr.msg_iovlen = 1
+
+    def send(self, packet) -> int:
+        """
+        Send packet (bytes or bytearray) to all destinations.
+
+        :return: number of destinations the packet could not be sent to
+        """
+        if isinstance(packet, bytearray):
+            data = (ctypes.c_char * len(packet)).from_buffer(packet)
+            self.iov.iov_base = ctypes.addressof(data)
+        else:
+            data = ctypes.c_char_p(packet)
+            self.iov.iov_base = ctypes.cast(data, ctypes.c_void_p).value
+        self.iov.iov_len = len(packet)
+        sent, failed = 0, 0
+        while sent < self.count:
+            # sendmmsg stops at the first message which could not be sent, skip it and continue with the rest
+            result = _libc.sendmmsg(self.fd, ctypes.byref(self.messages, sent * ctypes.sizeof(_MMsgHdr)),
+                                    self.count - sent, 0)
+            if result <= 0:
+                failed += 1
+                result = 1
+            sent += result
+        return failed
@@ -1,2 +1,3 @@
 from .print_util import PrintUtil
-from .timer import Timer, get_current_time
+from .timer import Timer, SimulatedClock, get_current_time, get_current_time_ns, set_time_source, reset_time_source, \
+    update_tick_time, get_tick_time, get_tick_time_ns, TimerWheel, TimerHandle
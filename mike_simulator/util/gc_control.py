@@ -0,0 +1,172 @@
+"""
+Garbage collection and allocation control for the realtime simulator loop.
+
+With automatic garbage collection, a collection runs whenever enough objects were allocated, i.e. in the middle of
+arbitrary cycles, and collections of the old generation traverse every object of the process (5-20 ms gaps in the
+motor stream). GcScheduler instead freezes the long-lived objects (gc.freeze, they are never traversed again) and
+disables automatic collection. Young collections, whose duration only depends on the few objects allocated since
+the previous one, run in the waiting time at the end of a cycle, generation 1 is collected when the trial changes.
+Full collections only run in the idle period after a session ended.
+"""
+import gc
+import time
+import tracemalloc
+from enum import Enum
+from typing import Optional
+
+from mike_simulator.util.print_util import PrintUtil
+
+# Every nth young collection also collects generation 1
+GENERATION_1_INTERVAL = 10
+
+
+class GcMode(Enum):
+    # Python default (collections whenever the allocation thresholds are reached)
+    Automatic = 0
+    # Long-lived objects are frozen, collections run in idle periods (see GcScheduler)
+    Scheduled = 1
+
+
+class GcScheduler:
+    """Runs garbage collections in idle periods of the simulator loop instead of in the middle of cycles"""
+
+    def __init__(self, young_threshold: int = 700):
+        """
+        :param young_threshold: number of pending objects (allocations minus deallocations of objects tracked by
+                                the garbage collector) above which a young collection runs
+        """
+        self.young_threshold = young_threshold
+        self.active = False
+        self.was_idle = True
+        self.young_collections = 0
+        self.full_collections = 0
+        # Longest collection so far [s]
+        self.max_pause = 0.0
+
+    def start(self):
+        """Collect all garbage, freeze the surviving objects and disable automatic collection."""
+        gc.collect()
+        gc.freeze()
+        gc.disable()
+        self.active = True
+
+    def stop(self):
+        """Restore automatic collection."""
+        if self.active:
+            gc.unfreeze()
+            gc.enable()
+            self.active = False
+
+    def on_cycle(self, idle: bool, trial_changed: bool) -> float:
+        """
+        Run the collection due in this cycle (if any).
+
+        :param idle: whether no task is running
+        :param trial_changed: whether the trial number changed in this cycle
+        :return: time spent collecting [s]
+        """
+        if not self.active:
+            return 0.0
+        if idle and not self.was_idle:
+            # Session ended: collect everything (including objects frozen earlier) and freeze the survivors
+            self.was_idle = True
+            return self._collect(self._full_collection)
+        self.was_idle = idle
+        if trial_changed:
+            return self._collect(lambda: self._young_collection(1))
+        if gc.get_count()[0] > self.young_threshold:
+            return self._collect(lambda: self._young_collection(
+                1 if self.young_collections % GENERATION_1_INTERVAL == GENERATION_1_INTERVAL - 1 else 0))
+        return 0.0
+
+    def _young_collection(self, generation: int):
+        self.young_collections += 1
+        gc.collect(generation)
+
+    def _full_collection(self):
+        self.full_collections += 1
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
+
+    def _collect(self, collection) -> float:
+        t_start = time.perf_counter()
+        collection()
+        pause = time.perf_counter() - t_start
+        self.max_pause = max(self.max_pause, pause)
+        return pause
+
+
+class AllocationSampler:
+    """
+    Measures the allocations per cycle with tracemalloc in sampling windows (tracemalloc slows down every
+    allocation, so it only runs for window_cycles cycles every interval seconds).
+
+    Reported per window: bytes allocated per cycle (peak of the traced memory above its value at the start of the
+    cycle, a lower bound of the allocated bytes), net memory growth per cycle and the source lines with the largest
+    net growth.
+    """
+
+    def __init__(self, interval: float, window_cycles: int, gc_scheduler: Optional[GcScheduler] = None):
+        """
+        :param interval: time between the starts of two sampling windows [s]
+        :param window_cycles: number of cycles per sampling window
+        :param gc_scheduler: scheduler whose statistics are included in the report
+        """
+        self.interval = interval
+        self.window_cycles = window_cycles
+        self.gc_scheduler = gc_scheduler
+        self.next_window = time.perf_counter() + interval
+        self.cycles = 0
+        self.cycle_start = 0
+        self.window_start = 0
+        self.allocated_sum = 0
+        self.allocated_max = 0
+        self.sampling = False
+
+    def begin_cycle(self):
+        """Called at the start of every cycle, starts a sampling window when it is due."""
+        if not self.sampling:
+            if time.perf_counter() < self.next_window:
+                return
+            tracemalloc.start()
+            self.sampling = True
+            self.cycles = self.allocated_sum = self.allocated_max = 0
+            self.window_start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        self.cycle_start = tracemalloc.get_traced_memory()[0]
+
+    def end_cycle(self):
+        """Called at the end of every cycle (before the idle time), reports the window once it is complete."""
+        if not self.sampling:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        allocated = peak - self.cycle_start
+        self.allocated_sum += allocated
+        self.allocated_max = max(self.allocated_max, allocated)
+        self.cycles += 1
+        if self.cycles >= self.window_cycles:
+            self._report(current)
+
+    def stop(self):
+        if self.sampling:
+            tracemalloc.stop()
+            self.sampling = False
+
+    def _report(self, current: int):
+        # Only blocks allocated since the start of the window are traced, i.e. the snapshot contains the net growth
+        growth = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]).statistics('lineno')
+        tracemalloc.stop()
+        self.sampling = False
+        self.next_window = time.perf_counter() + self.interval
+
+        lines = [f'Allocations in {self.cycles} cycles: {self.allocated_sum / self.cycles:.0f} B/cycle (max '
+                 f'{self.allocated_max} B), net growth {(current - self.window_start) / self.cycles:.1f} B/cycle']
+        if self.gc_scheduler is not None and self.gc_scheduler.active:
+            s = self.gc_scheduler
+            lines.append(f'  gc: {s.young_collections} young, {s.full_collections} full collections, '
+                         f'max pause {s.max_pause * 1000:.2f} ms')
+        for stat in growth[:5]:
+            lines.append(f'  {stat.traceback[0]}: +{stat.size} B, +{stat.count} blocks')
+        PrintUtil.print_normally('\n'.join(lines))
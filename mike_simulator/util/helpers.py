@@ -1,3 +1,6 @@
+import importlib
+
+
 def clamp(min_x: float, max_x: float, x: float) -> float:
     """Restrict x to the range [min_x, max_x]"""
     return min(max(min_x, x), max_x)
@@ -6,3 +9,8 @@ def clamp(min_x: float, max_x: float, x: float) -> float:
 def lerp(min_x: float, max_x: float, normalized_t: float) -> float:
     """Linear interpolation between min_x and max_x with normalized_t in [0, 1]"""
     return min_x + (max_x - min_x) * normalized_t
+
+
+def import_attribute(module_name: str, attribute_name: str):
+    """Import module_name (only loaded on first use) and return its attribute attribute_name."""
+    return getattr(importlib.import_module(module_name), attribute_name)
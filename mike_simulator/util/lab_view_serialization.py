@@ -1,5 +1,7 @@
+import struct
 from dataclasses import fields
 from enum import IntEnum
+from operator import attrgetter
 from typing import TypeVar, Type
 from mike_simulator.datamodels import UInt8, UInt32, Int32
 
@@ -48,3 +50,38 @@ def flatten_to_string(obj) -> bytes:
     vals = [val.encode('utf-8') if isinstance(val, str) else val for val in vals]
     res = netstruct.pack(fmt, *vals)
     return res
+
+
+class FixedSizeFlattener:
+    """
+    Precompiled equivalent of flatten_to_string for dataclasses which only contain fixed size fields (no strings).
+
+    The struct layout and the field getter are built once, so flattening an instance is a single pack call.
+    """
+
+    def __init__(self, cls: type):
+        types = [field.type if not isinstance(field.type, IntEnum) else UInt8 for field in fields(cls)]
+        if str in types:
+            raise ValueError(f'{cls.__name__} contains variable size fields')
+        self.cls = cls
+        self.struct = struct.Struct('!' + b''.join(format_dict[t] for t in types).decode('ascii'))
+        self.get_values = attrgetter(*[field.name for field in fields(cls)])
+        self.size = self.struct.size
+        # Enum fields are transmitted as their value (the field type is the default member, see MotorState.RomState)
+        self.enum_fields = [(index, type(field.type)) for index, field in enumerate(fields(cls))
+                            if isinstance(field.type, IntEnum)]
+
+    def flatten(self, obj) -> bytes:
+        """Flatten obj into a new bytes object."""
+        return self.struct.pack(*self.get_values(obj))
+
+    def flatten_into(self, buffer, offset: int, obj):
+        """Flatten obj directly into a preallocated (writable) buffer at the given offset."""
+        self.struct.pack_into(buffer, offset, *self.get_values(obj))
+
+    def unflatten_from(self, buffer, offset: int = 0):
+        """Unflatten an instance from buffer at the given offset."""
+        values = list(self.struct.unpack_from(buffer, offset))
+        for index, enum_type in self.enum_fields:
+            values[index] = enum_type(values[index])
+        return self.cls(*values)
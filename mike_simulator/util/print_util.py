@@ -1,12 +1,41 @@
+import math
 import sys
+import time
 
 
 class PrintUtil:
     _inplace = False
+    _enabled = True
+
+    # Minimum time between two in-place lines [s] (0 = print every line, inf = print none)
+    _inplace_interval = 0.0
+    _last_inplace = -math.inf
+
+    @staticmethod
+    def set_enabled(enabled: bool):
+        """Enable or disable all console output (e.g. when stepping the simulator headlessly)."""
+        PrintUtil._enabled = enabled
+
+    @staticmethod
+    def set_inplace_rate(rate: float):
+        """Print at most rate in-place lines per second, further lines are dropped (0 = no in-place lines)."""
+        PrintUtil._inplace_interval = 1.0 / rate if rate > 0.0 else math.inf
+
+    @staticmethod
+    def inplace_due() -> bool:
+        """Whether print_inplace would print now (check before formatting a line in every cycle)."""
+        return PrintUtil._enabled and time.monotonic() - PrintUtil._last_inplace >= PrintUtil._inplace_interval
 
     @staticmethod
     def print_inplace(*text, **kwargs):
         """Print text by overwriting current line in terminal"""
+        if not PrintUtil._enabled:
+            return
+        if PrintUtil._inplace_interval:
+            now = time.monotonic()
+            if now - PrintUtil._last_inplace < PrintUtil._inplace_interval:
+                return
+            PrintUtil._last_inplace = now
         PrintUtil._inplace = True
         # Clear line
         print('\r', 79*' ', end='', **kwargs)
@@ -19,6 +48,8 @@ class PrintUtil:
     @staticmethod
     def print_normally(*text, **kwargs):
         """Print text on a new line"""
+        if not PrintUtil._enabled:
+            return
         if PrintUtil._inplace:
             print()
             PrintUtil._inplace = False
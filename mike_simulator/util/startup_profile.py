@@ -0,0 +1,20 @@
+import os
+import sys
+import time
+
+
+class StartupProfile:
+    """
+    Reports how long the individual startup phases take (enabled by setting MIKE_SIMULATOR_PROFILE_STARTUP=1).
+
+    Times are measured relative to the first import of this module, which happens at the very beginning of main.
+    """
+    enabled = os.environ.get('MIKE_SIMULATOR_PROFILE_STARTUP', '0') == '1'
+    _start = time.perf_counter()
+
+    @staticmethod
+    def mark(phase: str):
+        """Print the time elapsed since startup and the number of loaded modules when phase was reached."""
+        if StartupProfile.enabled:
+            elapsed = (time.perf_counter() - StartupProfile._start) * 1000.0
+            print(f'[startup] {phase}: {elapsed:.1f} ms, {len(sys.modules)} modules loaded')
@@ -1,4 +1,5 @@
 import time
+from typing import Any, Callable, List, Optional
 
 
 class Timer:
@@ -8,7 +9,7 @@ class Timer:
     def start(self, duration: float):
         """Start a timer which finishes in 'duration' seconds"""
         assert self.has_finished()
-        self.end_time = get_current_time() + duration
+        self.end_time = get_tick_time() + duration
 
     def stop(self):
         self.end_time = None
@@ -19,9 +20,158 @@ class Timer:
 
     def has_finished(self) -> bool:
         """Return whether time is not running (never started or already finished)."""
-        return self.end_time is None or get_current_time() >= self.end_time
+        return self.end_time is None or get_tick_time() >= self.end_time
+
+
+class SimulatedClock:
+    """Manually advanced time source, used to step the simulator faster (or slower) than real time."""
+
+    def __init__(self, start_time_ns: int = 0):
+        self.now_ns = start_time_ns
+
+    def __call__(self) -> int:
+        return self.now_ns
+
+    def advance(self, seconds: float):
+        """Move the clock forward by the given amount of seconds."""
+        self.now_ns += round(seconds * 1_000_000_000)
+
+
+# Function returning the current time in integer nanoseconds, used by all simulator components
+_time_source: Callable[[], int] = time.time_ns
+
+
+def set_time_source(source: Callable[[], int]):
+    """
+    Replace the time source used by the simulator (e.g. with a SimulatedClock for headless stepping).
+
+    :param source: callable returning the current time in integer nanoseconds
+    """
+    global _time_source
+    _time_source = source
+
+
+def reset_time_source():
+    """Restore the default wall-clock time source."""
+    set_time_source(time.time_ns)
+
+
+def get_current_time_ns() -> int:
+    """Get current time in integer nanoseconds."""
+    return _time_source()
 
 
 def get_current_time() -> float:
     """Get current time in fractional seconds."""
-    return time.time_ns() / 1_000_000_000
+    return _time_source() / 1_000_000_000
+
+
+# Time of the current simulator cycle, captured once per cycle so that all components agree on one time value
+_tick_time_ns: int = 0
+
+
+def update_tick_time() -> int:
+    """
+    Capture the time of a new simulator cycle (or of an event handled between two cycles).
+
+    :return: the new tick time in integer nanoseconds
+    """
+    global _tick_time_ns
+    _tick_time_ns = _time_source()
+    return _tick_time_ns
+
+
+def get_tick_time_ns() -> int:
+    """Get time of the current simulator cycle in integer nanoseconds."""
+    return _tick_time_ns
+
+
+def get_tick_time() -> float:
+    """Get time of the current simulator cycle in fractional seconds."""
+    return _tick_time_ns / 1_000_000_000
+
+
+class TimerHandle:
+    """Event scheduled on a TimerWheel"""
+    __slots__ = ('due_ns', 'due_tick', 'seq', 'payload', 'cancelled')
+
+    def __init__(self, due_ns: int, due_tick: int, seq: int, payload: Any):
+        self.due_ns = due_ns
+        self.due_tick = due_tick
+        self.seq = seq
+        self.payload = payload
+        self.cancelled = False
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel for events scheduled in the future.
+
+    Time is divided into ticks of resolution_ns, every event is stored in the slot of its due tick (modulo the
+    number of slots). Advancing the wheel only visits the slots of the ticks which passed since the last call, so
+    waiting for an event costs nothing per cycle, independent of the number of pending events.
+    """
+
+    def __init__(self, resolution_ns: int = 1_000_000, slot_count: int = 1024):
+        self.resolution_ns = resolution_ns
+        self.slots: List[List[TimerHandle]] = [[] for _ in range(slot_count)]
+        self.last_tick: Optional[int] = None
+        self.pending = 0
+        self.seq = 0
+
+    def schedule(self, due_ns: int, payload: Any) -> TimerHandle:
+        """
+        Schedule an event which is returned by pop_due once due_ns has been reached.
+
+        :param due_ns: due time in integer nanoseconds (same time base as the tick time)
+        :param payload: object returned by pop_due for this event
+        :return: handle which can be used to cancel the event
+        """
+        # Round up, so that events are never returned early
+        due_tick = -(-due_ns // self.resolution_ns)
+        if self.last_tick is not None and due_tick <= self.last_tick:
+            due_tick = self.last_tick + 1
+        handle = TimerHandle(due_ns, due_tick, self.seq, payload)
+        self.seq += 1
+        self.slots[due_tick % len(self.slots)].append(handle)
+        self.pending += 1
+        return handle
+
+    def cancel(self, handle: TimerHandle):
+        """Cancel a scheduled event (cancelled events are removed lazily)."""
+        handle.cancelled = True
+
+    def clear(self):
+        """Cancel all scheduled events."""
+        for slot in self.slots:
+            slot.clear()
+        self.pending = 0
+
+    def pop_due(self, now_ns: int) -> List[Any]:
+        """
+        Advance the wheel to now_ns and remove all events which are due.
+
+        :return: payloads of the due (non-cancelled) events, ordered by due time
+        """
+        now_tick = now_ns // self.resolution_ns
+        last_tick, self.last_tick = self.last_tick, now_tick
+        if self.pending == 0 or (last_tick is not None and now_tick <= last_tick):
+            return []
+
+        # Visit slots of all ticks which passed since the last call (every slot at most once)
+        first_tick = now_tick - len(self.slots) + 1 if last_tick is None else max(last_tick + 1, now_tick - len(self.slots) + 1)
+        due = []
+        for tick in range(first_tick, now_tick + 1):
+            slot = self.slots[tick % len(self.slots)]
+            if slot:
+                remaining = []
+                for handle in slot:
+                    if handle.due_tick <= now_tick:
+                        self.pending -= 1
+                        if not handle.cancelled:
+                            due.append(handle)
+                    else:
+                        remaining.append(handle)
+                slot[:] = remaining
+        due.sort(key=lambda handle: (handle.due_ns, handle.seq))
+        return [handle.payload for handle in due]